@@ -1,29 +1,108 @@
 # analysis/allocation_helper.py
+import numpy as np
 import pandas as pd
 
+from .lot_allocation import INTERACTIVE_MAX_NODES, LOT_SIZE, allocate_lots, greedy_lots
+
+PRICE_COLS = ['Current Price', 'Market Price', 'Price']
+
+
 class AllocationHelper:
-    def __init__(self, recommendations_df):
+    def __init__(self, recommendations_df, provider=None, exact_limit=8, max_nodes=INTERACTIVE_MAX_NODES):
         self.df = recommendations_df.copy()
+        self.provider = provider
+        self.exact_limit = exact_limit
+        self.max_nodes = max_nodes
+        self.summary = {}
+
+    def resolve_prices(self):
+        """
+        Harga per saham: kolom harga di data rekomendasi, lalu harga terakhir dari quote
+        provider untuk yang kosong. Saham tanpa harga tetap NaN (tidak dialokasikan).
+        """
+        prices = pd.Series(np.nan, index=self.df.index, dtype=float)
+        for col in PRICE_COLS:
+            if col in self.df.columns:
+                prices = prices.fillna(pd.to_numeric(self.df[col], errors='coerce'))
+        prices = prices.where(prices > 0)
+
+        missing = prices.isna()
+        if missing.any() and self.provider is not None and 'Ticker' in self.df.columns:
+            try:
+                quotes = self.provider.fetch_last_prices(self.df.loc[missing, 'Ticker'].tolist())
+            except Exception:
+                quotes = {}
+            prices = prices.fillna(self.df['Ticker'].map(quotes).astype(float))
+        return prices.where(prices > 0)
+
+    def target_weights(self, method="equal", valid=None):
+        valid = np.ones(len(self.df), dtype=bool) if valid is None else valid
+        if method == "equal":
+            weights = valid.astype(float)
+        elif method == "weighted":
+            weights = np.where(valid, self.df['Final Score'].to_numpy(dtype=float), 0.0)
+        else:
+            return None
+        total = weights.sum()
+        return weights / total if total > 0 else weights
 
     def simulate_allocation(self, total_budget, method="equal"):
         df = self.df.copy()
         if df.empty or total_budget <= 0:
             return pd.DataFrame()
 
-        # Estimasi harga (pakai kolom PBV atau Yield jika tidak ada harga langsung)
-        if 'Current Price' not in df.columns:
-            df['Current Price'] = 1000  # asumsi default jika harga tak tersedia
+        prices = self.resolve_prices()
+        valid = prices.notna().to_numpy()
+        weights = self.target_weights(method, valid)
+        if weights is None:
+            return pd.DataFrame()
 
-        if method == "equal":
-            alloc_per_stock = total_budget / len(df)
-            df['Lot Allocated'] = (alloc_per_stock // (df['Current Price'] * 100)).astype(int)
-            df['Allocated Rp'] = df['Lot Allocated'] * df['Current Price'] * 100
-        elif method == "weighted":
-            df['Weight'] = df['Final Score'] / df['Final Score'].sum()
-            df['Allocated Rp'] = (df['Weight'] * total_budget).round(0)
-            df['Lot Allocated'] = (df['Allocated Rp'] // (df['Current Price'] * 100)).astype(int)
-            df['Allocated Rp'] = df['Lot Allocated'] * df['Current Price'] * 100
-        else:
+        lots = np.zeros(len(df), dtype=np.int64)
+        lots[valid], solver = allocate_lots(prices[valid].to_numpy(), weights[valid], total_budget,
+                                            exact_limit=self.exact_limit, max_nodes=self.max_nodes)
+
+        df['Current Price'] = prices
+        df['Lot Allocated'] = lots
+        df['Allocated Rp'] = np.where(valid, lots * prices.fillna(0).to_numpy() * LOT_SIZE, 0.0)
+        df['Target %'] = weights * 100
+        df['Actual %'] = df['Allocated Rp'] / total_budget * 100
+
+        invested = float(df['Allocated Rp'].sum())
+        self.summary = {
+            'budget': total_budget,
+            'invested': invested,
+            'leftover': total_budget - invested,
+            'tracking_error': float(np.sqrt(((df['Actual %'] - df['Target %']) ** 2).sum())),
+            'solver': solver,
+            'unpriced': df.loc[~valid, 'Stock'].tolist(),
+        }
+        return df[['Stock', 'Ticker', 'Current Price', 'Lot Allocated', 'Allocated Rp', 'Target %', 'Actual %']]
+
+    def budget_grid(self, budgets, method="equal"):
+        """
+        Tabel "apa yang bisa dibeli dengan X": lot per saham untuk setiap budget,
+        dihitung untuk seluruh grid budget dalam satu panggilan greedy vektor
+        """
+        budgets = np.asarray(budgets, dtype=np.float64)
+        if self.df.empty or not len(budgets):
+            return pd.DataFrame()
+
+        prices = self.resolve_prices()
+        valid = prices.notna().to_numpy()
+        weights = self.target_weights(method, valid)
+        if weights is None or not valid.any():
             return pd.DataFrame()
 
-        return df[['Stock', 'Ticker', 'Current Price', 'Lot Allocated', 'Allocated Rp']]
+        lot_cost = prices[valid].to_numpy() * LOT_SIZE
+        lots = greedy_lots(lot_cost, weights[valid], np.maximum(budgets, 1e-9))
+        invested = lots @ lot_cost
+        with np.errstate(divide='ignore', invalid='ignore'):
+            actual = lots * lot_cost / budgets[:, None]
+            tracking = np.sqrt(((actual - weights[valid]) ** 2).sum(axis=1)) * 100
+
+        grid = pd.DataFrame(lots, columns=self.df.loc[valid, 'Stock'].tolist())
+        grid.insert(0, 'Budget', budgets)
+        grid['Invested Rp'] = invested
+        grid['Leftover Rp'] = budgets - invested
+        grid['Tracking Error %'] = tracking
+        return grid
@@ -1,7 +1,67 @@
 # analysis/benchmark.py
-import yfinance as yf
 import pandas as pd
 import numpy as np
+from utils.memo import versioned_cache
+
+# Nama indeks -> simbol provider. Indeks sektoral (IDX-IC) dapat ditambahkan lewat argumen `indices`.
+DEFAULT_INDICES = {
+    'IHSG': '^JKSE',
+    'LQ45': '^JKLQ45',
+    'IDX30': '^JKIDX30',
+}
+TRADING_DAYS = 252
+
+
+def rolling_stats(portfolio_returns, index_returns, window, periods_per_year=TRADING_DAYS):
+    """
+    Regresi bergulir portofolio terhadap tiap indeks dalam bentuk tertutup: jumlah,
+    jumlah kuadrat dan hasil kali per jendela diambil dari selisih cumsum, sehingga semua
+    jendela dan semua indeks dihitung sekaligus tanpa loop per jendela.
+    portfolio_returns: (T,), index_returns: (T, K). Hasil per array berukuran (T - window + 1, K):
+    beta, alpha (Jensen, tahunan), tracking error (tahunan), information ratio, korelasi.
+    """
+    y = np.asarray(portfolio_returns, dtype=np.float64)[:, None]
+    x = np.asarray(index_returns, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    # Pusatkan dulu agar selisih cumsum tidak kehilangan presisi
+    y = y - y.mean()
+    x_shift = x.mean(axis=0)
+    x = x - x_shift
+    y_shift = np.asarray(portfolio_returns, dtype=np.float64).mean()
+    active = y - x
+
+    def window_sum(values):
+        c = np.cumsum(values, axis=0)
+        c = np.concatenate([np.zeros((1, c.shape[1])), c])
+        return c[window:] - c[:-window]
+
+    n = float(window)
+    sy, sx = window_sum(y), window_sum(x)
+    sxx, sxy, syy = window_sum(x * x), window_sum(x * y), window_sum(y * y)
+    sa, saa = window_sum(active), window_sum(active * active)
+
+    cov_xy = sxy - sx * sy / n
+    var_x = sxx - sx * sx / n
+    var_y = syy - sy * sy / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = np.where(var_x > 0, cov_xy / var_x, np.nan)
+        mean_y = sy / n + y_shift
+        mean_x = sx / n + x_shift
+        alpha = (mean_y - beta * mean_x) * periods_per_year
+        te = np.sqrt(np.maximum(saa - sa * sa / n, 0) / (n - 1)) * np.sqrt(periods_per_year)
+        mean_active = (mean_y - mean_x) * periods_per_year
+        ir = np.where(te > 0, mean_active / te, np.nan)
+        corr = cov_xy / np.sqrt(var_x * var_y)
+    return {'Beta': beta, 'Alpha': alpha, 'Tracking Error': te, 'Information Ratio': ir, 'Correlation': corr}
+
+
+def _complete(compare, indices):
+    """
+    True bila hasil perbandingan berisi data untuk semua indeks yang diminta; hasil kosong
+    atau parsial (indeks gagal diambil) tidak di-memo agar diambil ulang saat jaringan pulih
+    """
+    return not compare.empty and all(f'{name} %' in compare.columns for name, _ in indices)
 
 
 class BenchmarkAnalyzer:
@@ -10,63 +70,146 @@ class BenchmarkAnalyzer:
 
     def get_index_data(self, symbol="^JKSE", period="3mo"):
         """
-        Mengambil data historis indeks (default: IHSG)
+        Mengambil data historis indeks (default: IHSG) lewat provider (dan cache) milik portofolio
         """
-        idx = yf.Ticker(symbol)
-        hist = idx.history(period=period)
+        hist = self.pm.provider.fetch_history(symbol, period=period)
+        if hist is None or 'Close' not in hist or hist.empty:
+            return pd.DataFrame(columns=['Date', 'Index'])
         hist = hist[['Close']].rename(columns={"Close": "Index"})
         hist.reset_index(inplace=True)
         return hist
 
-    def get_portfolio_history(self):
+    def get_portfolio_history(self, holdings=None):
         """
-        Membuat histori nilai portofolio dari data simulasi harga saham
+        Membuat histori nilai portofolio: panel harga (ffill sekali) dikali jumlah lembar.
+        holdings opsional berupa DataFrame tanggal x saham berisi jumlah lembar per hari,
+        sehingga perubahan posisi di masa lalu ikut tercermin; tanggal di antaranya
+        memakai posisi terakhir yang diketahui.
         """
-        daily_value = None
-        for stock, df in self.pm.simulated_data.items():
-            if stock not in self.pm.df['Stock'].values:
+        panel = self.pm.price_panel()
+        prices = panel.to_numpy()
+        if np.isnan(prices).any():
+            prices = np.nan_to_num(panel.ffill().to_numpy())
+
+        if holdings is None:
+            balances = self.pm.df.drop_duplicates('Stock').set_index('Stock')['Balance']
+            shares = balances.reindex(panel.columns).fillna(0).to_numpy(dtype=float)
+            values = prices @ shares
+        else:
+            schedule = holdings.sort_index().reindex(columns=panel.columns)
+            schedule = schedule.reindex(panel.index, method='ffill').fillna(0).to_numpy(dtype=float)
+            values = np.einsum('ij,ij->i', prices, schedule)
+
+        return pd.DataFrame({'Date': panel.index, 'Portfolio': values})
+
+    def get_index_panel(self, indices=None, period="3mo"):
+        """
+        Harga penutupan beberapa indeks (kolom = nama indeks), diambil paralel lewat
+        provider portofolio (dan cache-nya). Indeks yang gagal diambil dihilangkan.
+        """
+        indices = indices if indices is not None else DEFAULT_INDICES
+        histories = self.pm.provider.fetch_histories(list(indices.values()), period=period)
+        columns = {}
+        for name, symbol in indices.items():
+            hist = histories.get(symbol)
+            if hist is None or 'Close' not in hist:
                 continue
-            lot = self.pm.df[self.pm.df['Stock'] == stock]['Balance'].iloc[0]
-            df = df.copy()
-            df['Value'] = df['Price'] * lot
-            if daily_value is None:
-                daily_value = df[['Date', 'Value']].rename(columns={'Value': stock})
-            else:
-                daily_value = daily_value.merge(df[['Date', 'Value']].rename(columns={'Value': stock}),
-                                                on='Date', how='outer')
-
-        daily_value = daily_value.ffill()
-        daily_value['Portfolio'] = daily_value.drop(columns='Date').sum(axis=1)
-        return daily_value[['Date', 'Portfolio']]
+            close = hist['Close']
+            dates = pd.to_datetime(close.index)
+            if dates.tz is not None:
+                dates = dates.tz_localize(None)
+            columns[name] = pd.Series(close.to_numpy(dtype=float), index=dates.normalize())
+        if not columns:
+            return pd.DataFrame()
+        panel = pd.DataFrame(columns).sort_index()
+        return panel[~panel.index.duplicated(keep='last')]
 
-    def compare_vs_index(self, symbol="^JKSE"):
-        index_df = self.get_index_data(symbol)
+    def compare_vs_indices(self, indices=None, period="3mo"):
+        """
+        Return kumulatif majemuk (%) portofolio dan tiap indeks pada tanggal yang sama:
+        kolom 'Date', 'Portfolio %' dan '<nama> %'
+        """
+        indices = indices if indices is not None else DEFAULT_INDICES
+        return self._compare(tuple(indices.items()), period)
+
+    @versioned_cache(cache_if=lambda result, indices, period: _complete(result, indices))
+    def _compare(self, indices, period):
+        panel = self.get_index_panel(dict(indices), period)
         portfolio_df = self.get_portfolio_history()
-    
-        # Normalize timezones
-        index_df['Date'] = pd.to_datetime(index_df['Date']).dt.tz_localize(None)
-        portfolio_df['Date'] = pd.to_datetime(portfolio_df['Date']).dt.tz_localize(None)
-    
-        df = pd.merge(index_df, portfolio_df, on='Date', how='inner')
-        df['Index %'] = df['Index'].pct_change().fillna(0).cumsum() * 100
-        df['Portfolio %'] = df['Portfolio'].pct_change().fillna(0).cumsum() * 100
+        if panel.empty:
+            return pd.DataFrame(columns=['Date', 'Portfolio %'])
+
+        portfolio = pd.Series(portfolio_df['Portfolio'].to_numpy(),
+                              index=pd.to_datetime(portfolio_df['Date']).dt.tz_localize(None).dt.normalize())
+        panel = panel.reindex(panel.index.union(portfolio.index)).ffill().reindex(portfolio.index)
+        levels = pd.concat([portfolio.rename('Portfolio'), panel], axis=1).dropna()
+        levels = levels[levels['Portfolio'] > 0]
+        if levels.empty:
+            return pd.DataFrame(columns=['Date', 'Portfolio %'] + [f'{c} %' for c in panel.columns])
+
+        values = levels.to_numpy()
+        growth = (values / values[0] - 1) * 100
+        result = pd.DataFrame(growth, columns=[f'{c} %' for c in levels.columns])
+        result.insert(0, 'Date', levels.index)
+        return result
+
+    def compare_vs_index(self, symbol="^JKSE"):
+        df = self.compare_vs_indices({'Index': symbol})
+        if 'Index %' not in df.columns:
+            return pd.DataFrame(columns=['Date', 'Index %', 'Portfolio %'])
         return df[['Date', 'Index %', 'Portfolio %']]
 
-    def performance_metrics(self, df):
+    @staticmethod
+    def _returns(df):
         """
-        Hitung alpha (selisih performa), beta dummy (perbandingan regresi sederhana)
+        Return harian portofolio dan indeks dari kolom kumulatif majemuk
         """
-        if len(df) < 2:
-            return {'Alpha': 0, 'Beta': 0}
+        names = [c[:-2] for c in df.columns if c.endswith(' %') and c != 'Portfolio %']
+        levels = 1 + df[['Portfolio %'] + [f'{n} %' for n in names]].to_numpy(dtype=float) / 100
+        returns = levels[1:] / levels[:-1] - 1
+        return names, returns[:, 0], returns[:, 1:]
 
-        returns_index = df['Index %'].diff().dropna()
-        returns_port = df['Portfolio %'].diff().dropna()
+    def rolling_metrics(self, df, window=20, periods_per_year=TRADING_DAYS):
+        """
+        Beta, alpha, tracking error dan information ratio bergulir terhadap tiap indeks.
+        Kolom MultiIndex (indeks, metrik), index = tanggal akhir jendela.
+        """
+        names, port, index_returns = self._returns(df)
+        if not names or len(port) < window:
+            return pd.DataFrame()
+        stats = rolling_stats(port, index_returns, window, periods_per_year)
+        dates = pd.to_datetime(df['Date']).to_numpy()[window:]
+        frames = {(name, metric): values[:, k] for metric, values in stats.items() for k, name in enumerate(names)}
+        return pd.DataFrame(frames, index=pd.DatetimeIndex(dates, name='Date')).sort_index(axis=1)
+
+    def performance_table(self, df, periods_per_year=TRADING_DAYS):
+        """
+        Metrik sepanjang periode per indeks (satu baris per indeks)
+        """
+        names, port, index_returns = self._returns(df)
+        if not names or len(port) < 2:
+            return pd.DataFrame()
+        stats = rolling_stats(port, index_returns, len(port), periods_per_year)
+        table = pd.DataFrame({metric: values[0] for metric, values in stats.items()}, index=names)
+        table.insert(0, 'Excess Return %', df['Portfolio %'].iloc[-1] - df[[f'{n} %' for n in names]].iloc[-1].to_numpy())
+        table.index.name = 'Index'
+        return table
 
-        # Korelasi (bukan beta sesungguhnya, tapi sebagai estimasi sederhana)
-        correlation = np.corrcoef(returns_index, returns_port)[0, 1]
-        alpha = df['Portfolio %'].iloc[-1] - df['Index %'].iloc[-1]
+    def performance_metrics(self, df, index='Index'):
+        """
+        Alpha (selisih return kumulatif, %), beta regresi, korelasi, tracking error dan
+        information ratio portofolio terhadap satu indeks
+        """
+        if len(df) < 3 or f'{index} %' not in df.columns:
+            return {'Alpha': 0, 'Beta': 0}
 
+        table = self.performance_table(df[['Date', 'Portfolio %', f'{index} %']])
+        row = table.loc[index]
         return {
-            'Alpha': round(alpha, 2),
-            'Correlation (β proxy)': round(correlation, 2)
+            'Alpha': round(float(row['Excess Return %']), 2),
+            'Beta': round(float(row['Beta']), 2),
+            'Jensen Alpha': round(float(row['Alpha']), 4),
+            'Correlation': round(float(row['Correlation']), 2),
+            'Tracking Error': round(float(row['Tracking Error']), 4),
+            'Information Ratio': round(float(row['Information Ratio']), 2),
         }
@@ -0,0 +1,147 @@
+# analysis/covariance.py
+import numpy as np
+import pandas as pd
+
+from utils.lru import LRUCache
+
+METHODS = ('sample', 'ledoit_wolf', 'ewma')
+
+
+class CovarianceEngine:
+    """
+    Estimasi return rata-rata dan kovarians dari panel return PortfolioManager.
+    Metode: 'sample', 'ledoit_wolf' (shrinkage ke constant correlation) dan 'ewma'.
+    Hasil di-cache per (universe, window, method); jika panel hanya bertambah
+    beberapa hari, 'sample' dan 'ewma' diperbarui dengan update rank-one.
+    """
+    def __init__(self, portfolio_manager, ewma_lambda=0.94, maxsize=32):
+        self.pm = portfolio_manager
+        self.ewma_lambda = ewma_lambda
+        self.cache = LRUCache(maxsize)
+
+    @classmethod
+    def shared(cls, portfolio_manager):
+        """
+        Satu engine per PortfolioManager supaya optimizer dan risk analyzer berbagi cache
+        """
+        engine = getattr(portfolio_manager, '_covariance_engine', None)
+        if engine is None:
+            engine = cls(portfolio_manager)
+            portfolio_manager._covariance_engine = engine
+        return engine
+
+    def estimate(self, stocks=None, window=None, method='sample'):
+        """
+        Mengembalikan (mean_returns, cov_matrix) sebagai Series dan DataFrame
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown covariance method: {method}")
+        returns = self.pm.returns_panel()
+        stocks = list(returns.columns if stocks is None else stocks)
+        key = (tuple(stocks), window, method)
+
+        state = self.cache.get(key)
+        if state is None or state['version'] != self.pm.history_version:
+            data = returns[stocks].dropna()
+            state = self._sync(state, data, window, method)
+            self.cache.set(key, state)
+
+        mean = pd.Series(state['mean'], index=stocks)
+        cov = pd.DataFrame(state['cov'], index=stocks, columns=stocks)
+        return mean, cov
+
+    def _sync(self, state, data, window, method):
+        X = data.to_numpy()
+        incremental = (
+            state is not None
+            and method != 'ledoit_wolf'
+            and state['epoch'] == self.pm.history_epoch
+            and state['last_date'] in data.index
+        )
+        if incremental:
+            state = dict(state)
+            for pos in range(data.index.get_loc(state['last_date']) + 1, len(X)):
+                self._add_row(state, X, pos, window, method)
+        else:
+            state = self._build(X, window, method)
+
+        state['epoch'] = self.pm.history_epoch
+        state['version'] = self.pm.history_version
+        state['last_date'] = data.index[-1] if len(data) else None
+        state['mean'] = state['sum'] / state['n'] if state['n'] else np.zeros(X.shape[1])
+        if method == 'sample':
+            n = state['n']
+            state['cov'] = (state['outer'] - np.outer(state['sum'], state['sum']) / n) / (n - 1) if n > 1 \
+                else np.zeros((X.shape[1], X.shape[1]))
+        elif method == 'ewma':
+            state['cov'] = state['outer'] / state['weight'] if state['weight'] else np.zeros((X.shape[1], X.shape[1]))
+        return state
+
+    def _build(self, X, window, method):
+        start = max(0, len(X) - window) if window else 0
+        W = X[start:]
+        state = {'start': start, 'n': len(W), 'sum': W.sum(axis=0)}
+        if method == 'sample':
+            state['outer'] = W.T @ W
+        elif method == 'ewma':
+            # Bobot λ^(umur); kovarians = Σ w·x·x' / Σ w (RiskMetrics, mean nol)
+            weights = self.ewma_lambda ** np.arange(len(W) - 1, -1, -1)
+            state['outer'] = (W * weights[:, None]).T @ W
+            state['weight'] = weights.sum()
+        else:
+            state['cov'] = ledoit_wolf_constant_correlation(W)
+        return state
+
+    def _add_row(self, state, X, pos, window, method):
+        x = X[pos]
+        state['n'] += 1
+        state['sum'] = state['sum'] + x
+        if method == 'sample':
+            state['outer'] = state['outer'] + np.outer(x, x)
+        else:
+            state['outer'] = self.ewma_lambda * state['outer'] + np.outer(x, x)
+            state['weight'] = self.ewma_lambda * state['weight'] + 1
+
+        if window and state['n'] > window:
+            old = X[state['start']]
+            state['start'] += 1
+            state['n'] -= 1
+            state['sum'] = state['sum'] - old
+            if method == 'sample':
+                state['outer'] = state['outer'] - np.outer(old, old)
+            else:
+                decay = self.ewma_lambda ** window
+                state['outer'] = state['outer'] - decay * np.outer(old, old)
+                state['weight'] = state['weight'] - decay
+
+
+def ledoit_wolf_constant_correlation(X):
+    """
+    Shrinkage Ledoit-Wolf (2004) ke target constant correlation
+    """
+    t, n = X.shape
+    if t < 2:
+        return np.zeros((n, n))
+    Xc = X - X.mean(axis=0)
+    sample = Xc.T @ Xc / t
+    var = np.diag(sample)
+    sd = np.sqrt(var)
+    sd_outer = np.outer(sd, sd)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.where(sd_outer > 0, sample / sd_outer, 0.0)
+    r_bar = (corr.sum() - n) / (n * (n - 1)) if n > 1 else 0.0
+    target = r_bar * sd_outer
+    np.fill_diagonal(target, var)
+
+    Y = Xc ** 2
+    pi_mat = Y.T @ Y / t - sample ** 2
+    pi_hat = pi_mat.sum()
+    theta = (Xc ** 3).T @ Xc / t - var[:, None] * sample
+    np.fill_diagonal(theta, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(sd[:, None] > 0, sd[None, :] / sd[:, None], 0.0)
+    rho_hat = np.trace(pi_mat) + r_bar * (ratio * theta).sum()
+    gamma_hat = ((target - sample) ** 2).sum()
+    kappa = (pi_hat - rho_hat) / gamma_hat if gamma_hat > 0 else 0.0
+    delta = min(1.0, max(0.0, kappa / t))
+    return delta * target + (1 - delta) * sample
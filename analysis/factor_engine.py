@@ -0,0 +1,169 @@
+# analysis/factor_engine.py
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.lru import LRUCache
+
+# Faktor bawaan: nama kolom skor -> (kolom sumber, arah). Arah -1 berarti makin kecil makin baik.
+DEFAULT_FACTORS = {
+    'PER Score': ('PER', -1),
+    'PBV Score': ('PBV', -1),
+    'Dividend Score': ('Yield', 1),
+    'ROE Score': ('ROE', 1),
+}
+DEFAULT_WEIGHTS = {name: 0.25 for name in DEFAULT_FACTORS}
+SCALINGS = ('rank', 'zscore', 'minmax')
+
+# Kolom faktor ternormalisasi dibagi antar instance (StockScorer dibuat ulang tiap rerun Streamlit);
+# ganti bobot hanya menghitung ulang perkalian matriks-vektor
+NORMALIZED_CACHE = LRUCache(maxsize=32)
+
+
+def top_k_indices(scores, k):
+    """
+    Posisi `k` skor tertinggi, terurut menurun; seleksi parsial (argpartition) lalu
+    hanya k elemen yang diurutkan. NaN dianggap paling rendah.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(len(scores))
+    return idx[np.argsort(-scores[idx], kind='stable')]
+
+
+def percentile_ranks(X, groups, counts):
+    """
+    Peringkat persentil (0-100, ties dirata-rata) per kolom dalam tiap grup, seluruhnya
+    lewat argsort: urutkan nilai, lalu urutkan stabil per grup sehingga tiap grup menjadi
+    blok berurutan. counts = jumlah nilai non-NaN per (grup, kolom).
+    """
+    n, k = X.shape
+    XT = np.ascontiguousarray(X.T)  # satu faktor per baris agar operasi berjalan di memori berurutan
+    order = np.argsort(XT, axis=1)  # NaN di akhir
+    if counts.shape[0] > 1:
+        order = np.take_along_axis(order, np.argsort(groups[order], axis=1, kind='stable'), axis=1)
+    xs = np.take_along_axis(XT, order, axis=1)
+    gs = groups[order]
+    pos = np.arange(n, dtype=np.float64)
+
+    new_group = np.ones((k, n), dtype=bool)
+    new_group[:, 1:] = gs[:, 1:] != gs[:, :-1]
+    new_run = new_group.copy()
+    new_run[:, 1:] |= xs[:, 1:] != xs[:, :-1]
+    end_run = np.ones((k, n), dtype=bool)
+    end_run[:, :-1] = new_run[:, 1:]
+
+    run_start = np.maximum.accumulate(np.where(new_run, pos, 0), axis=1)
+    run_end = np.minimum.accumulate(np.where(end_run, pos, n)[:, ::-1], axis=1)[:, ::-1]
+    group_start = np.maximum.accumulate(np.where(new_group, pos, 0), axis=1)
+    rank = (run_start + run_end) / 2 - group_start
+    count = counts.T[np.arange(k)[:, None], gs]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(count > 1, rank / (count - 1), 0.5) * 100
+
+    out = np.empty((k, n), dtype=np.float64)
+    np.put_along_axis(out, order, pct, axis=1)
+    return out.T
+
+
+class FactorEngine:
+    """
+    Screening multi-faktor: setiap faktor diskalakan ke 0-100 (100 = terbaik) dengan
+    'rank' (persentil), 'zscore' (z-score setelah winsorizing) atau 'minmax', opsional
+    per sektor (sector-neutral), lalu dijumlahkan berbobot.
+    """
+    def __init__(self, df, factors=None, scaling='rank', sector_neutral=False,
+                 sector_col='Sector', winsor=(0.01, 0.99)):
+        if scaling not in SCALINGS:
+            raise ValueError(f"Unknown scaling: {scaling}")
+        factors = factors if factors is not None else DEFAULT_FACTORS
+        self.factors = {name: spec for name, spec in factors.items() if spec[0] in df.columns}
+        self.missing = [name for name in factors if name not in self.factors]
+        self.scaling = scaling
+        self.sector_neutral = sector_neutral and sector_col in df.columns
+        self.winsor = winsor
+        self.names = list(self.factors)
+        self._normalized = None
+
+        raw = np.empty((len(df), len(self.names)), dtype=np.float64, order='F')
+        for j, name in enumerate(self.names):
+            column, direction = self.factors[name]
+            raw[:, j] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            if direction < 0:
+                raw[:, j] *= -1
+        self.raw = raw
+        if self.sector_neutral:
+            self.groups = pd.factorize(df[sector_col], use_na_sentinel=False)[0]
+        else:
+            self.groups = np.zeros(len(df), dtype=np.intp)
+
+    def fingerprint(self):
+        digest = hashlib.sha1(self.raw.tobytes())
+        digest.update(self.groups.tobytes())
+        digest.update(repr((self.names, self.scaling, self.winsor)).encode())
+        return digest.hexdigest()
+
+    def normalized(self):
+        """
+        Matriks faktor ternormalisasi (baris x faktor, 0-100, NaN -> 0), di-cache per data & skala
+        """
+        if self._normalized is None:
+            key = self.fingerprint()
+            cached = NORMALIZED_CACHE.get(key)
+            if cached is None:
+                cached = self._scale()
+                cached.flags.writeable = False
+                NORMALIZED_CACHE.set(key, cached)
+            self._normalized = cached
+        return self._normalized
+
+    def score(self, weights=None):
+        weights = weights if weights is not None else DEFAULT_WEIGHTS
+        w = np.array([weights.get(name, 0.0) for name in self.names], dtype=np.float64)
+        total = w.sum()
+        if not len(w) or total == 0:
+            return np.zeros(len(self.raw))
+        return self.normalized() @ (w / total)
+
+    def top(self, k, weights=None, mask=None):
+        """
+        Posisi baris k skor tertinggi (opsional hanya baris dengan mask True) beserta skornya
+        """
+        scores = self.score(weights)
+        if mask is not None:
+            scores = np.where(mask, scores, np.nan)
+            k = min(k, int(np.count_nonzero(mask)))
+        idx = top_k_indices(scores, k)
+        return idx, scores[idx]
+
+    def _scale(self):
+        frame = pd.DataFrame(self.raw)
+        grouped = frame.groupby(self.groups, sort=False)
+
+        def per_row(stats):
+            # groups sudah berupa kode 0..g-1 berurutan kemunculan, sama dengan urutan sort=False
+            return stats.to_numpy(dtype=np.float64)[self.groups]
+
+        if self.scaling == 'rank':
+            scaled = percentile_ranks(self.raw, self.groups, grouped.count().to_numpy())
+        elif self.scaling == 'zscore':
+            lo, hi = self.winsor
+            clipped = np.clip(self.raw, per_row(grouped.quantile(lo)), per_row(grouped.quantile(hi)))
+            grouped = pd.DataFrame(clipped).groupby(self.groups, sort=False)
+            mean, std = per_row(grouped.mean()), per_row(grouped.std(ddof=0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z = np.where(std > 0, (clipped - mean) / std, 0.0)
+            # z = ±3 dipetakan ke 0/100 agar sebanding dengan skala lain
+            scaled = np.clip(50 + z * (50 / 3), 0, 100)
+        else:
+            low, high = per_row(grouped.min()), per_row(grouped.max())
+            scaled = (self.raw - low) / (high - low + 1e-9) * 100
+
+        scaled = np.where(np.isnan(self.raw), 0.0, scaled)
+        return np.asfortranarray(scaled)
@@ -0,0 +1,80 @@
+# analysis/forecast_models.py
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.lru import LRUCache
+
+FEATURES = ['Days', 'MA7', 'MA30']
+
+DEFAULT_PARAMS = {
+    'rf': {'n_estimators': 100, 'random_state': 42},
+    'ridge': {'alpha': 1.0},
+}
+
+# Dibagi antar instance PortfolioAnalyzer (yang dibuat ulang tiap rerun Streamlit)
+MODEL_CACHE = LRUCache(maxsize=512)
+
+
+def build_features(prices):
+    """
+    Fitur MA7/MA30 dan jumlah hari dari Series harga ber-index tanggal
+    """
+    data = pd.DataFrame({'Date': prices.index, 'Price': prices.to_numpy()})
+    data['Days'] = (data['Date'] - data['Date'].min()).dt.days
+    data['MA7'] = data['Price'].rolling(window=7).mean()
+    data['MA30'] = data['Price'].rolling(window=30).mean()
+    return data.dropna()
+
+
+def data_fingerprint(prices):
+    digest = hashlib.sha1(prices.to_numpy().tobytes())
+    digest.update(prices.index.asi8.tobytes())
+    return digest.hexdigest()
+
+
+def model_params(kind, params=None):
+    if kind not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown forecast model: {kind}")
+    return {**DEFAULT_PARAMS[kind], **(params or {})}
+
+
+def make_model(kind, params):
+    # sklearn baru dimuat saat model pertama dilatih agar cold start tetap ringan
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if kind == 'ridge':
+        from sklearn.linear_model import Ridge
+        return make_pipeline(StandardScaler(), Ridge(**params))
+
+    from sklearn.ensemble import RandomForestRegressor
+    return make_pipeline(StandardScaler(), RandomForestRegressor(**params))
+
+
+def fit_model(args):
+    """
+    Melatih satu model; fungsi level modul agar bisa dijalankan di process pool
+    """
+    X, y, kind, params = args
+    model = make_model(kind, params)
+    model.fit(X, y)
+    return model
+
+
+def cache_key(stock, fingerprint, kind, params):
+    return (stock, fingerprint, kind, tuple(sorted(params.items())))
+
+
+def forecast(model, data, days):
+    last_date = data['Date'].iloc[-1]
+    first_date = data['Date'].min()
+    future_dates = [last_date + pd.Timedelta(days=i) for i in range(1, days + 1)]
+    future_X = pd.DataFrame({
+        'Days': [(fd - first_date).days for fd in future_dates],
+        'MA7': np.full(days, data['MA7'].iloc[-1]),
+        'MA30': np.full(days, data['MA30'].iloc[-1]),
+    })
+    predictions = model.predict(future_X)
+    return future_dates, predictions, predictions[-1]
@@ -0,0 +1,144 @@
+# analysis/lot_allocation.py
+import numpy as np
+
+LOT_SIZE = 100
+# Penalti per proporsi kas yang tidak terinvestasi, ditambahkan ke jumlah kuadrat deviasi bobot
+CASH_PENALTY = 0.1
+# Batas node branch-and-bound: MAX_NODES untuk batch, INTERACTIVE_MAX_NODES untuk jalur UI
+MAX_NODES = 200_000
+INTERACTIVE_MAX_NODES = 20_000
+NODE_LIMIT_SOLVER = 'best found (node limit)'
+
+
+def objective(lots, lot_cost, weights, budget, cash_penalty=CASH_PENALTY):
+    """
+    Jumlah kuadrat deviasi bobot aktual (nilai / budget) dari target, ditambah penalti kas sisa.
+    lots boleh 2D (satu baris per budget) dengan budget berupa kolom.
+    """
+    value = lots * lot_cost
+    deviation = value / budget - weights
+    leftover = 1 - value.sum(axis=-1, keepdims=True) / budget
+    return (deviation ** 2).sum(axis=-1) + cash_penalty * leftover[..., 0]
+
+
+def greedy_lots(lot_cost, weights, budgets, cash_penalty=CASH_PENALTY):
+    """
+    Heuristik greedy-with-repair untuk banyak budget sekaligus (baris = budget).
+    Mulai dari pembulatan terdekat target, buang lot dengan kerugian terkecil selama
+    melebihi budget (repair), lalu tambah lot dengan perbaikan terbesar yang masih muat.
+    Setiap iterasi memproses semua budget secara vektor.
+    """
+    budgets = np.asarray(budgets, dtype=np.float64).reshape(-1, 1)
+    lot_cost = np.asarray(lot_cost, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    rows = np.arange(len(budgets))
+    unit = lot_cost / budgets  # proporsi budget per lot
+    lots = np.maximum(np.rint(weights * budgets / lot_cost), 0)
+
+    # Repair: hapus lot yang paling sedikit menambah deviasi sampai masuk budget
+    while True:
+        spent = lots @ lot_cost
+        over = spent > budgets[:, 0] + 1e-6
+        if not over.any():
+            break
+        gap = lots * unit - weights
+        cost = np.where(lots > 0, unit * (unit - 2 * gap) + cash_penalty * unit, np.inf)
+        j = np.argmin(cost, axis=1)
+        lots[rows[over], j[over]] -= 1
+
+    # Isi: tambah lot dengan penurunan objective terbesar yang masih terjangkau
+    while True:
+        cash = budgets[:, 0] - lots @ lot_cost
+        gap = lots * unit - weights
+        gain = np.where(lot_cost <= cash[:, None] + 1e-6, unit * (2 * gap + unit) - cash_penalty * unit, np.inf)
+        j = np.argmin(gain, axis=1)
+        improve = gain[rows, j] < -1e-12
+        if not improve.any():
+            break
+        lots[rows[improve], j[improve]] += 1
+    return lots.astype(np.int64)
+
+
+def relaxed_bound(weights, cash, cash_penalty=CASH_PENALTY):
+    """
+    Batas bawah objective (tanpa konstanta) untuk saham `weights` bila lot boleh pecahan:
+    minimasi sum((y - w)^2 - penalti * y) dengan sum(y) <= cash (proporsi budget), y >= 0.
+    Solusinya y = max(0, w + t) (water-filling); vektor terhadap array `cash`.
+    """
+    cash = np.atleast_1d(np.asarray(cash, dtype=np.float64))
+    if len(weights) == 0:
+        return np.zeros(len(cash))
+    w = np.sort(np.asarray(weights, dtype=np.float64))[::-1]
+    free = w + cash_penalty / 2
+    k = np.arange(1, len(w) + 1)
+    t = (cash[:, None] - np.cumsum(w)) / k
+    active = (w + t > 0).sum(axis=1)  # jumlah saham aktif = k terbesar yang valid
+    t = np.where(active > 0, t[np.arange(len(cash)), np.maximum(active, 1) - 1], -np.inf)
+    shift = np.minimum(t, cash_penalty / 2)[:, None]  # budget longgar: y = w + penalti/2
+    y = np.maximum(w + shift, 0)
+    y = np.where(free.sum() <= cash[:, None], free, y)
+    return ((y - w) ** 2 - cash_penalty * y).sum(axis=1)
+
+
+def exact_lots(lot_cost, weights, budget, cash_penalty=CASH_PENALTY, max_nodes=MAX_NODES):
+    """
+    Branch-and-bound eksak untuk universe kecil. Tiap nilai lot kandidat diberi batas bawah
+    = suku objective saham itu + relaksasi kontinu saham sisanya dengan kas tersisa;
+    kandidat dikunjungi dari batas terendah dan dipangkas begitu melewati incumbent
+    (solusi greedy di awal). Jika node melebihi max_nodes, solusi terbaik yang ditemukan
+    dikembalikan (flag exact=False).
+    """
+    lot_cost = np.asarray(lot_cost, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    n = len(lot_cost)
+    unit = lot_cost / budget
+    best = greedy_lots(lot_cost, weights, [budget], cash_penalty)[0]
+    best_value = float(objective(best, lot_cost, weights, budget, cash_penalty)) - cash_penalty
+
+    current = np.zeros(n, dtype=np.int64)
+    nodes = 0
+    exact = True
+
+    def search(i, cash, partial):
+        # cash dan partial dalam proporsi budget; objective tanpa konstanta penalti
+        nonlocal best, best_value, nodes, exact
+        if nodes >= max_nodes:
+            exact = False
+            return
+        nodes += 1
+        if i == n:
+            if partial < best_value - 1e-15:
+                best_value = partial
+                best = current.copy()
+            return
+        xs = np.arange(int(np.floor(cash / unit[i] + 1e-9)) + 1)
+        terms = (xs * unit[i] - weights[i]) ** 2 - cash_penalty * xs * unit[i]
+        bounds = partial + terms + relaxed_bound(weights[i + 1:], cash - xs * unit[i], cash_penalty)
+        order = np.argsort(bounds, kind='stable')
+        for j in order.tolist():
+            if bounds[j] >= best_value - 1e-15:
+                break
+            current[i] = xs[j]
+            search(i + 1, cash - xs[j] * unit[i], partial + terms[j])
+        current[i] = 0
+
+    search(0, 1.0, 0.0)
+    return np.asarray(best, dtype=np.int64), exact
+
+
+def allocate_lots(prices, weights, budget, lot_size=LOT_SIZE, exact_limit=8, cash_penalty=CASH_PENALTY,
+                  max_nodes=MAX_NODES):
+    """
+    Jumlah lot per saham untuk satu budget. Universe kecil (<= exact_limit saham)
+    diselesaikan eksak (dibatasi max_nodes), selebihnya greedy-with-repair.
+    Mengembalikan (lots, solver); solver NODE_LIMIT_SOLVER berarti pencarian eksak
+    dihentikan dan hasilnya solusi terbaik yang ditemukan (tidak lebih buruk dari greedy).
+    """
+    lot_cost = np.asarray(prices, dtype=np.float64) * lot_size
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(lot_cost) == 0 or budget <= 0:
+        return np.zeros(len(lot_cost), dtype=np.int64), 'none'
+    if len(lot_cost) <= exact_limit:
+        lots, exact = exact_lots(lot_cost, weights, budget, cash_penalty, max_nodes)
+        return lots, 'exact' if exact else NODE_LIMIT_SOLVER
+    return greedy_lots(lot_cost, weights, [budget], cash_penalty)[0], 'greedy'
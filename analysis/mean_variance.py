@@ -0,0 +1,189 @@
+# analysis/mean_variance.py
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+class MeanVarianceEngine:
+    """
+    Optimasi mean-variance pada array numpy dengan gradien analitik (SLSQP).
+    Mendukung min volatilitas, max Sharpe, target return, batas bobot per saham
+    dan batas bobot per sektor.
+    """
+    def __init__(self, mean_returns, cov_matrix, max_weight=1.0, sectors=None, sector_caps=None,
+                 risk_free=0.0, labels=None):
+        self.mu = np.asarray(mean_returns, dtype=float)
+        self.cov = np.ascontiguousarray(cov_matrix, dtype=float)
+        self.n = len(self.mu)
+        self.risk_free = risk_free
+        self.labels = list(labels) if labels is not None else list(range(self.n))
+        self._return_range = None
+        # Variance harian sangat kecil; diskalakan agar toleransi SLSQP tetap bermakna
+        diag_mean = float(np.mean(np.diag(self.cov))) if self.n else 0.0
+        self._scale = 1.0 / diag_mean if diag_mean > 0 else 1.0
+
+        caps = np.broadcast_to(np.asarray(max_weight, dtype=float), (self.n,))
+        self.bounds = [(0.0, float(cap)) for cap in caps]
+
+        self.sector_matrix = None
+        self.sector_limits = None
+        if sector_caps:
+            sectors = np.asarray(sectors)
+            names = [name for name in sector_caps if np.any(sectors == name)]
+            self.sector_matrix = np.array([(sectors == name).astype(float) for name in names]).reshape(-1, self.n)
+            self.sector_limits = np.array([sector_caps[name] for name in names], dtype=float)
+
+    def performance(self, weights):
+        ret = float(self.mu @ weights)
+        vol = float(np.sqrt(max(weights @ self.cov @ weights, 0.0)))
+        return ret, vol
+
+    def min_volatility(self, w0=None):
+        return self._solve(self._variance, w0, self._constraints())
+
+    def max_sharpe(self, w0=None):
+        """
+        Max Sharpe lewat bentuk konveks: min y'Σy dengan (μ - rf)'y = 1, lalu w = y / Σy.
+        Batas bobot w_i <= c menjadi batas linear c·Σy - y_i >= 0.
+        """
+        excess = self.mu - self.risk_free
+        if not np.any(excess > 0):
+            return self.min_volatility(w0)
+
+        caps = np.array([high for _, high in self.bounds])
+        constraints = [{'type': 'eq', 'fun': lambda y: excess @ y - 1, 'jac': lambda y: excess}]
+        capped = caps < 1.0
+        if capped.any():
+            C = np.outer(caps[capped], np.ones(self.n)) - np.eye(self.n)[capped]
+            constraints.append({'type': 'ineq', 'fun': lambda y: C @ y, 'jac': lambda y: C})
+        if self.sector_matrix is not None:
+            S = np.outer(self.sector_limits, np.ones(self.n)) - self.sector_matrix
+            constraints.append({'type': 'ineq', 'fun': lambda y: S @ y, 'jac': lambda y: S})
+
+        from scipy.optimize import minimize
+
+        w0 = np.full(self.n, 1.0 / self.n) if w0 is None else np.asarray(w0, dtype=float)
+        if excess @ w0 <= 0:
+            w0 = (excess > 0) / np.count_nonzero(excess > 0)
+        y0 = w0 / (excess @ w0)
+        result = minimize(self._variance, y0, jac=True, method='SLSQP',
+                          bounds=[(0.0, None)] * self.n, constraints=constraints)
+        y = np.clip(result.x, 0.0, None)
+        return self._result(y / y.sum(), result.success)
+
+    def target_return(self, target, w0=None):
+        """
+        Volatilitas minimum untuk return harian `target`; target harus berada di antara
+        min_return() dan max_return() (batas bobot ikut dihitung), di luar itu SLSQP tidak
+        punya solusi layak. Hasil dengan success=False tetap dikembalikan; pemanggil yang
+        memutuskan.
+        """
+        if target is None:
+            raise ValueError("target_return membutuhkan target return harian")
+        low, high = self.return_range()
+        tol = 1e-9 * max(high - low, 1e-12)
+        if not low - tol <= target <= high + tol:
+            raise ValueError(f"Target return {target:.6f} di luar rentang yang bisa dicapai "
+                             f"[{low:.6f}, {high:.6f}] dengan batas bobot saat ini")
+        return self._solve(self._variance, w0, self._constraints(target))
+
+    def max_return(self):
+        """
+        Return tertinggi yang masih memenuhi semua batas bobot (LP)
+        """
+        return self.return_range()[1]
+
+    def min_return(self):
+        """
+        Return terendah yang masih memenuhi semua batas bobot (LP)
+        """
+        return self.return_range()[0]
+
+    def return_range(self):
+        """
+        (return terendah, return tertinggi) portofolio yang memenuhi semua batas bobot,
+        dihitung sekali per engine
+        """
+        if self._return_range is None:
+            self._return_range = (self._extreme_return(1.0), self._extreme_return(-1.0))
+        return self._return_range
+
+    def _extreme_return(self, sign):
+        # sign 1 meminimalkan return, -1 memaksimalkan
+        from scipy.optimize import linprog
+
+        res = linprog(sign * self.mu, A_ub=self.sector_matrix, b_ub=self.sector_limits,
+                      A_eq=np.ones((1, self.n)), b_eq=[1.0], bounds=self.bounds, method='highs')
+        if not res.success:
+            return float(self.mu.min() if sign > 0 else self.mu.max())
+        return float(self.mu @ res.x)
+
+    def efficient_frontier(self, n_points=20, processes=None):
+        """
+        Menyelesaikan deretan target return dengan warm start dari titik sebelumnya.
+        processes > 1 membagi deretan target ke beberapa proses.
+        """
+        start = self.min_volatility()
+        targets = np.linspace(start['return'], self.max_return(), n_points)
+
+        if processes and processes > 1 and n_points > processes:
+            chunks = [c for c in np.array_split(targets, processes) if len(c)]
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                parts = pool.map(_solve_frontier_chunk, [(self, chunk, start['weights']) for chunk in chunks])
+                results = [r for part in parts for r in part]
+        else:
+            results = _solve_frontier_chunk((self, targets, start['weights']))
+
+        frontier = pd.DataFrame({
+            'Target Return': targets,
+            'Return': [r['return'] for r in results],
+            'Volatility': [r['volatility'] for r in results],
+            'Sharpe': [r['sharpe'] for r in results],
+        })
+        weights = pd.DataFrame(np.array([r['weights'] for r in results]), columns=self.labels)
+        return pd.concat([frontier, weights], axis=1)
+
+    def _constraints(self, target=None):
+        # Dibangun per panggilan agar engine tetap bisa di-pickle ke process pool
+        constraints = [{'type': 'eq', 'fun': lambda w: np.sum(w) - 1, 'jac': lambda w: np.ones_like(w)}]
+        if self.sector_matrix is not None:
+            A, b = self.sector_matrix, self.sector_limits
+            constraints.append({'type': 'ineq', 'fun': lambda w: b - A @ w, 'jac': lambda w: -A})
+        if target is not None:
+            constraints.append({'type': 'eq', 'fun': lambda w: self.mu @ w - target, 'jac': lambda w: self.mu})
+        return constraints
+
+    def _variance(self, w):
+        cov_w = self.cov @ w * self._scale
+        return w @ cov_w, 2 * cov_w
+
+    def _solve(self, objective, w0, constraints):
+        # scipy baru dimuat saat optimasi pertama agar cold start tetap ringan
+        from scipy.optimize import minimize
+
+        if w0 is None:
+            w0 = np.full(self.n, 1.0 / self.n)
+        result = minimize(objective, w0, jac=True, method='SLSQP',
+                          bounds=self.bounds, constraints=constraints)
+        return self._result(np.clip(result.x, 0.0, None), result.success)
+
+    def _result(self, weights, success):
+        ret, vol = self.performance(weights)
+        return {
+            'weights': weights,
+            'return': ret,
+            'volatility': vol,
+            'sharpe': (ret - self.risk_free) / vol if vol > 0 else 0.0,
+            'success': bool(success),
+        }
+
+
+def _solve_frontier_chunk(args):
+    engine, targets, w0 = args
+    results = []
+    for target in targets:
+        result = engine.target_return(target, w0)
+        results.append(result)
+        w0 = result['weights']
+    return results
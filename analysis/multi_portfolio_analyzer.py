@@ -0,0 +1,163 @@
+# analysis/multi_portfolio_analyzer.py
+import numpy as np
+import pandas as pd
+
+from .benchmark import TRADING_DAYS
+from .risk_analyzer import SECTOR_MAP
+from utils.memo import versioned_cache
+
+
+class MultiPortfolioAnalyzer:
+    """
+    Ringkasan, P&L, eksposur sektor dan risiko untuk semua akun MultiPortfolioManager
+    sekaligus. Agregasi per akun memakai bincount atas kode akun; deret waktu per akun
+    dihitung sebagai perkalian matriks sparse akun x instrumen dengan panel bersama.
+    """
+    def __init__(self, portfolio_manager):
+        self.pm = portfolio_manager
+
+    def _per_account(self, values):
+        return np.bincount(self.pm.account_codes(), values, minlength=len(self.pm.accounts))
+
+    @versioned_cache()
+    def account_summary(self):
+        """
+        Satu baris per akun: jumlah posisi, modal, nilai pasar, unrealized, return dan porsi AUM
+        """
+        df = self.pm.positions()
+        invested = self._per_account(df['Stock Value'].to_numpy(dtype=float))
+        market_value = self._per_account(df['Market Value'].to_numpy(dtype=float))
+        unrealized = market_value - invested
+        total = market_value.sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return_pct = np.where(invested != 0, unrealized / invested * 100, 0.0)
+            share = market_value / total * 100 if total else np.zeros_like(market_value)
+        return pd.DataFrame({
+            'Positions': np.bincount(self.pm.account_codes(), minlength=len(self.pm.accounts)),
+            'Total Invested': invested,
+            'Market Value': market_value,
+            'Unrealized': unrealized,
+            'Return %': return_pct,
+            'AUM %': share,
+        }, index=pd.Index(self.pm.accounts, name='Account'))
+
+    def portfolio_summary(self):
+        """
+        Total semua akun dengan kunci yang sama seperti PortfolioAnalyzer.portfolio_summary
+        """
+        summary = self.account_summary()
+        invested = summary['Total Invested'].sum()
+        unrealized = summary['Unrealized'].sum()
+        return {
+            'total_invested': invested,
+            'total_market_value': summary['Market Value'].sum(),
+            'total_unrealized': unrealized,
+            'return_pct': unrealized / invested * 100 if invested else 0,
+            'accounts': len(summary),
+        }
+
+    @versioned_cache()
+    def position_pnl(self):
+        """
+        Posisi semua akun dengan return per posisi dan bobot terhadap nilai pasar akunnya
+        """
+        df = self.pm.positions().copy()
+        account_value = self._per_account(df['Market Value'].to_numpy(dtype=float))[self.pm.account_codes()]
+        cost = df['Stock Value'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['Return %'] = np.where(cost != 0, df['Unrealized'].to_numpy(dtype=float) / cost * 100, 0.0)
+            df['Weight %'] = np.where(account_value != 0, df['Market Value'].to_numpy(dtype=float) / account_value * 100,
+                                      0.0)
+        return df
+
+    def sector_labels(self):
+        """
+        Sektor per instrumen: kolom Sector bila ada, selain itu peta sektor bawaan, lalu 'Other'
+        """
+        instruments = self.pm.instruments
+        sectors = instruments['Sector']
+        fallback = instruments['Stock'].map(SECTOR_MAP)
+        return sectors.where(sectors.notna(), fallback).fillna('Other')
+
+    @versioned_cache()
+    def sector_exposure(self):
+        """
+        Persentase nilai pasar per sektor untuk tiap akun (baris akun, kolom sektor)
+        """
+        sector_codes, sectors = pd.factorize(self.sector_labels(), sort=True)
+        n_accounts, n_sectors = len(self.pm.accounts), len(sectors)
+        key = self.pm.account_codes().astype(np.int64) * n_sectors + sector_codes[self.pm.instrument_codes()]
+        values = np.bincount(key, self.pm.positions()['Market Value'].to_numpy(dtype=float),
+                             minlength=n_accounts * n_sectors).reshape(n_accounts, n_sectors)
+        totals = values.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(totals > 0, values / totals * 100, 0.0)
+        return pd.DataFrame(percent, index=pd.Index(self.pm.accounts, name='Account'),
+                            columns=pd.Index(sectors, name='Sector'))
+
+    def concentration_score(self):
+        """
+        Indeks konsentrasi sektor (HHI, sama seperti RiskAnalyzer) per akun
+        """
+        shares = self.sector_exposure().to_numpy() / 100
+        return pd.Series(np.round((shares ** 2).sum(axis=1) * 100, 2), index=self.sector_exposure().index,
+                         name='Concentration')
+
+    @versioned_cache()
+    def value_history(self):
+        """
+        Nilai pasar harian tiap akun (tanggal x akun) dengan saldo saat ini
+        """
+        prices = self.pm.price_panel()
+        values = np.nan_to_num(prices.ffill().to_numpy())
+        history = self.pm.exposure_matrix('Balance') @ values.T
+        return pd.DataFrame(np.asarray(history).T, index=prices.index, columns=self.pm.accounts)
+
+    @versioned_cache()
+    def account_returns(self):
+        """
+        Return harian tiap akun (tanggal x akun) dengan bobot nilai pasar saat ini
+        """
+        exposure = self.pm.exposure_matrix('Market Value')
+        totals = np.asarray(exposure.sum(axis=1)).ravel()
+        scale = np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)
+        weights = exposure.multiply(scale[:, None]).tocsr()
+        returns = self.pm.returns_panel()
+        account_returns = weights @ returns.to_numpy().T
+        return pd.DataFrame(np.asarray(account_returns).T, index=returns.index, columns=self.pm.accounts)
+
+    @versioned_cache()
+    def risk_table(self, confidence=0.95, window=None, periods_per_year=TRADING_DAYS):
+        """
+        Volatilitas (harian dan tahunan), VaR dan CVaR historis 1 hari per akun, dalam persen
+        dan rupiah dari nilai pasar akun saat ini
+        """
+        returns = self.account_returns()
+        if window:
+            returns = returns.iloc[-window:]
+        values = returns.to_numpy()
+        market_value = self.account_summary()['Market Value'].to_numpy()
+        if len(values) < 2:
+            return pd.DataFrame(index=pd.Index(self.pm.accounts, name='Account'))
+
+        volatility = values.std(axis=0, ddof=1)
+        losses = -values
+        var = np.quantile(losses, confidence, axis=0)
+        tail = losses >= var
+        cvar = (losses * tail).sum(axis=0) / np.maximum(tail.sum(axis=0), 1)
+        return pd.DataFrame({
+            'Volatility %': volatility * 100,
+            'Annual Volatility %': volatility * np.sqrt(periods_per_year) * 100,
+            'VaR %': var * 100,
+            'CVaR %': cvar * 100,
+            'VaR': var * market_value,
+            'CVaR': cvar * market_value,
+        }, index=pd.Index(self.pm.accounts, name='Account'))
+
+    def risk_report(self, confidence=0.95, window=None):
+        return {
+            'summary': self.account_summary(),
+            'sector_exposure': self.sector_exposure(),
+            'concentration_score': self.concentration_score(),
+            'risk': self.risk_table(confidence, window),
+        }
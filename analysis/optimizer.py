@@ -1,57 +1,86 @@
 # analysis/optimizer.py
 import pandas as pd
 import numpy as np
-from scipy.optimize import minimize
+from .covariance import CovarianceEngine
+from .mean_variance import MeanVarianceEngine
+from .risk_analyzer import SECTOR_MAP
+from utils.memo import versioned_cache
 
 class PortfolioOptimizer:
-    def __init__(self, portfolio_manager):
+    def __init__(self, portfolio_manager, cov_method='auto', window=None):
         self.pm = portfolio_manager
-        self.sim_data = self.pm.simulated_data
+        self.cov_engine = CovarianceEngine.shared(portfolio_manager)
+        self.cov_method = cov_method
+        self.window = window
+
+    def held_stocks(self):
+        """
+        Saham yang dimiliki dan punya histori harga, dalam urutan panel
+        """
+        panel = self.pm.price_panel()
+        return list(panel.columns[panel.columns.isin(self.pm.df['Stock'])])
 
     def get_returns_cov_matrix(self):
-        returns_df = pd.DataFrame()
-        for stock, data in self.sim_data.items():
-            if stock not in self.pm.df['Stock'].values:
-                continue
-            prices = data.set_index('Date')['Price']
-            returns_df[stock] = prices.pct_change()
-        returns_df = returns_df.dropna()
-        mean_returns = returns_df.mean()
-        cov_matrix = returns_df.cov()
-        return mean_returns, cov_matrix
+        stocks = self.held_stocks()
+        method = self.cov_method
+        if method == 'auto':
+            # Kovarians sampel singular jika observasi tidak lebih banyak dari jumlah saham
+            n_obs = min(len(self.pm.returns_panel()), self.window or np.inf)
+            method = 'sample' if n_obs > len(stocks) else 'ledoit_wolf'
+        return self.cov_engine.estimate(stocks, window=self.window, method=method)
 
     def portfolio_performance(self, weights, mean_returns, cov_matrix):
         ret = np.dot(weights, mean_returns)
         vol = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
         return ret, vol
 
-    def optimize_weights(self):
-        stocks = list(self.pm.df['Stock'])
+    def build_engine(self, max_weight=1.0, sector_caps=None, risk_free=0.0):
         mean_returns, cov_matrix = self.get_returns_cov_matrix()
+        sectors = None
+        if sector_caps:
+            sectors = self.sector_labels().reindex(mean_returns.index).to_numpy()
+        return MeanVarianceEngine(mean_returns.to_numpy(), cov_matrix.to_numpy(), max_weight=max_weight,
+                                  sectors=sectors, sector_caps=sector_caps, risk_free=risk_free,
+                                  labels=mean_returns.index)
 
-        num_assets = len(stocks)
-        args = (mean_returns, cov_matrix)
-        constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-        bounds = tuple((0, 1) for _ in range(num_assets))
-        initial_weights = num_assets * [1. / num_assets, ]
+    def sector_labels(self):
+        if 'Sector' in self.pm.df.columns:
+            return self.pm.df.drop_duplicates('Stock').set_index('Stock')['Sector']
+        return pd.Series(SECTOR_MAP)
 
-        result = minimize(
-            lambda x: self.portfolio_performance(x, *args)[1],  # minimize volatility
-            initial_weights, method='SLSQP', bounds=bounds, constraints=constraints)
+    def optimize_weights(self, objective='min_volatility', target_return=None, max_weight=1.0,
+                         sector_caps=None, risk_free=0.0):
+        """
+        objective: 'min_volatility', 'max_sharpe' atau 'target_return' (butuh target_return harian).
+        ValueError bila solver tidak menemukan solusi (bobotnya tidak optimal).
+        """
+        engine = self.build_engine(max_weight, sector_caps, risk_free)
+        if objective == 'max_sharpe':
+            result = engine.max_sharpe()
+        elif objective == 'target_return':
+            result = engine.target_return(target_return)
+        else:
+            result = engine.min_volatility()
+        if not result['success']:
+            raise ValueError(f"Optimasi '{objective}' gagal konvergen; bobot tidak bisa dipakai")
+        return dict(zip(engine.labels, result['weights'])), result['volatility']
 
-        return dict(zip(stocks, result.x)), result.fun
+    def efficient_frontier(self, n_points=20, max_weight=1.0, sector_caps=None, processes=None):
+        engine = self.build_engine(max_weight, sector_caps)
+        return engine.efficient_frontier(n_points, processes=processes)
 
     def current_weights(self):
         total_mv = self.pm.df['Market Value'].sum()
         return dict(zip(self.pm.df['Stock'], self.pm.df['Market Value'] / total_mv))
 
-    def rebalance_recommendation(self):
+    @versioned_cache(attrs=('cov_method', 'window'))
+    def rebalance_recommendation(self, **kwargs):
         current = self.current_weights()
-        optimal, opt_risk = self.optimize_weights()
+        optimal, opt_risk = self.optimize_weights(**kwargs)
         df = pd.DataFrame({
             'Stock': list(current.keys()),
             'Current Weight': list(current.values()),
-            'Optimal Weight': [optimal[s] for s in current.keys()]
+            'Optimal Weight': [optimal.get(s, 0.0) for s in current.keys()]
         })
         df['Change %'] = (df['Optimal Weight'] - df['Current Weight']) * 100
         return df.sort_values(by='Change %', ascending=False), opt_risk
@@ -1,15 +1,17 @@
 # analysis/portfolio_analyzer.py
 import pandas as pd
 import numpy as np
-from datetime import timedelta
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import make_pipeline
+from concurrent.futures import ProcessPoolExecutor
+from .forecast_models import (FEATURES, MODEL_CACHE, build_features, cache_key, data_fingerprint,
+                              fit_model, forecast, model_params)
+from .recommendation_engine import RecommendationEngine
+from utils.memo import versioned_cache
 
 
 class PortfolioAnalyzer:
-    def __init__(self, portfolio_manager):
+    def __init__(self, portfolio_manager, model_cache=None):
         self.pm = portfolio_manager
+        self.model_cache = model_cache if model_cache is not None else MODEL_CACHE
 
     def portfolio_summary(self):
         df = self.pm.df
@@ -25,39 +27,62 @@ class PortfolioAnalyzer:
             'return_pct': return_pct
         }
 
-    def predict_price(self, stock, days=30):
-        if stock not in self.pm.simulated_data:
+    def predict_price(self, stock, days=30, model='rf', **params):
+        """
+        Prediksi harga dengan fitur MA7/MA30. model='rf' (RandomForest) atau 'ridge'
+        (ringan, untuk interaktif). Model terlatih di-cache per (saham, data, parameter).
+        """
+        panel = self.pm.price_panel()
+        if stock not in panel.columns:
             return None, None, None
 
-        data = self.pm.simulated_data[stock].copy()
-        data['Days'] = (data['Date'] - data['Date'].min()).dt.days
-        data['MA7'] = data['Price'].rolling(window=7).mean()
-        data['MA30'] = data['Price'].rolling(window=30).mean()
-        data = data.dropna()
-
-        X = data[['Days', 'MA7', 'MA30']]
-        y = data['Price']
-
-        model = make_pipeline(StandardScaler(), RandomForestRegressor(n_estimators=100, random_state=42))
-        model.fit(X, y)
-
-        last_date = data['Date'].iloc[-1]
-        future_dates = [last_date + timedelta(days=i) for i in range(1, days + 1)]
-        future_days = [(fd - data['Date'].min()).days for fd in future_dates]
-
-        last_ma7 = data['MA7'].iloc[-1]
-        last_ma30 = data['MA30'].iloc[-1]
-        future_ma7 = [last_ma7] * days
-        future_ma30 = [last_ma30] * days
-
-        future_X = pd.DataFrame({
-            'Days': future_days,
-            'MA7': future_ma7,
-            'MA30': future_ma30
-        })
-        predictions = model.predict(future_X)
-
-        return future_dates, predictions, predictions[-1]
+        prices = panel[stock].dropna()
+        data = build_features(prices)
+        params = model_params(model, params)
+        key = cache_key(stock, data_fingerprint(prices), model, params)
+
+        fitted = self.model_cache.get(key)
+        if fitted is None:
+            fitted = fit_model((data[FEATURES], data['Price'], model, params))
+            self.model_cache.set(key, fitted)
+        return forecast(fitted, data, days)
+
+    def predict_all(self, stocks=None, days=30, model='rf', processes=None, **params):
+        """
+        Prediksi banyak saham sekaligus; hanya model yang belum ada di cache yang dilatih,
+        paralel di process pool jika processes > 1. Mengembalikan dict saham -> hasil predict_price.
+        """
+        panel = self.pm.price_panel()
+        stocks = [s for s in (panel.columns if stocks is None else stocks) if s in panel.columns]
+        params = model_params(model, params)
+
+        prepared = {}
+        missing = []
+        for stock in stocks:
+            prices = panel[stock].dropna()
+            data = build_features(prices)
+            key = cache_key(stock, data_fingerprint(prices), model, params)
+            prepared[stock] = (data, key)
+            if self.model_cache.get(key) is None:
+                missing.append(stock)
+
+        jobs = [(prepared[s][0][FEATURES], prepared[s][0]['Price'], model, params) for s in missing]
+        if processes and processes > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                fitted_models = list(pool.map(fit_model, jobs))
+        else:
+            fitted_models = [fit_model(job) for job in jobs]
+        for stock, fitted in zip(missing, fitted_models):
+            self.model_cache.set(prepared[stock][1], fitted)
+
+        results = {}
+        for stock in stocks:
+            data, key = prepared[stock]
+            fitted = self.model_cache.get(key)
+            if fitted is None:  # terbuang dari cache karena ukuran batch > kapasitas
+                fitted = fit_model((data[FEATURES], data['Price'], model, params))
+            results[stock] = forecast(fitted, data, days)
+        return results
 
     def what_if_simulation(self, stock, price_change_pct):
         sim_df = self.pm.df.copy()
@@ -77,36 +102,11 @@ class PortfolioAnalyzer:
             }
         return None
 
-    def generate_recommendations(self):
-        recommendations = []
-
-        for _, row in self.pm.df.iterrows():
-            stock = row['Stock']
-            unrealized_pct = (row['Unrealized'] / row['Stock Value']) * 100 if row['Stock Value'] else 0
-            trend = 0
-
-            if stock in self.pm.simulated_data and len(self.pm.simulated_data[stock]) > 10:
-                data = self.pm.simulated_data[stock]
-                trend = (data['Price'].iloc[-1] / data['Price'].iloc[-10] - 1) * 100
-
-            if unrealized_pct < -15 or trend < -5:
-                rec, reason, urgency = 'Sell', 'Significant loss & downward trend', 'High'
-            elif unrealized_pct > 20 or trend > 8:
-                rec, reason, urgency = 'Buy More', 'Strong performance & upward trend', 'Medium'
-            elif unrealized_pct > 5 or trend > 3:
-                rec, reason, urgency = 'Hold/Buy', 'Positive performance', 'Low'
-            elif unrealized_pct < -5:
-                rec, reason, urgency = 'Hold/Sell', 'Mild underperformance', 'Monitor'
-            else:
-                rec, reason, urgency = 'Hold', 'Stable performance', 'Low'
-
-            recommendations.append({
-                'Stock': stock,
-                'Recommendation': rec,
-                'Reason': reason,
-                'Urgency': urgency,
-                'Unrealized %': f"{unrealized_pct:.1f}%",
-                '30d Trend %': f"{trend:.1f}%"
-            })
-
-        return pd.DataFrame(recommendations)
+    @versioned_cache()
+    def generate_recommendations(self, lookback=10, rules=None):
+        """
+        Rekomendasi untuk semua saham dalam satu evaluasi array. Kolom persentase tetap
+        numerik; format dilakukan saat ditampilkan.
+        """
+        engine = RecommendationEngine(rules=rules, lookback=lookback)
+        return engine.recommend(self.pm.df, self.pm.price_panel())
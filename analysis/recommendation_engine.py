@@ -0,0 +1,86 @@
+# analysis/recommendation_engine.py
+import numpy as np
+import pandas as pd
+
+# Aturan dievaluasi berurutan; aturan pertama yang cocok dipakai.
+# Setiap aturan cocok jika salah satu ambang (OR) terpenuhi.
+DEFAULT_RULES = [
+    {'rec': 'Sell', 'reason': 'Significant loss & downward trend', 'urgency': 'High',
+     'unrealized_below': -15, 'trend_below': -5},
+    {'rec': 'Buy More', 'reason': 'Strong performance & upward trend', 'urgency': 'Medium',
+     'unrealized_above': 20, 'trend_above': 8},
+    {'rec': 'Hold/Buy', 'reason': 'Positive performance', 'urgency': 'Low',
+     'unrealized_above': 5, 'trend_above': 3},
+    {'rec': 'Hold/Sell', 'reason': 'Mild underperformance', 'urgency': 'Monitor',
+     'unrealized_below': -5},
+]
+DEFAULT_OUTCOME = {'rec': 'Hold', 'reason': 'Stable performance', 'urgency': 'Low'}
+
+
+class RecommendationEngine:
+    """
+    Menerapkan aturan rekomendasi sebagai operasi array untuk semua saham sekaligus
+    """
+    def __init__(self, rules=None, lookback=10, default=None):
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.lookback = lookback
+        self.default = default if default is not None else DEFAULT_OUTCOME
+
+    def trend(self, panel, stocks):
+        """
+        Perubahan harga (%) antara harga terakhir dan `lookback` baris sebelumnya.
+        Saham tanpa histori cukup panjang bernilai 0.
+        """
+        prices = panel.to_numpy()
+        counts = np.sum(~np.isnan(prices), axis=0)
+        if np.isnan(prices).any():
+            prices = panel.ffill().to_numpy()
+        if len(prices) < self.lookback:
+            return np.zeros(len(stocks))
+        trend = (prices[-1] / prices[-self.lookback] - 1) * 100
+        trend = np.where(counts > self.lookback, trend, 0.0)
+        return pd.Series(trend, index=panel.columns).reindex(stocks).fillna(0).to_numpy()
+
+    def evaluate(self, unrealized_pct, trend):
+        """
+        Mengembalikan array (rekomendasi, alasan, urgensi) untuk setiap baris
+        """
+        unrealized_pct = np.asarray(unrealized_pct, dtype=float)
+        trend = np.asarray(trend, dtype=float)
+        conditions = []
+        for rule in self.rules:
+            cond = np.zeros(len(trend), dtype=bool)
+            if 'unrealized_below' in rule:
+                cond |= unrealized_pct < rule['unrealized_below']
+            if 'unrealized_above' in rule:
+                cond |= unrealized_pct > rule['unrealized_above']
+            if 'trend_below' in rule:
+                cond |= trend < rule['trend_below']
+            if 'trend_above' in rule:
+                cond |= trend > rule['trend_above']
+            conditions.append(cond)
+
+        return tuple(
+            np.select(conditions, [rule[field] for rule in self.rules], default=self.default[field])
+            for field in ('rec', 'reason', 'urgency')
+        )
+
+    def recommend(self, holdings, panel):
+        """
+        holdings: DataFrame dengan kolom Stock, Unrealized, Stock Value
+        """
+        stock_value = holdings['Stock Value'].to_numpy(dtype=float)
+        unrealized = holdings['Unrealized'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unrealized_pct = np.where(stock_value != 0, unrealized / stock_value * 100, 0.0)
+        trend = self.trend(panel, holdings['Stock'])
+        rec, reason, urgency = self.evaluate(unrealized_pct, trend)
+
+        return pd.DataFrame({
+            'Stock': holdings['Stock'].to_numpy(),
+            'Recommendation': rec,
+            'Reason': reason,
+            'Urgency': urgency,
+            'Unrealized %': unrealized_pct,
+            '30d Trend %': trend
+        })
@@ -1,6 +1,16 @@
 # analysis/risk_analyzer.py
 import pandas as pd
 import numpy as np
+from .covariance import CovarianceEngine
+from .var_engine import VaREngine
+from utils.memo import versioned_cache
+
+# Sektor bawaan saham portofolio contoh, dipakai bila data tidak punya kolom Sector
+SECTOR_MAP = {
+    'AADI': 'Automotive', 'ADRO': 'Energy', 'ANTM': 'Mining', 'BFIN': 'Finance',
+    'BJBR': 'Banking', 'BSSR': 'Energy', 'LPPF': 'Retail', 'PGAS': 'Energy',
+    'PTBA': 'Mining', 'UNVR': 'Consumer', 'WIIM': 'Tobacco'
+}
 
 
 class RiskAnalyzer:
@@ -13,7 +23,7 @@ class RiskAnalyzer:
         """
         # Jika sektor tidak tersedia, fallback ke dummy sektor
         if 'Sector' not in self.pm.df.columns:
-            self.pm.df['Sector'] = self.pm.df['Stock'].map(self._mock_sector_map())
+            self.pm.df['Sector'] = self.pm.df['Stock'].map(SECTOR_MAP)
 
         sector_counts = self.pm.df.groupby('Sector')['Market Value'].sum()
         total_value = sector_counts.sum()
@@ -33,32 +43,70 @@ class RiskAnalyzer:
         """
         Menghitung volatilitas harga untuk masing-masing saham
         """
-        vol_data = []
-        for stock, df in self.pm.simulated_data.items():
-            std_dev = np.std(df['Price'].pct_change().dropna())
-            vol_data.append({
-                'Stock': stock,
-                'Volatility (σ)': round(std_dev * 100, 2)
-            })
-        return pd.DataFrame(vol_data).sort_values(by='Volatility (σ)', ascending=False)
+        returns = self.pm.returns_panel()
+        std_dev = np.nanstd(returns.to_numpy(), axis=0)
+        vol_df = pd.DataFrame({
+            'Stock': returns.columns,
+            'Volatility (σ)': np.round(std_dev * 100, 2)
+        })
+        return vol_df.sort_values(by='Volatility (σ)', ascending=False)
+
+    def covariance_matrix(self, method='ewma', window=None):
+        """
+        Kovarians return saham yang dimiliki (dari CovarianceEngine bersama)
+        """
+        panel = self.pm.price_panel()
+        stocks = list(panel.columns[panel.columns.isin(self.pm.df['Stock'])])
+        return CovarianceEngine.shared(self.pm).estimate(stocks, window=window, method=method)[1]
 
-    def risk_report(self):
+    def portfolio_volatility(self, method='ewma', window=None):
         """
-        Menggabungkan distribusi sektor, konsentrasi, dan volatilitas menjadi 1 ringkasan risiko
+        Volatilitas harian portofolio berdasarkan bobot nilai pasar saat ini
+        """
+        cov = self.covariance_matrix(method, window)
+        market_value = self.pm.df.groupby('Stock')['Market Value'].sum().reindex(cov.index).fillna(0)
+        weights = (market_value / market_value.sum()).to_numpy()
+        return float(np.sqrt(weights @ cov.to_numpy() @ weights))
+
+    def var_engine(self, cov_method='sample', window=None):
+        """
+        Menyiapkan VaREngine dari panel return dan bobot nilai pasar saham yang dimiliki
+        """
+        cov = self.covariance_matrix(cov_method, window)
+        stocks = list(cov.index)
+        returns = self.pm.returns_panel()[stocks].dropna()
+        if window:
+            returns = returns.iloc[-window:]
+        market_value = self.pm.df.groupby('Stock')['Market Value'].sum().reindex(stocks).fillna(0)
+        total_value = market_value.sum()
+        return VaREngine(returns.to_numpy(), (market_value / total_value).to_numpy(), total_value,
+                         mean=returns.mean().to_numpy(), cov=cov.to_numpy())
+
+    def value_at_risk(self, confidence_levels=(0.95, 0.99), horizons=(1, 10), n_scenarios=100_000,
+                      processes=None, cov_method='sample'):
+        """
+        Tabel VaR/CVaR historis, parametrik dan Monte Carlo untuk beberapa tingkat keyakinan dan horizon
+        """
+        engine = self.var_engine(cov_method)
+        return engine.report(confidence_levels, horizons, n_scenarios=n_scenarios, processes=processes)
+
+    @versioned_cache()
+    def risk_report(self, processes=None):
+        """
+        Menggabungkan distribusi sektor, konsentrasi, volatilitas dan VaR/CVaR menjadi 1 ringkasan risiko.
+        processes diteruskan ke simulasi Monte Carlo VaR.
         """
         sector_dist = self.sector_distribution()
         score = self.concentration_score()
         volatility_df = self.volatility_estimation()
+        var_df = self.value_at_risk(processes=processes)
 
         return {
             'sector_distribution': sector_dist,
             'concentration_score': score,
-            'volatility_table': volatility_df
+            'volatility_table': volatility_df,
+            'var_table': var_df
         }
 
     def _mock_sector_map(self):
-        return {
-            'AADI': 'Automotive', 'ADRO': 'Energy', 'ANTM': 'Mining', 'BFIN': 'Finance',
-            'BJBR': 'Banking', 'BSSR': 'Energy', 'LPPF': 'Retail', 'PGAS': 'Energy',
-            'PTBA': 'Mining', 'UNVR': 'Consumer', 'WIIM': 'Tobacco'
-        }
+        return dict(SECTOR_MAP)
@@ -1,19 +1,23 @@
 # analysis/stock_recommender.py
 import pandas as pd
 
+from .factor_engine import top_k_indices
+
+OUTPUT_COLS = ['Stock', 'Ticker', 'Sector', 'PER', 'PBV', 'Yield', 'ROE', 'Final Score']
+
+
 class StockRecommender:
     def __init__(self, scored_df, portfolio_df):
-        self.scored_df = scored_df.copy()
-        self.portfolio_df = portfolio_df.copy()
+        self.scored_df = scored_df
+        self.portfolio_df = portfolio_df
 
     def recommend_additions(self, top_n=5, min_score=60, exclude_owned=True):
-        df = self.scored_df.copy()
-
+        df = self.scored_df
+        mask = (df['Final Score'] >= min_score).to_numpy(copy=True)
         if exclude_owned:
-            owned_stocks = self.portfolio_df['Stock'].tolist()
-            df = df[~df['Stock'].isin(owned_stocks)]
-
-        df = df[df['Final Score'] >= min_score]
-        df = df.sort_values(by='Final Score', ascending=False).head(top_n)
+            mask &= ~df['Stock'].isin(self.portfolio_df['Stock'].tolist()).to_numpy()
 
-        return df[['Stock', 'Ticker', 'Sector', 'PER', 'PBV', 'Yield', 'ROE', 'Final Score']].reset_index(drop=True)
+        candidates = df[mask]
+        idx = top_k_indices(candidates['Final Score'].to_numpy(dtype=float), top_n)
+        columns = [col for col in OUTPUT_COLS if col in df.columns]
+        return candidates.iloc[idx][columns].reset_index(drop=True)
@@ -1,43 +1,52 @@
 # analysis/stock_scorer.py
+import numpy as np
 import pandas as pd
 
+from .factor_engine import FactorEngine, DEFAULT_WEIGHTS
+
+
 class StockScorer:
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, df, factors=None, weights=None, scaling='minmax', sector_neutral=False):
+        self.df = df
+        self.weights = weights if weights is not None else DEFAULT_WEIGHTS
+        self.engine = FactorEngine(df, factors=factors, scaling=scaling, sector_neutral=sector_neutral)
+
+    def apply_scoring(self, weights=None):
+        """
+        Skor tiap faktor (0-100) dan 'Final Score' berbobot, terurut dari skor tertinggi.
+        Bobot bisa diganti per panggilan tanpa menormalisasi ulang faktor. Seluruh data
+        diurutkan (tabel lengkap untuk paginasi); untuk k teratas saja pakai top().
+        """
+        if self.df.empty:
+            return pd.DataFrame()
+
+        normalized = self.engine.normalized()
+        final = self.engine.score(weights if weights is not None else self.weights)
+        order = np.argsort(-final, kind='stable')
+
+        df = self.df.iloc[order].reset_index(drop=True)
+        for j, name in enumerate(self.engine.names):
+            df[name] = normalized[order, j]
+        df['Final Score'] = final[order]
+        return df
 
-    def apply_scoring(self):
+    def top(self, k, weights=None, exclude=None, min_score=None):
+        """
+        k saham teratas tanpa mengurutkan seluruh data (seleksi parsial)
+        """
         if self.df.empty:
             return pd.DataFrame()
 
-        df = self.df.copy()
-
-        # Normalisasi dan Skor
-        df['PER Score'] = self._inverse_score(df['PER'])
-        df['PBV Score'] = self._inverse_score(df['PBV'])
-        df['Dividend Score'] = self._direct_score(df['Yield'])
-        df['ROE Score'] = self._direct_score(df['ROE'])
-
-        # Bobot (bisa disesuaikan)
-        weights = {
-            'PER Score': 0.25,
-            'PBV Score': 0.25,
-            'Dividend Score': 0.25,
-            'ROE Score': 0.25
-        }
-
-        df['Final Score'] = (
-            df['PER Score'] * weights['PER Score'] +
-            df['PBV Score'] * weights['PBV Score'] +
-            df['Dividend Score'] * weights['Dividend Score'] +
-            df['ROE Score'] * weights['ROE Score']
-        )
-
-        return df.sort_values(by='Final Score', ascending=False).reset_index(drop=True)
-
-    def _inverse_score(self, series):
-        norm = (series.max() - series) / (series.max() - series.min() + 1e-9)
-        return (norm * 100).fillna(0)
-
-    def _direct_score(self, series):
-        norm = (series - series.min()) / (series.max() - series.min() + 1e-9)
-        return (norm * 100).fillna(0)
+        mask = np.ones(len(self.df), dtype=bool)
+        if exclude is not None:
+            mask &= ~self.df['Stock'].isin(list(exclude)).to_numpy()
+        if min_score is not None:
+            mask &= self.engine.score(weights if weights is not None else self.weights) >= min_score
+        idx, scores = self.engine.top(k, weights if weights is not None else self.weights, mask=mask)
+
+        normalized = self.engine.normalized()
+        df = self.df.iloc[idx].reset_index(drop=True)
+        for j, name in enumerate(self.engine.names):
+            df[name] = normalized[idx, j]
+        df['Final Score'] = scores
+        return df
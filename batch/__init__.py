@@ -0,0 +1,4 @@
+# batch/__init__.py
+
+# Pipeline analisis tanpa UI (cron/worker); tidak pernah mengimpor Streamlit
+from .pipeline import STEPS, run_pipeline
@@ -0,0 +1,278 @@
+# batch/pipeline.py
+"""
+Menjalankan seluruh analisis dashboard untuk satu file portofolio tanpa UI dan
+menulis hasilnya sebagai Parquet (tabel) dan JSON (ringkasan).
+
+    python -m batch.pipeline portfolio.csv --output results/
+    python -m batch.pipeline portfolio.db --steps summary risk --offline --processes 8
+    python -m batch.pipeline accounts.parquet --accounts   # tabel posisi banyak akun (kolom Account)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+STEPS = ('summary', 'recommendations', 'risk', 'benchmark', 'dividends', 'optimization')
+
+
+def load_portfolio(path, provider=None, history=None):
+    """
+    PortfolioManager dari file .csv/.parquet/.feather (kolom Stock, Ticker, Lot Balance,
+    Avg Price, opsional Market Price) atau database SQLite (.db/.sqlite)
+    """
+    from data.market_cache import CachedQuoteProvider
+    from data.market_data import YFinanceProvider
+    from data.portfolio_crud import PortfolioCRUD
+    from data.portfolio_manager import PortfolioManager
+    from data.storage import SQLitePortfolioStore
+
+    provider = provider if provider is not None else CachedQuoteProvider(YFinanceProvider())
+    panel = read_history(history) if history is not None else None
+
+    # Histori diberikan ke konstruktor (tanpa file histori disimulasikan sekali dari harga pasar)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.db', '.sqlite'):
+        return PortfolioManager(provider=provider, store=SQLitePortfolioStore(path), history=panel)
+
+    df = read_table(path)
+    missing = {'Stock', 'Ticker', 'Lot Balance', 'Avg Price'} - set(df.columns)
+    if missing:
+        raise ValueError(f"Kolom portofolio tidak lengkap: {', '.join(sorted(missing))}")
+    rows = PortfolioCRUD.build_rows(df)
+    if 'Market Price' in df.columns:
+        prices = pd.to_numeric(df['Market Price'], errors='coerce').set_axis(df['Ticker']).dropna().to_dict()
+        rows['Market Price'] = rows['Ticker'].map(prices).fillna(rows['Market Price']).to_numpy(dtype=float)
+        rows['Market Value'] = rows['Balance'] * rows['Market Price']
+        rows['Unrealized'] = rows['Market Value'] - rows['Stock Value']
+    return PortfolioManager(provider=provider, portfolio=rows, history=panel)
+
+
+def read_history(path):
+    """
+    Panel harga lebar dari file: kolom pertama tanggal, kolom lain saham
+    """
+    panel = read_table(path)
+    panel = panel.set_index(panel.columns[0]) if 'Date' not in panel.index.names else panel
+    panel.index = pd.to_datetime(panel.index)
+    return panel
+
+
+def read_table(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.feather':
+        return pd.read_feather(path)
+    return pd.read_csv(path)
+
+
+def run_step(pm, step, processes=None):
+    """
+    Hasil satu langkah sebagai dict nama -> DataFrame atau nilai skalar
+    """
+    if step == 'summary':
+        from analysis.portfolio_analyzer import PortfolioAnalyzer
+        return {'summary': PortfolioAnalyzer(pm).portfolio_summary(), 'positions': pm.df}
+    if step == 'recommendations':
+        from analysis.portfolio_analyzer import PortfolioAnalyzer
+        return {'recommendations': PortfolioAnalyzer(pm).generate_recommendations()}
+    if step == 'risk':
+        from analysis.risk_analyzer import RiskAnalyzer
+        report = RiskAnalyzer(pm).risk_report(processes=processes)
+        return {
+            'sector_distribution': report['sector_distribution'],
+            'concentration_score': report['concentration_score'],
+            'volatility': report['volatility_table'],
+            'var': report['var_table'],
+        }
+    if step == 'benchmark':
+        from analysis.benchmark import BenchmarkAnalyzer
+        bench = BenchmarkAnalyzer(pm)
+        compare = bench.compare_vs_indices()
+        return {
+            'benchmark': compare,
+            'benchmark_metrics': bench.performance_table(compare) if len(compare) > 2 else pd.DataFrame(),
+        }
+    if step == 'dividends':
+        from data.dividend_tracker import DividendTracker
+        tracker = DividendTracker(pm)
+        result = tracker.analysis()
+        return {
+            'dividends': tracker.calculate_portfolio_dividends(),
+            'dividend_calendar': tracker.cashflow_calendar(),
+            'dividend_monthly': result['monthly'],
+            'dividend_totals': result['totals'],
+        }
+    if step == 'optimization':
+        from analysis.optimizer import PortfolioOptimizer
+        optimizer = PortfolioOptimizer(pm)
+        rebalance, risk = optimizer.rebalance_recommendation()
+        frontier = optimizer.efficient_frontier(processes=processes)
+        return {'rebalance': rebalance, 'optimal_volatility': risk, 'efficient_frontier': pd.DataFrame(frontier)}
+    raise ValueError(f"Unknown pipeline step: {step}")
+
+
+def write_results(results, output_dir, formats=('parquet', 'json')):
+    """
+    DataFrame -> <nama>.parquet, nilai lain -> summary.json. Mengembalikan daftar file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    scalars = {}
+    for step, items in results.items():
+        for name, value in items.items():
+            if isinstance(value, pd.DataFrame):
+                frame = value.reset_index() if not isinstance(value.index, pd.RangeIndex) else value
+                frame.columns = [str(c) for c in frame.columns]
+                if 'parquet' in formats:
+                    path = os.path.join(output_dir, f"{name}.parquet")
+                    frame.to_parquet(path, index=False)
+                    written.append(path)
+                if 'json' in formats:
+                    path = os.path.join(output_dir, f"{name}.json")
+                    frame.to_json(path, orient='records', date_format='iso')
+                    written.append(path)
+            else:
+                scalars.setdefault(step, {})[name] = value
+
+    path = os.path.join(output_dir, 'summary.json')
+    with open(path, 'w') as f:
+        json.dump(scalars, f, indent=2, default=_json_default)
+    written.append(path)
+    return written
+
+
+def _json_default(value):
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(value)
+    return str(value)
+
+
+def load_accounts(path, provider=None, history=None):
+    """
+    MultiPortfolioManager dari satu tabel posisi panjang (kolom Account, Ticker, Avg Price,
+    Lot Balance atau Balance); histori harga dibaca dari file atau disimulasikan sekali
+    untuk semua ticker unik
+    """
+    from data.multi_portfolio import MultiPortfolioManager
+
+    history = read_history(history) if history is not None else None
+    return MultiPortfolioManager(read_table(path), provider=provider, history=history)
+
+
+def run_accounts(portfolio, output_dir=None, provider=None, history=None, refresh_prices=False, confidence=0.95,
+                 formats=('parquet', 'json')):
+    """
+    Ringkasan, P&L posisi, eksposur sektor dan risiko semua akun dalam satu lintasan
+    """
+    from analysis.multi_portfolio_analyzer import MultiPortfolioAnalyzer
+
+    pm = portfolio if not isinstance(portfolio, (str, os.PathLike)) else load_accounts(portfolio, provider, history)
+    errors = {}
+    if refresh_prices and not pm.update_real_time_prices():
+        errors['prices'] = pm.last_error
+
+    start = time.perf_counter()
+    analyzer = MultiPortfolioAnalyzer(pm)
+    report = analyzer.risk_report(confidence)
+    results = {
+        'accounts': {
+            'account_summary': report['summary'],
+            'account_positions': analyzer.position_pnl(),
+            'account_sectors': report['sector_exposure'],
+            'account_risk': report['risk'].join(report['concentration_score']),
+            'totals': analyzer.portfolio_summary(),
+        },
+        'pipeline': {'errors': errors, 'seconds': {'accounts': time.perf_counter() - start},
+                     'accounts': len(pm.accounts), 'positions': len(pm.holdings),
+                     'tickers': len(pm.instruments)},
+    }
+    if output_dir is not None:
+        results['pipeline']['files'] = write_results(results, output_dir, formats)
+    return results
+
+
+def run_pipeline(portfolio, output_dir=None, steps=STEPS, provider=None, history=None, refresh_prices=False,
+                 processes=None, progress=None, formats=('parquet', 'json')):
+    """
+    API Python pipeline. portfolio boleh path file atau PortfolioManager yang sudah ada.
+    progress(done, total, label) dipanggil setelah tiap langkah; langkah yang gagal dicatat
+    di results['errors'] tanpa menghentikan langkah lain. processes=None memakai semua core.
+    """
+    processes = processes if processes is not None else os.cpu_count()
+    pm = portfolio if not isinstance(portfolio, (str, os.PathLike)) else load_portfolio(portfolio, provider, history)
+
+    total = len(steps) + (1 if refresh_prices else 0)
+    done = 0
+    results = {}
+    errors = {}
+    timings = {}
+    if refresh_prices:
+        if not pm.update_real_time_prices():
+            errors['prices'] = pm.last_error
+        done += 1
+        if progress is not None:
+            progress(done, total, 'prices')
+
+    for step in steps:
+        start = time.perf_counter()
+        try:
+            results[step] = run_step(pm, step, processes)
+        except Exception as e:
+            errors[step] = f"{type(e).__name__}: {e}"
+        timings[step] = time.perf_counter() - start
+        done += 1
+        if progress is not None:
+            progress(done, total, step)
+
+    results['pipeline'] = {'errors': errors, 'seconds': timings, 'data_version': pm.data_version,
+                           'positions': len(pm.df)}
+    if output_dir is not None:
+        results['pipeline']['files'] = write_results(results, output_dir, formats)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline analisis portofolio tanpa UI")
+    parser.add_argument('portfolio', help="File portofolio (.csv/.parquet/.feather) atau database SQLite (.db)")
+    parser.add_argument('--output', default='results', help="Direktori hasil")
+    parser.add_argument('--steps', nargs='+', choices=STEPS, default=list(STEPS))
+    parser.add_argument('--history', help="Panel harga (kolom pertama tanggal, kolom lain saham)")
+    parser.add_argument('--format', nargs='+', choices=['parquet', 'json'], default=['parquet', 'json'])
+    parser.add_argument('--processes', type=int, help="Jumlah proses untuk simulasi/optimasi (default: semua core)")
+    parser.add_argument('--refresh-prices', action='store_true', help="Ambil harga terbaru sebelum analisis")
+    parser.add_argument('--offline', action='store_true', help="Tanpa jaringan (provider stub)")
+    parser.add_argument('--accounts', action='store_true',
+                        help="File berisi posisi banyak akun (kolom Account); analisis per akun sekaligus")
+    args = parser.parse_args(argv)
+
+    provider = None
+    if args.offline:
+        from data.market_data import StubQuoteProvider
+        provider = StubQuoteProvider()
+
+    def report(done, total, label):
+        print(f"[{done}/{total}] {label}", file=sys.stderr)
+
+    if args.accounts:
+        results = run_accounts(args.portfolio, args.output, provider=provider, history=args.history,
+                               refresh_prices=args.refresh_prices, formats=args.format)
+    else:
+        results = run_pipeline(args.portfolio, args.output, steps=args.steps, provider=provider, history=args.history,
+                               refresh_prices=args.refresh_prices, processes=args.processes, progress=report,
+                               formats=args.format)
+    status = results['pipeline']
+    for step, message in status['errors'].items():
+        print(f"FAILED {step}: {message}", file=sys.stderr)
+    print(json.dumps({'files': status['files'], 'seconds': status['seconds']}, indent=2))
+    return 1 if status['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+
+# Benchmark performa kode (bukan benchmark pasar, lihat analysis/benchmark.py)
@@ -0,0 +1,402 @@
+# benchmarks/analyzers.py
+"""
+Mengukur waktu dan puncak memori tiap analyzer pada portofolio dan watchlist sintetis
+(10, 100, 1k, 5k ticker; histori beberapa tahun), tanpa jaringan dan tanpa Streamlit.
+
+    python -m benchmarks.analyzers --output analyzers.json
+    python -m benchmarks.analyzers --sizes 10 100 --cases risk scorer --repeat 5
+    python -m benchmarks.analyzers --baseline analyzers.json --tolerance 0.25
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+SIZES = (10, 100, 1000, 5000)
+YEARS = 3
+TRADING_DAYS = 252
+SECTORS = ['Banking', 'Energy', 'Mining', 'Consumer', 'Telecom', 'Retail', 'Property', 'Infrastructure']
+# Skenario Monte Carlo VaR; matriks shock berukuran skenario x saham
+VAR_SCENARIOS = 2_000
+# SLSQP dengan ribuan variabel butuh waktu menit; ukuran di atas ini dicatat sebagai skipped
+OPTIMIZER_LIMIT = 1000
+# Pengukuran di bawah ini terlalu berisik untuk dibandingkan antar run
+MIN_SECONDS = 0.005
+
+
+def synthetic_portfolio(n, seed=0):
+    """
+    Portofolio n saham dengan format PortfolioManager.df (ditambah kolom Sector)
+    """
+    rng = np.random.default_rng(seed)
+    stocks = np.array([f'S{i:04d}' for i in range(n)])
+    lots = rng.integers(1, 200, n).astype(float)
+    avg_price = np.round(rng.lognormal(np.log(2000), 0.8, n), 0)
+    market_price = np.round(avg_price * rng.lognormal(0, 0.2, n), 0)
+    balance = lots * 100
+    return pd.DataFrame({
+        'Stock': stocks,
+        'Ticker': np.char.add(stocks, '.JK'),
+        'Lot Balance': lots,
+        'Balance': balance,
+        'Avg Price': avg_price,
+        'Stock Value': balance * avg_price,
+        'Market Price': market_price,
+        'Market Value': balance * market_price,
+        'Unrealized': balance * (market_price - avg_price),
+        'Sector': np.array(SECTORS)[rng.integers(0, len(SECTORS), n)],
+    })
+
+
+def synthetic_history(portfolio, days, seed=0):
+    """
+    Panel harga hari bursa (GBM) yang berakhir di harga pasar portofolio
+    """
+    from data.portfolio_manager import PortfolioManager
+
+    dates = pd.bdate_range(end='2025-05-30', periods=days, name='Date')
+    prices = PortfolioManager.simulate_prices(portfolio['Market Price'].to_numpy(dtype=float),
+                                              np.zeros(len(portfolio), dtype=bool), days, mode='gbm', seed=seed)
+    return pd.DataFrame(prices, index=dates, columns=portfolio['Stock'].to_numpy())
+
+
+def synthetic_watchlist(n, seed=0):
+    """
+    Kandidat saham dengan kolom fundamental yang dipakai StockScorer
+    """
+    rng = np.random.default_rng(seed + 1)
+    stocks = np.array([f'W{i:04d}' for i in range(n)])
+    return pd.DataFrame({
+        'Stock': stocks,
+        'Ticker': np.char.add(stocks, '.JK'),
+        'Sector': np.array(SECTORS)[rng.integers(0, len(SECTORS), n)],
+        'PER': rng.lognormal(np.log(12), 0.5, n),
+        'PBV': rng.lognormal(0, 0.6, n),
+        'Yield': rng.gamma(2.0, 1.5, n),
+        'ROE': rng.normal(12, 6, n),
+        'Current Price': np.round(rng.lognormal(np.log(2000), 0.8, n), 0),
+    })
+
+
+def index_provider(history, seed=0):
+    """
+    StubQuoteProvider berisi harga terakhir portofolio dan histori indeks sintetis
+    (DEFAULT_INDICES) pada tanggal panel yang sama
+    """
+    from analysis.benchmark import DEFAULT_INDICES
+    from data.market_data import StubQuoteProvider
+
+    rng = np.random.default_rng(seed + 2)
+    indices = {}
+    for symbol in DEFAULT_INDICES.values():
+        close = 7000 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, len(history))))
+        indices[symbol] = pd.DataFrame({'Close': close}, index=history.index)
+    prices = dict(zip(np.char.add(history.columns.to_numpy(dtype=str), '.JK'), history.iloc[-1].to_numpy()))
+    return StubQuoteProvider(prices=prices, history=indices)
+
+
+def cold(pm):
+    """
+    Membuang semua hasil memo agar setiap pengulangan mengukur perhitungan penuh
+    """
+    from analysis.factor_engine import NORMALIZED_CACHE
+
+    pm.memo.clear()
+    NORMALIZED_CACHE.clear()
+    pm.__dict__.pop('_covariance_engine', None)
+    pm.__dict__.pop('_dividend_store', None)
+    pm.bump_version()
+
+
+class Fixture:
+    """
+    Data sintetis satu ukuran; PortfolioManager dibuat ulang lewat manager(), atau dipakai
+    bersama dalam keadaan dingin lewat cold_manager() (dipanggil di setup, di luar waktu run)
+    """
+    def __init__(self, n, days, seed=0):
+        self.n = n
+        self.portfolio = synthetic_portfolio(n, seed)
+        self.history = synthetic_history(self.portfolio, days, seed)
+        self.watchlist = synthetic_watchlist(n, seed)
+        self.provider = index_provider(self.history, seed)
+        self.prices = dict(self.provider.prices)
+        self._pm = None
+
+    def manager(self):
+        from data.portfolio_manager import PortfolioManager
+        return PortfolioManager(provider=self.provider, portfolio=self.portfolio.copy(), history=self.history)
+
+    def cold_manager(self):
+        if self._pm is None:
+            self._pm = self.manager()
+        cold(self._pm)
+        return self._pm
+
+    def edited(self):
+        """
+        Hasil editor: 10% lot berubah, 1% dihapus, 1% saham baru
+        """
+        rng = np.random.default_rng(self.n)
+        df = self.portfolio[['Stock', 'Ticker', 'Lot Balance', 'Avg Price']].copy()
+        changed = rng.random(len(df)) < 0.1
+        df.loc[changed, 'Lot Balance'] = df.loc[changed, 'Lot Balance'] + 1
+        df = df[rng.random(len(df)) >= 0.01]
+        k = max(1, self.n // 100)
+        new = pd.DataFrame({'Stock': [f'N{i:04d}' for i in range(k)], 'Ticker': [f'N{i:04d}.JK' for i in range(k)],
+                            'Lot Balance': 10.0, 'Avg Price': 1000.0})
+        return pd.concat([df, new], ignore_index=True)
+
+
+def case_construct(fx):
+    return lambda: fx.manager()
+
+
+def cold_setup(fx, state):
+    """
+    Setup bersama: PortfolioManager tanpa hasil memo, disimpan di state['pm']
+    """
+    def setup():
+        state['pm'] = fx.cold_manager()
+    return setup
+
+
+def case_apply_prices(fx):
+    pm = fx.manager()
+    # Dua set harga bergantian agar setiap run benar-benar mengubah harga
+    price_sets = [{ticker: price * factor for ticker, price in fx.prices.items()} for factor in (1.01, 0.99)]
+    state = {'turn': 0}
+
+    def run():
+        pm.apply_prices(price_sets[state['turn']])
+        state['turn'] ^= 1
+    return run
+
+
+def case_portfolio_analyzer(fx):
+    from analysis.portfolio_analyzer import PortfolioAnalyzer
+    stock = fx.portfolio['Stock'].iloc[0]
+
+    state = {}
+
+    def run():
+        analyzer = PortfolioAnalyzer(state['pm'])
+        analyzer.portfolio_summary()
+        analyzer.generate_recommendations()
+        analyzer.what_if_simulation(stock, 10)
+    return cold_setup(fx, state), run
+
+
+def case_risk(fx):
+    from analysis.risk_analyzer import RiskAnalyzer
+
+    state = {}
+
+    def run():
+        analyzer = RiskAnalyzer(state['pm'])
+        analyzer.sector_distribution()
+        analyzer.concentration_score()
+        analyzer.volatility_estimation()
+        analyzer.portfolio_volatility()
+        analyzer.value_at_risk(n_scenarios=VAR_SCENARIOS, processes=1)
+    return cold_setup(fx, state), run
+
+
+def case_benchmark(fx):
+    from analysis.benchmark import BenchmarkAnalyzer
+
+    state = {}
+
+    def run():
+        analyzer = BenchmarkAnalyzer(state['pm'])
+        compare = analyzer.compare_vs_indices(period='max')
+        analyzer.performance_table(compare)
+        analyzer.rolling_metrics(compare, window=60)
+    return cold_setup(fx, state), run
+
+
+def case_optimizer(fx):
+    from analysis.optimizer import PortfolioOptimizer
+    if fx.n > OPTIMIZER_LIMIT:
+        return f"lebih dari {OPTIMIZER_LIMIT} saham"
+    state = {}
+    return cold_setup(fx, state), lambda: PortfolioOptimizer(state['pm']).rebalance_recommendation()
+
+
+def case_scorer(fx):
+    from analysis.factor_engine import NORMALIZED_CACHE
+    from analysis.stock_scorer import StockScorer
+
+    def run():
+        scorer = StockScorer(fx.watchlist, sector_neutral=True)
+        scorer.apply_scoring()
+        scorer.top(20, weights={'PER Score': 0.4, 'PBV Score': 0.2, 'Dividend Score': 0.2, 'ROE Score': 0.2})
+    return NORMALIZED_CACHE.clear, run
+
+
+def case_allocation(fx):
+    from analysis.allocation_helper import AllocationHelper
+    from analysis.stock_scorer import StockScorer
+    recommendations = StockScorer(fx.watchlist).apply_scoring()
+
+    def run():
+        helper = AllocationHelper(recommendations, provider=fx.provider)
+        helper.simulate_allocation(fx.n * 5_000_000, method='weighted')
+        helper.budget_grid(np.linspace(1e7, 1e9, 50), method='weighted')
+    return run
+
+
+def case_crud(fx):
+    from data.portfolio_crud import PortfolioCRUD
+    edited = fx.edited()
+    state = {}
+
+    def setup():
+        state['crud'] = PortfolioCRUD(fx.manager())
+
+    def run():
+        state['crud'].update_from_editor(edited)
+    return setup, run
+
+
+CASES = {
+    'construct': case_construct,
+    'apply_prices': case_apply_prices,
+    'portfolio_analyzer': case_portfolio_analyzer,
+    'risk': case_risk,
+    'benchmark': case_benchmark,
+    'optimizer': case_optimizer,
+    'scorer': case_scorer,
+    'allocation': case_allocation,
+    'crud': case_crud,
+}
+
+
+def measure(run, setup=None, repeat=3):
+    """
+    Median dan minimum waktu dari `repeat` pengulangan setelah satu run pemanasan (impor
+    lazy, cache BLAS), lalu satu run terpisah di bawah tracemalloc untuk puncak alokasi
+    (tracemalloc memperlambat eksekusi)
+    """
+    if setup is not None:
+        setup()
+    run()
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'min_seconds': min(times), 'peak_mb': peak / 2 ** 20}
+
+
+def run_suite(sizes=SIZES, cases=None, days=YEARS * TRADING_DAYS, repeat=3, seed=0, progress=None):
+    cases = list(cases or CASES)
+    results = {case: {} for case in cases}
+    for n in sizes:
+        fx = Fixture(n, days, seed)
+        for case in cases:
+            try:
+                prepared = CASES[case](fx)
+                if isinstance(prepared, str):
+                    results[case][str(n)] = {'skipped': prepared}
+                    continue
+                setup, run = prepared if isinstance(prepared, tuple) else (None, prepared)
+                results[case][str(n)] = measure(run, setup, repeat)
+            except Exception as e:
+                results[case][str(n)] = {'error': f"{type(e).__name__}: {e}"}
+            if progress is not None:
+                progress(case, n, results[case][str(n)])
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'sizes': list(sizes),
+            'days': days,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def regressions(current, baseline, tolerance, min_seconds=MIN_SECONDS):
+    """
+    Pengukuran (waktu median atau puncak memori) yang lebih buruk dari baseline lebih dari
+    `tolerance` (proporsi). Waktu baseline di bawah `min_seconds` diabaikan. Kasus yang
+    sekarang gagal (error) tetapi tidak gagal di baseline juga dihitung regresi.
+    """
+    found = []
+    for case, sizes in current['results'].items():
+        for size, entry in sizes.items():
+            before = baseline.get('results', {}).get(case, {}).get(size, {})
+            if 'error' in entry:
+                if 'error' not in before:
+                    found.append({'name': f'{case}[{size}]', 'metric': 'error', 'baseline': before.get('seconds'),
+                                  'current': entry['error']})
+                continue
+            for metric, floor in (('seconds', min_seconds), ('peak_mb', 0.0)):
+                now, old = entry.get(metric), before.get(metric)
+                if now is not None and old and old >= floor and now > old * (1 + tolerance):
+                    found.append({'name': f'{case}[{size}]', 'metric': metric, 'baseline': old, 'current': now})
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark performa analyzer pada data sintetis")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="Jumlah ticker per run")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--years', type=float, default=YEARS, help="Panjang histori harga (tahun bursa)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Simpan hasil sebagai JSON")
+    parser.add_argument('--baseline', help="JSON hasil sebelumnya untuk deteksi regresi")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    def report(case, n, entry):
+        if 'seconds' in entry:
+            detail = f"{entry['seconds'] * 1000:9.1f} ms {entry['peak_mb']:8.1f} MB"
+        else:
+            detail = entry.get('skipped') or entry.get('error')
+        print(f"{case:>20} {n:>6}  {detail}", file=sys.stderr)
+
+    results = run_suite(args.sizes, args.cases, int(args.years * TRADING_DAYS), args.repeat, args.seed, report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for item in found:
+            if item['metric'] == 'error':
+                print(f"REGRESSION {item['name']} error: {item['current']}", file=sys.stderr)
+            else:
+                print(f"REGRESSION {item['name']} {item['metric']}: {item['baseline']:.3f} -> {item['current']:.3f}",
+                      file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# benchmarks/startup.py
+"""
+Mengukur cold start: waktu impor per modul (masing-masing di proses Python baru)
+dan waktu sampai ringkasan portofolio pertama siap dirender.
+
+    python -m benchmarks.startup --repeat 5 --output startup.json
+    python -m benchmarks.startup --baseline startup.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'data',
+    'data.portfolio_manager',
+    'data.portfolio_crud',
+    'data.dividend_tracker',
+    'data.input_loader',
+    'analysis',
+    'analysis.risk_analyzer',
+    'analysis.benchmark',
+    'analysis.optimizer',
+    'analysis.stock_scorer',
+    'visualization',
+    'utils',
+    'main',
+]
+
+HEAVY_MODULES = ['streamlit', 'sklearn', 'scipy', 'yfinance', 'plotly']
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+# Jalur yang sama dengan bagian "Portfolio Summary" di main.py, tanpa Streamlit dan jaringan
+FIRST_RENDER_SNIPPET = """
+import json, time
+start = time.perf_counter()
+from data.portfolio_manager import PortfolioManager
+from data.market_data import StubQuoteProvider
+from analysis.portfolio_analyzer import PortfolioAnalyzer
+from visualization.portfolio_visualizer import PortfolioVisualizer
+pm = PortfolioManager(provider=StubQuoteProvider())
+summary = PortfolioAnalyzer(pm).portfolio_summary()
+PortfolioVisualizer.portfolio_pie(pm.df)
+PortfolioVisualizer.performance_bar(pm.df)
+print(json.dumps({'seconds': time.perf_counter() - start}))
+"""
+
+
+def run_snippet(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'snippet failed')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(repeat=3):
+    results = {'imports': {}, 'first_render_seconds': None}
+    for module in MODULES:
+        try:
+            runs = [run_snippet(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+        except RuntimeError as e:
+            results['imports'][module] = {'error': str(e)}
+            continue
+        results['imports'][module] = {
+            'seconds': statistics.median(r['seconds'] for r in runs),
+            'heavy_loaded': runs[0]['heavy'],
+        }
+    runs = [run_snippet(FIRST_RENDER_SNIPPET)['seconds'] for _ in range(repeat)]
+    results['first_render_seconds'] = statistics.median(runs)
+    return results
+
+
+def regressions(current, baseline, tolerance):
+    """
+    Daftar pengukuran yang lebih lambat dari baseline lebih dari `tolerance` (proporsi)
+    """
+    found = []
+    pairs = [('first_render', current['first_render_seconds'], baseline.get('first_render_seconds'))]
+    for module, entry in current['imports'].items():
+        pairs.append((module, entry.get('seconds'), baseline.get('imports', {}).get(module, {}).get('seconds')))
+    for name, now, before in pairs:
+        if now is not None and before and now > before * (1 + tolerance):
+            found.append({'name': name, 'baseline': before, 'current': now})
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold start dashboard portofolio")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Simpan hasil sebagai JSON")
+    parser.add_argument('--baseline', help="JSON hasil sebelumnya untuk deteksi regresi")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = measure(args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for item in found:
+            print(f"REGRESSION {item['name']}: {item['baseline']:.3f}s -> {item['current']:.3f}s", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# data/dividend_store.py
+import numpy as np
+import pandas as pd
+
+from .market_data import DIVIDEND_COLUMNS
+
+# Perkiraan jarak ex-date ke tanggal bayar bila provider tidak memberikan tanggal bayar
+PAY_DATE_LAG = pd.Timedelta(days=21)
+
+# Data contoh (dividen tahunan 2024 per lembar) untuk ticker yang tidak punya riwayat dari provider
+SAMPLE_DIVIDENDS = pd.DataFrame({
+    'Ticker': ['AADI.JK', 'ADRO.JK', 'ANTM.JK', 'BFIN.JK', 'BJBR.JK', 'BSSR.JK', 'LPPF.JK', 'PGAS.JK',
+               'PTBA.JK', 'UNVR.JK', 'WIIM.JK'],
+    'Ex Date': pd.Timestamp('2024-12-31'),
+    'Pay Date': pd.NaT,
+    'Amount': [150, 230, 140, 90, 120, 310, 200, 210, 280, 300, 100],
+})
+
+
+class DividendStore:
+    """
+    Riwayat dividen (Ticker, Ex Date, Pay Date, Amount) dalam satu tabel panjang yang
+    terurut per ticker, dengan indeks ticker -> rentang baris. Ticker baru diambil dari
+    provider sekaligus (bulk) dan hanya sekali; `version` naik setiap isi tabel berubah.
+    """
+    def __init__(self, provider=None, seed=SAMPLE_DIVIDENDS):
+        self.provider = provider
+        self.seed = seed
+        self.version = 0
+        self.loaded = set()
+        self.frame = pd.DataFrame({'Ticker': pd.Series(dtype=object), 'Ex Date': pd.Series(dtype='datetime64[ns]'),
+                                   'Pay Date': pd.Series(dtype='datetime64[ns]'), 'Amount': pd.Series(dtype=float)})
+        self.index = {}
+
+    @classmethod
+    def shared(cls, portfolio_manager):
+        """
+        Satu store per PortfolioManager (yang bertahan di session state), memakai provider-nya
+        """
+        store = getattr(portfolio_manager, '_dividend_store', None)
+        if store is None:
+            store = cls(portfolio_manager.provider)
+            portfolio_manager._dividend_store = store
+        return store
+
+    def ensure(self, tickers):
+        """
+        Memuat riwayat ticker yang belum pernah dimuat dalam satu panggilan provider
+        """
+        missing = [t for t in dict.fromkeys(tickers) if t not in self.loaded]
+        if not missing:
+            return
+        fetched = {}
+        if self.provider is not None:
+            try:
+                fetched = self.provider.fetch_dividends(missing)
+            except Exception:
+                fetched = {}
+
+        frames = [frame.reindex(columns=DIVIDEND_COLUMNS).assign(Ticker=ticker) for ticker, frame in fetched.items()]
+        if self.seed is not None:
+            frames.append(self.seed[self.seed['Ticker'].isin([t for t in missing if t not in fetched])])
+        self.add(pd.concat(frames, ignore_index=True) if frames else None, loaded=missing)
+
+    def add(self, rows, loaded=()):
+        """
+        Menambah baris dividen (menggantikan baris ticker yang sama dengan ex-date sama)
+        """
+        self.loaded.update(loaded)
+        if rows is None or rows.empty:
+            return
+        rows = rows[['Ticker'] + DIVIDEND_COLUMNS].copy()
+        rows['Ex Date'] = pd.to_datetime(rows['Ex Date']).astype('datetime64[ns]')
+        rows['Pay Date'] = pd.to_datetime(rows['Pay Date']).astype('datetime64[ns]')
+        rows['Pay Date'] = rows['Pay Date'].fillna(rows['Ex Date'] + PAY_DATE_LAG)
+        rows['Amount'] = pd.to_numeric(rows['Amount'], errors='coerce').astype(float)
+        frame = pd.concat([self.frame, rows.dropna(subset=['Ex Date', 'Amount'])], ignore_index=True)
+        frame = frame.drop_duplicates(['Ticker', 'Ex Date'], keep='last')
+        self.frame = frame.sort_values(['Ticker', 'Ex Date'], kind='stable').reset_index(drop=True)
+        self._reindex()
+        self.version += 1
+
+    def history(self, ticker):
+        start, stop = self.index.get(ticker, (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def events(self, tickers, start=None, end=None, date_col='Ex Date'):
+        """
+        Baris dividen untuk banyak ticker sekaligus, opsional dalam rentang (start, end]
+        """
+        self.ensure(tickers)
+        spans = [self.index[t] for t in dict.fromkeys(tickers) if t in self.index]
+        if not spans:
+            return self.frame.iloc[0:0]
+        positions = np.concatenate([np.arange(a, b) for a, b in spans])
+        rows = self.frame.iloc[positions]
+        if start is not None:
+            rows = rows[rows[date_col] > start]
+        if end is not None:
+            rows = rows[rows[date_col] <= end]
+        return rows
+
+    def _reindex(self):
+        tickers = self.frame['Ticker'].to_numpy()
+        if not len(tickers):
+            self.index = {}
+            return
+        bounds = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+        starts = np.concatenate([[0], bounds])
+        stops = np.concatenate([bounds, [len(tickers)]])
+        self.index = {tickers[a]: (int(a), int(b)) for a, b in zip(starts, stops)}
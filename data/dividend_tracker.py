@@ -1,31 +1,114 @@
 # data/dividend_tracker.py
+import numpy as np
 import pandas as pd
 
+from utils.memo import versioned_cache
+from .dividend_store import DividendStore
+
+YEAR = pd.Timedelta(days=365)
+
+
 class DividendTracker:
-    def __init__(self, portfolio_manager):
+    def __init__(self, portfolio_manager, store=None):
         self.pm = portfolio_manager
-        self.dividend_data = self._load_dividends()
+        self.store = store if store is not None else DividendStore.shared(portfolio_manager)
 
-    def _load_dividends(self):
+    @property
+    def store_version(self):
+        return self.store.version
+
+    @property
+    def dividend_data(self):
         """
-        Contoh data dividen tahunan per saham. Bisa disambungkan ke API/data resmi
+        Riwayat dividen ticker portofolio (tabel panjang dari store)
         """
-        return pd.DataFrame({
-            'Stock': ['AADI', 'ADRO', 'ANTM', 'BFIN', 'BJBR', 'BSSR', 'LPPF', 'PGAS', 'PTBA', 'UNVR', 'WIIM'],
-            'Dividend/Share': [150, 230, 140, 90, 120, 310, 200, 210, 280, 300, 100],  # per lembar
-            'Year': [2024] * 11
-        })
+        return self.store.events(self.pm.df['Ticker'].tolist())
 
-    def calculate_portfolio_dividends(self):
-        df = self.pm.df.copy()
-        df = df.merge(self.dividend_data, on='Stock', how='left')
-        df['Dividend/Share'].fillna(0, inplace=True)
-        df['Total Shares'] = df['Balance'] * 100
-        df['Dividend Income'] = df['Dividend/Share'] * df['Total Shares']
-        df['Yield %'] = (df['Dividend Income'] / df['Stock Value']) * 100
+    def as_of(self):
+        """
+        Tanggal acuan trailing/forward: tanggal terakhir panel harga portofolio
+        """
+        panel = self.pm.price_panel()
+        return panel.index[-1].normalize() if len(panel.index) else pd.Timestamp.today().normalize()
+
+    def analysis(self, as_of=None):
+        """
+        Dividen trailing 12 bulan, proyeksi 12 bulan ke depan dan kalender arus kas,
+        dihitung sekali per versi data. Proyeksi: dividen yang sudah diumumkan (ex-date
+        setelah as_of) ditambah dividen 12 bulan terakhir yang digeser satu tahun, kecuali
+        yang jatuh sebelum pengumuman terakhir ticker tersebut.
+        """
+        # Store diisi dulu agar kunci cache memakai versi store yang sudah memuat ticker ini
+        self.store.ensure(self.pm.df['Ticker'].tolist())
+        return self._analysis(as_of)
 
-        return df[['Stock', 'Balance', 'Dividend/Share', 'Dividend Income', 'Yield %']].sort_values(by='Dividend Income', ascending=False)
+    @versioned_cache(attrs=('store_version',))
+    def _analysis(self, as_of=None):
+        as_of = pd.Timestamp(as_of) if as_of is not None else self.as_of()
+        positions = self.pm.df.drop_duplicates('Stock')[['Stock', 'Ticker', 'Balance', 'Stock Value', 'Market Price']]
+        events = self.store.events(positions['Ticker'].tolist(), start=as_of - YEAR, end=as_of + YEAR)
+
+        trailing = events[events['Ex Date'] <= as_of]
+        announced = events[events['Ex Date'] > as_of]
+        projected = trailing.assign(**{'Ex Date': trailing['Ex Date'] + YEAR, 'Pay Date': trailing['Pay Date'] + YEAR})
+        if len(announced) and len(projected):
+            # map dengan Series kosong gagal (cast datetime ke float), jadi hanya bila ada pengumuman
+            cutoff = projected['Ticker'].map(announced.groupby('Ticker')['Ex Date'].max())
+            projected = projected[cutoff.isna() | (projected['Ex Date'] > cutoff)]
+        forward = pd.concat([announced.assign(Projected=False), projected.assign(Projected=True)], ignore_index=True)
+
+        trailing_dps = trailing.groupby('Ticker')['Amount'].sum()
+        forward_dps = forward.groupby('Ticker')['Amount'].sum()
+
+        df = positions.reset_index(drop=True)
+        df['Dividend/Share'] = df['Ticker'].map(trailing_dps).fillna(0).to_numpy(dtype=float)
+        df['Forward Dividend/Share'] = df['Ticker'].map(forward_dps).fillna(0).to_numpy(dtype=float)
+        balance = df['Balance'].to_numpy(dtype=float)  # Balance sudah dalam lembar
+        df['Dividend Income'] = df['Dividend/Share'] * balance
+        df['Forward Income'] = df['Forward Dividend/Share'] * balance
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost = df['Stock Value'].to_numpy(dtype=float)
+            price = df['Market Price'].to_numpy(dtype=float)
+            df['Yield %'] = np.where(cost > 0, df['Dividend Income'] / cost * 100, 0.0)
+            df['Trailing Yield %'] = np.where(price > 0, df['Dividend/Share'] / price * 100, 0.0)
+            df['Forward Yield %'] = np.where(price > 0, df['Forward Dividend/Share'] / price * 100, 0.0)
+        table = df.sort_values(by='Dividend Income', ascending=False, kind='stable')
+
+        shares = pd.Series(balance, index=df['Ticker'])
+        calendar = forward.merge(df[['Stock', 'Ticker']], on='Ticker', how='left')
+        calendar = calendar[(calendar['Pay Date'] > as_of) & (calendar['Pay Date'] <= as_of + YEAR)]
+        calendar['Shares'] = calendar['Ticker'].map(shares).to_numpy(dtype=float)
+        calendar['Cash'] = calendar['Amount'] * calendar['Shares']
+        calendar = calendar.sort_values('Pay Date', kind='stable').reset_index(drop=True)
+
+        months = pd.period_range(as_of + pd.Timedelta(days=1), periods=12, freq='M')
+        monthly = calendar.groupby(calendar['Pay Date'].dt.to_period('M'))['Cash'].sum().reindex(months, fill_value=0.0)
+        monthly = monthly.rename_axis('Month').reset_index()
+        monthly['Month'] = monthly['Month'].astype(str)
+
+        totals = {
+            'trailing_income': float(df['Dividend Income'].sum()),
+            'forward_income': float(df['Forward Income'].sum()),
+            'average_yield': float(df['Yield %'].mean()) if len(df) else 0.0,
+            'portfolio_yield': float(df['Dividend Income'].sum() / df['Stock Value'].sum() * 100)
+            if df['Stock Value'].sum() else 0.0,
+            'forward_yield': float(df['Forward Income'].sum() / (balance * df['Market Price']).sum() * 100)
+            if (balance * df['Market Price']).sum() else 0.0,
+        }
+        return {'table': table, 'calendar': calendar, 'monthly': monthly, 'totals': totals, 'as_of': as_of}
+
+    def calculate_portfolio_dividends(self):
+        return self.analysis()['table'][['Stock', 'Balance', 'Dividend/Share', 'Dividend Income', 'Yield %',
+                                         'Trailing Yield %', 'Forward Dividend/Share', 'Forward Income',
+                                         'Forward Yield %']]
 
     def total_dividend(self):
-        df = self.calculate_portfolio_dividends()
-        return df['Dividend Income'].sum(), df['Yield %'].mean()
+        totals = self.analysis()['totals']
+        return totals['trailing_income'], totals['average_yield']
+
+    def cashflow_calendar(self):
+        return self.analysis()['calendar'][['Pay Date', 'Ex Date', 'Stock', 'Ticker', 'Amount', 'Shares', 'Cash',
+                                            'Projected']]
+
+    def monthly_income(self):
+        return self.analysis()['monthly']
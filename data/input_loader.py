@@ -1,40 +1,150 @@
 # data/input_loader.py
+import os
+
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+# Skema kolom watchlist: 'category' untuk teks berulang, 'ratio' untuk rasio fundamental
+# (boleh float32), kolom lain yang tidak dikenal diperlakukan sebagai 'float'
+SCHEMA = {
+    'Stock': 'category',
+    'Ticker': 'category',
+    'Sector': 'category',
+    'PER': 'ratio',
+    'PBV': 'ratio',
+    'Yield': 'ratio',
+    'ROE': 'ratio',
+    'ROA': 'ratio',
+    'DER': 'ratio',
+    'NPM': 'ratio',
+    'EPS': 'float',
+    'Price': 'float',
+    'Current Price': 'float',
+    'Market Cap': 'float',
+}
+TEXT_COLS = [col for col, kind in SCHEMA.items() if kind == 'category']
+REQUIRED_COLS = {'Stock', 'Ticker'}
+MAX_REJECTED_KEPT = 1000
+
 
 class InputLoader:
-    def __init__(self):
+    def __init__(self, float32=False, chunksize=100_000):
         self.analysis_df = pd.DataFrame()
+        self.float32 = float32
+        self.chunksize = chunksize
+        self.report = self._empty_report()
+        self.rejected_df = pd.DataFrame()
 
     def upload_interface(self):
+        import streamlit as st  # hanya UI; read_file bisa dipakai tanpa Streamlit
+
         st.subheader("📂 Upload Data Analisis Awal")
-        uploaded_file = st.file_uploader("Unggah file CSV (data screening atau watchlist)", type=["csv"])
+        uploaded_file = st.file_uploader("Unggah file CSV, Parquet atau Feather (data screening atau watchlist)",
+                                         type=["csv", "parquet", "feather"])
 
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                clean_df = self._clean_df(df)
+                clean_df = self.read_file(uploaded_file, uploaded_file.name)
                 if not clean_df.empty:
                     self.analysis_df = clean_df
                     st.success("File berhasil diproses dan dimuat.")
+                    if self.report['rows_rejected']:
+                        st.warning(f"{self.report['rows_rejected']} baris ditolak saat pembersihan: "
+                                   f"{self.report['rejected_reasons']}")
                     st.dataframe(self.analysis_df.head(), use_container_width=True)
                 else:
                     st.warning("File tidak memiliki kolom yang sesuai.")
             except Exception as e:
                 st.error(f"Gagal membaca file: {str(e)}")
 
+    def read_file(self, source, name=None):
+        """
+        Membaca CSV (streaming per potongan), Parquet atau Feather lalu membersihkan
+        dengan skema kolom. Ringkasan baris yang ditolak tersedia di self.report.
+        """
+        self.report = self._empty_report()
+        self.rejected_df = pd.DataFrame()
+        name = (name or (source if isinstance(source, str) else '')).lower()
+        ext = os.path.splitext(name)[1]
+
+        if ext == '.parquet':
+            chunks = [pd.read_parquet(source)]
+        elif ext == '.feather':
+            chunks = [pd.read_feather(source)]
+        else:
+            chunks = self._csv_chunks(source)
+
+        cleaned = [self._clean_df(chunk) for chunk in chunks]
+        cleaned = [chunk for chunk in cleaned if not chunk.empty]
+        if not cleaned:
+            return pd.DataFrame()
+        df = pd.concat(cleaned, ignore_index=True) if len(cleaned) > 1 else cleaned[0]
+        for col in TEXT_COLS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        self.report['rows_loaded'] = len(df)
+        return df
+
+    def _csv_chunks(self, source):
+        """
+        Pembaca CSV streaming: pyarrow (multi-thread, per blok) jika tersedia,
+        selain itu pandas per `chunksize` baris
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pacsv
+        except ImportError:
+            pacsv = None
+
+        if pacsv is not None:
+            try:
+                reader = pacsv.open_csv(source, convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+                chunks = []
+                for batch in reader:
+                    chunks.append(batch.to_pandas())
+                return chunks
+            except pa.ArrowInvalid:
+                # Inferensi tipe dari blok pertama gagal di blok berikutnya; ulang dengan pandas
+                if hasattr(source, 'seek'):
+                    source.seek(0)
+
+        return pd.read_csv(source, chunksize=self.chunksize)
+
     def _clean_df(self, df):
-        required_cols = {'Stock', 'Ticker'}
         df.columns = [col.strip() for col in df.columns]  # bersihkan spasi
-        if not required_cols.issubset(set(df.columns)):
+        if not REQUIRED_COLS.issubset(set(df.columns)):
             return pd.DataFrame()
 
-        df = df.copy()
-        numeric_cols = [col for col in df.columns if col not in ['Stock', 'Ticker', 'Sector']]
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        self.report['rows_read'] += len(df)
+        for col in df.columns:
+            kind = SCHEMA.get(col, 'float')
+            if kind == 'category':
+                continue
+            values = df[col]
+            if not pd.api.types.is_numeric_dtype(values):
+                converted = pd.to_numeric(values, errors='coerce')
+                coerced = int((converted.isna() & values.notna()).sum())
+                if coerced:
+                    self.report['coerced_values'][col] = self.report['coerced_values'].get(col, 0) + coerced
+                values = converted
+            dtype = np.float32 if kind == 'ratio' and self.float32 else np.float64
+            df[col] = values.astype(dtype, copy=False)
+
+        # Hanya baris tanpa Ticker yang dibuang; baris tanpa Stock tetap dimuat
+        rejected = df['Ticker'].isna()
+        if rejected.any():
+            reasons = self.report['rejected_reasons']
+            reasons['missing Ticker'] = reasons.get('missing Ticker', 0) + int(rejected.sum())
+            self.report['rows_rejected'] += int(rejected.sum())
+            if len(self.rejected_df) < MAX_REJECTED_KEPT:
+                kept = df[rejected].head(MAX_REJECTED_KEPT - len(self.rejected_df))
+                self.rejected_df = pd.concat([self.rejected_df, kept], ignore_index=True)
+            df = df[~rejected]
+        return df.reset_index(drop=True)
 
-        return df.dropna(subset=['Ticker']).reset_index(drop=True)
+    @staticmethod
+    def _empty_report():
+        return {'rows_read': 0, 'rows_loaded': 0, 'rows_rejected': 0, 'rejected_reasons': {}, 'coerced_values': {}}
 
     def get_analysis_data(self):
         return self.analysis_df
@@ -0,0 +1,314 @@
+# data/ledger.py
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+BUY, SELL, DIVIDEND, ADJUST = 0, 1, 2, 3
+SIDES = {'buy': BUY, 'sell': SELL, 'dividend': DIVIDEND, 'adjust': ADJUST}
+SIDE_NAMES = {v: k for k, v in SIDES.items()}
+# Batch transaksi sebesar ini atau lebih diproses metode 'average' secara tervektorisasi
+VECTOR_MIN_ROWS = 256
+EPS = 1e-9
+POSITION_COLUMNS = ['Stock', 'Ticker', 'Balance', 'Lot Balance', 'Avg Price', 'Stock Value', 'Realized P&L', 'Dividends']
+
+
+class TransactionLedger:
+    """
+    Buku transaksi beli/jual/dividen dalam array numpy kolumnar yang tumbuh dua kali lipat,
+    sehingga jutaan baris tetap hemat memori. Kode saham disimpan sebagai integer.
+    quantity dalam lembar; untuk dividen, price = dividen per lembar.
+    'adjust' menetapkan posisi menjadi quantity @ price (koreksi manual dari editor).
+    """
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._date = np.empty(capacity, dtype='datetime64[ns]')
+        self._code = np.empty(capacity, dtype=np.int32)
+        self._side = np.empty(capacity, dtype=np.int8)
+        self._quantity = np.empty(capacity, dtype=np.float64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._fee = np.empty(capacity, dtype=np.float64)
+        self.stocks = []
+        self.tickers = {}
+        self._codes = {}
+        # Jumlah baris yang sudah tersimpan di store (lihat PortfolioManager.save_ledger)
+        self.saved = 0
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Ledger dari DataFrame transaksi (format extend), misalnya hasil store.load_transactions()
+        """
+        ledger = cls(capacity=max(1024, 2 * len(frame)))
+        if len(frame):
+            ledger.extend(frame)
+        return ledger
+
+    def code(self, stock, ticker=None):
+        if stock not in self._codes:
+            self._codes[stock] = len(self.stocks)
+            self.stocks.append(stock)
+        if ticker is not None:
+            self.tickers[stock] = ticker
+        return self._codes[stock]
+
+    def append(self, stock, side, quantity, price, ticker=None, date=None, fee=0.0):
+        self._reserve(self._size + 1)
+        i = self._size
+        self._date[i] = np.datetime64(pd.Timestamp(date) if date is not None else pd.Timestamp.now(), 'ns')
+        self._code[i] = self.code(stock, ticker)
+        self._side[i] = SIDES[side] if isinstance(side, str) else side
+        self._quantity[i] = quantity
+        self._price[i] = price
+        self._fee[i] = fee
+        self._size += 1
+        return i
+
+    def extend(self, frame):
+        """
+        Menambah banyak transaksi sekaligus dari DataFrame (Stock, Side, Quantity, Price,
+        opsional Ticker, Date, Fee) tanpa loop per baris
+        """
+        n = len(frame)
+        self._reserve(self._size + n)
+        sl = slice(self._size, self._size + n)
+        if 'Ticker' in frame.columns:
+            known = frame['Ticker'].notna().to_numpy()
+            self.tickers.update(zip(frame['Stock'][known], frame['Ticker'][known]))
+        codes = {stock: self.code(stock) for stock in pd.unique(frame['Stock'])}
+        self._code[sl] = frame['Stock'].map(codes).to_numpy(dtype=np.int32)
+        side = frame['Side']
+        self._side[sl] = (side if pd.api.types.is_numeric_dtype(side) else side.map(SIDES)).to_numpy(dtype=np.int8)
+        self._quantity[sl] = frame['Quantity'].to_numpy(dtype=np.float64)
+        self._price[sl] = frame['Price'].to_numpy(dtype=np.float64)
+        self._fee[sl] = frame['Fee'].to_numpy(dtype=np.float64) if 'Fee' in frame.columns else 0.0
+        dates = pd.to_datetime(frame['Date']) if 'Date' in frame.columns else pd.Timestamp.now()
+        self._date[sl] = np.asarray(dates, dtype='datetime64[ns]')
+        self._size += n
+
+    def rows(self, start=0):
+        """
+        Array (code, side, quantity, price, fee) mulai dari baris `start` (view, tanpa salinan)
+        """
+        sl = slice(start, self._size)
+        return self._code[sl], self._side[sl], self._quantity[sl], self._price[sl], self._fee[sl]
+
+    def to_frame(self, start=0):
+        sl = slice(start, self._size)
+        stocks = np.asarray(self.stocks, dtype=object)[self._code[sl]]
+        return pd.DataFrame({
+            'Date': self._date[sl],
+            'Stock': pd.Categorical.from_codes(self._code[sl], categories=self.stocks),
+            'Ticker': pd.Series(stocks).map(self.tickers).to_numpy(),
+            'Side': pd.Categorical.from_codes(self._side[sl], categories=[SIDE_NAMES[i] for i in range(4)]),
+            'Quantity': self._quantity[sl],
+            'Price': self._price[sl],
+            'Fee': self._fee[sl],
+        })
+
+    @classmethod
+    def from_positions(cls, df, date=None):
+        """
+        Membuka buku dari posisi yang sudah ada (saldo awal sebagai transaksi 'adjust',
+        dengan harga = Stock Value / Balance agar nilai modal tetap sama)
+        """
+        balance = df['Balance'].to_numpy(dtype=float)
+        stock_value = df['Stock Value'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price = np.where(balance > 0, stock_value / balance, df['Avg Price'].to_numpy(dtype=float))
+        ledger = cls(capacity=max(1024, 2 * len(df)))
+        ledger.extend(pd.DataFrame({
+            'Stock': df['Stock'].to_numpy(),
+            'Ticker': df['Ticker'].to_numpy(),
+            'Side': 'adjust',
+            'Quantity': balance,
+            'Price': price,
+            'Date': pd.Timestamp(date) if date is not None else pd.Timestamp.now(),
+        }))
+        return ledger
+
+    def _reserve(self, size):
+        capacity = len(self._code)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('_date', '_code', '_side', '_quantity', '_price', '_fee'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+
+class CostBasisEngine:
+    """
+    Menurunkan posisi dari ledger dengan metode 'average' (harga rata-rata) atau 'fifo'.
+    update() hanya memproses baris ledger yang belum pernah dilihat, jadi transaksi
+    baru tidak memicu replay seluruh histori. Batch besar dengan metode 'average'
+    (misalnya replay penuh dari store) dihitung tervektorisasi; 'fifo' selalu per baris.
+    """
+    def __init__(self, ledger, method='average'):
+        if method not in ('average', 'fifo'):
+            raise ValueError(f"Unknown cost basis method: {method}")
+        self.ledger = ledger
+        self.method = method
+        self.processed = 0
+        self.quantity = {}
+        self.cost = {}
+        self.realized = {}
+        self.dividends = {}
+        self.lots = {}
+
+    def update(self):
+        """
+        Memproses transaksi baru; mengembalikan daftar saham yang posisinya berubah
+        """
+        codes, sides, quantities, prices, fees = self.ledger.rows(self.processed)
+        if self.method == 'average' and len(codes) >= VECTOR_MIN_ROWS:
+            self._apply_average_batch(codes, sides, quantities, prices, fees)
+            self.processed += len(codes)
+            return sorted(self.ledger.stocks[c] for c in np.unique(codes).tolist())
+        touched = set()
+        for code, side, qty, price, fee in zip(codes.tolist(), sides.tolist(), quantities.tolist(),
+                                               prices.tolist(), fees.tolist()):
+            self._apply(code, side, qty, price, fee)
+            self.processed += 1
+            touched.add(self.ledger.stocks[code])
+        return sorted(touched)
+
+    def position(self, stock):
+        code = self.ledger._codes.get(stock)
+        qty = self.quantity.get(code, 0.0)
+        cost = self.cost.get(code, 0.0)
+        return {
+            'Stock': stock,
+            'Ticker': self.ledger.tickers.get(stock),
+            'Balance': qty,
+            'Lot Balance': qty / 100,
+            'Avg Price': cost / qty if qty else 0.0,
+            'Stock Value': cost,
+            'Realized P&L': self.realized.get(code, 0.0),
+            'Dividends': self.dividends.get(code, 0.0),
+        }
+
+    def positions(self, stocks=None):
+        self.update()
+        stocks = self.ledger.stocks if stocks is None else stocks
+        return pd.DataFrame([self.position(s) for s in stocks], columns=POSITION_COLUMNS)
+
+    def _apply(self, code, side, qty, price, fee):
+        held = self.quantity.get(code, 0.0)
+        if side == BUY:
+            self.quantity[code] = held + qty
+            self.cost[code] = self.cost.get(code, 0.0) + qty * price + fee
+            if self.method == 'fifo':
+                self.lots.setdefault(code, deque()).append([qty, price + fee / qty if qty else price])
+        elif side == SELL:
+            if qty > held + 1e-9:
+                raise ValueError(f"Cannot sell {qty:g} shares of {self.ledger.stocks[code]}, only {held:g} held")
+            removed_cost = self._remove_cost(code, qty, held)
+            self.quantity[code] = held - qty
+            self.cost[code] = self.cost.get(code, 0.0) - removed_cost
+            self.realized[code] = self.realized.get(code, 0.0) + qty * price - fee - removed_cost
+        elif side == DIVIDEND:
+            self.dividends[code] = self.dividends.get(code, 0.0) + held * price - fee
+        elif side == ADJUST:
+            self.quantity[code] = qty
+            self.cost[code] = qty * price
+            if self.method == 'fifo':
+                self.lots[code] = deque([[qty, price]]) if qty else deque()
+
+    def _apply_average_batch(self, codes, sides, quantities, prices, fees):
+        """
+        Metode harga rata-rata untuk banyak transaksi sekaligus. Per saham (urutan waktu
+        dijaga dengan sort stabil) jumlah lembar adalah cumsum dalam segmen yang dimulai
+        saldo awal, transaksi 'adjust' atau setelah posisi ditutup. Modal mengikuti
+        c_t = r_t * c_(t-1) + b_t (b = biaya beli, r = sisa lembar setelah jual / sebelum
+        jual), diselesaikan dengan cumprod r dan cumsum b / P per segmen (groupby).
+        """
+        order = np.argsort(codes, kind='stable')
+        code = codes[order].astype(np.int64)
+        side = sides[order]
+        qty = quantities[order]
+        price = prices[order]
+        fee = fees[order]
+        n = len(code)
+        buy, sell, dividend, adjust = side == BUY, side == SELL, side == DIVIDEND, side == ADJUST
+
+        first = np.ones(n, dtype=bool)
+        first[1:] = code[1:] != code[:-1]
+        q0 = np.array([self.quantity.get(c, 0.0) for c in code[first].tolist()])
+        c0 = np.array([self.cost.get(c, 0.0) for c in code[first].tolist()])
+        code_start = np.repeat(np.arange(len(q0)), np.diff(np.append(np.flatnonzero(first), n)))
+
+        def segment_cumsum(values, starts):
+            return pd.Series(values).groupby(np.cumsum(starts)).cumsum().to_numpy()
+
+        # Jumlah lembar: segmen dimulai di saham baru atau transaksi adjust
+        start1 = first | adjust
+        delta = np.where(buy, qty, np.where(sell, -qty, 0.0))
+        delta = np.where(adjust, qty, delta + np.where(first, q0[code_start], 0.0))
+        q_after = segment_cumsum(delta, start1)
+        q_before = np.where(sell, q_after + qty, q_after)
+
+        oversold = np.flatnonzero(sell & (q_after < -EPS))
+        if len(oversold):
+            i = oversold[np.argmin(order[oversold])]
+            raise ValueError(f"Cannot sell {qty[i]:g} shares of {self.ledger.stocks[code[i]]}, "
+                             f"only {q_before[i]:g} held")
+        closing = sell & (np.abs(q_after) <= EPS)
+        q_after = np.where(closing, 0.0, q_after)
+
+        # Modal: segmen juga dimulai setelah posisi ditutup (modal kembali nol)
+        reopened = np.zeros(n, dtype=bool)
+        reopened[1:] = closing[:-1] & ~first[1:]
+        start2 = start1 | reopened
+        base_c = np.where(adjust, qty * price, np.where(first, c0[code_start], 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(sell & ~closing & (q_before > 0), q_after / q_before, 1.0)
+        scale = pd.Series(ratio).groupby(np.cumsum(start2)).cumprod().to_numpy()
+        added = np.where(buy, qty * price + fee, 0.0) / scale
+        added = np.where(start2, added + base_c, added)
+        c_after = scale * segment_cumsum(added, start2)
+        c_after = np.where(closing, 0.0, c_after)
+
+        c_before = np.empty(n)
+        c_before[1:] = c_after[:-1]
+        c_before = np.where(start2 & ~adjust, np.where(first, c0[code_start], 0.0), c_before)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            removed = np.where(sell & (q_before > 0), c_before * qty / q_before, 0.0)
+        realized = np.where(sell, qty * price - fee - removed, 0.0)
+        income = np.where(dividend, q_after * price - fee, 0.0)
+
+        last = np.append(np.flatnonzero(first)[1:] - 1, n - 1)
+        unique_codes = code[first]
+        realized_sum = np.bincount(code_start, realized, minlength=len(unique_codes))
+        income_sum = np.bincount(code_start, income, minlength=len(unique_codes))
+        has_sell = np.bincount(code_start, sell, minlength=len(unique_codes)) > 0
+        has_dividend = np.bincount(code_start, dividend, minlength=len(unique_codes)) > 0
+        for k, c in enumerate(unique_codes.tolist()):
+            self.quantity[c] = float(q_after[last[k]])
+            self.cost[c] = float(c_after[last[k]])
+            if has_sell[k]:
+                self.realized[c] = self.realized.get(c, 0.0) + float(realized_sum[k])
+            if has_dividend[k]:
+                self.dividends[c] = self.dividends.get(c, 0.0) + float(income_sum[k])
+
+    def _remove_cost(self, code, qty, held):
+        if self.method == 'average':
+            return self.cost.get(code, 0.0) * (qty / held) if held else 0.0
+        lots = self.lots.get(code, deque())
+        removed = 0.0
+        remaining = qty
+        while remaining > 1e-9 and lots:
+            lot = lots[0]
+            take = min(lot[0], remaining)
+            removed += take * lot[1]
+            lot[0] -= take
+            remaining -= take
+            if lot[0] <= 1e-9:
+                lots.popleft()
+        return removed
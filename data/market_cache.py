@@ -0,0 +1,146 @@
+# data/market_cache.py
+import hashlib
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from utils.lru import LRUCache
+from .market_data import DIVIDEND_COLUMNS, QuoteProvider
+
+DEFAULT_TTL = {
+    'quote': 5 * 60,         # harga terakhir
+    'history': 6 * 60 * 60,  # bar harian
+    'dividends': 24 * 60 * 60,  # riwayat dividen per ticker
+}
+
+
+class MarketDataCache:
+    """
+    Cache data pasar dua tingkat: LRU di memori di depan penyimpanan di disk.
+    Setiap jenis data (quote, history, ...) punya TTL sendiri dalam detik.
+    """
+    def __init__(self, directory=None, ttl=None, maxsize=1024):
+        self.directory = directory or os.environ.get('MODUL_CACHE_DIR', os.path.join('.cache', 'market_data'))
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.memory = LRUCache(maxsize)
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def get(self, kind, key, allow_stale=False):
+        """
+        Mengembalikan nilai yang masih berlaku (atau None). allow_stale=True
+        mengabaikan TTL, dipakai untuk harga cadangan saat fetch gagal.
+        """
+        entry = self.memory.get((kind, key))
+        if entry is None:
+            entry = self._read_disk(kind, key)
+            if entry is not None:
+                self.memory.set((kind, key), entry)
+                if allow_stale or self._fresh(kind, entry):
+                    self.stats['disk_hits'] += 1
+                    return entry[1]
+        if entry is not None and (allow_stale or self._fresh(kind, entry)):
+            self.stats['hits'] += 1
+            return entry[1]
+        self.stats['misses'] += 1
+        return None
+
+    def set(self, kind, key, value):
+        entry = (time.time(), value)
+        self.memory.set((kind, key), entry)
+        self._write_disk(kind, key, entry)
+
+    def get_or_fetch(self, kind, key, fetch):
+        value = self.get(kind, key)
+        if value is None:
+            value = fetch()
+            # Hasil kosong biasanya kegagalan sementara (offline, error yfinance); jangan disimpan
+            if value is not None and not getattr(value, 'empty', False):
+                self.set(kind, key, value)
+        return value
+
+    def clear(self):
+        self.memory.clear()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _fresh(self, kind, entry):
+        return time.time() - entry[0] <= self.ttl.get(kind, 0)
+
+    def _path(self, kind, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, kind, f"{digest}.pkl")
+
+    def _read_disk(self, kind, key):
+        try:
+            with open(self._path(kind, key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def _write_disk(self, kind, key, entry):
+        path = self._path(kind, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # cache disk bersifat opsional, cukup di memori
+
+
+class CachedQuoteProvider(QuoteProvider):
+    """
+    Membungkus provider lain; hanya ticker yang belum ada di cache yang diambil ulang
+    """
+    def __init__(self, provider, cache=None):
+        self.provider = provider
+        self.cache = cache if cache is not None else MarketDataCache()
+
+    def fetch_last_prices(self, tickers, progress=None):
+        prices = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            price = self.cache.get('quote', ticker)
+            if price is None:
+                missing.append(ticker)
+            else:
+                prices[ticker] = price
+
+        if missing:
+            fetched = self.provider.fetch_last_prices(missing, progress=progress)
+            for ticker, price in fetched.items():
+                self.cache.set('quote', ticker, price)
+            prices.update(fetched)
+        elif progress is not None:
+            progress(1, 1)
+        return prices
+
+    def fetch_history(self, symbol, period="3mo"):
+        hist = self.cache.get_or_fetch('history', (symbol, period),
+                                       lambda: self.provider.fetch_history(symbol, period))
+        return hist.copy() if hist is not None else None
+
+    def fetch_dividends(self, tickers, progress=None):
+        dividends = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            frame = self.cache.get('dividends', ticker)
+            if frame is None:
+                missing.append(ticker)
+            elif not frame.empty:
+                dividends[ticker] = frame.copy()
+
+        if missing:
+            fetched = self.provider.fetch_dividends(missing, progress=progress)
+            for ticker in missing:
+                # ticker tanpa dividen juga di-cache (frame kosong) agar tidak diambil ulang tiap rerun
+                self.cache.set('dividends', ticker, fetched.get(ticker, pd.DataFrame(columns=DIVIDEND_COLUMNS)))
+            dividends.update(fetched)
+        elif progress is not None:
+            progress(1, 1)
+        return dividends
+
+    def last_known_price(self, ticker):
+        return self.cache.get('quote', ticker, allow_stale=True)
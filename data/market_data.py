@@ -0,0 +1,191 @@
+# data/market_data.py
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+DIVIDEND_COLUMNS = ['Ex Date', 'Pay Date', 'Amount']
+
+
+def iter_batches(items, batch_size):
+    """
+    Memecah daftar ticker menjadi potongan berukuran batch_size
+    """
+    items = list(items)
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+class QuoteProvider:
+    """
+    Antarmuka sumber harga pasar. Implementasi mengembalikan dict ticker -> harga
+    terakhir; ticker yang gagal diambil cukup dihilangkan dari hasil.
+    """
+    def fetch_last_prices(self, tickers, progress=None):
+        raise NotImplementedError
+
+    def fetch_history(self, symbol, period="3mo"):
+        raise NotImplementedError
+
+    def last_known_price(self, ticker):
+        return None
+
+    def fetch_dividends(self, tickers, progress=None):
+        """
+        Riwayat dividen per ticker: dict ticker -> DataFrame (Ex Date, Pay Date, Amount).
+        Ticker tanpa data cukup dihilangkan dari hasil.
+        """
+        return {}
+
+    def fetch_histories(self, symbols, period="3mo", max_workers=4):
+        """
+        Histori beberapa simbol sekaligus (paralel di thread pool); simbol yang gagal
+        atau kosong dihilangkan dari hasil
+        """
+        symbols = list(dict.fromkeys(symbols))
+        histories = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols) or 1))) as pool:
+            futures = {pool.submit(self.fetch_history, symbol, period): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                try:
+                    hist = future.result()
+                except Exception:
+                    continue
+                if hist is not None and not hist.empty:
+                    histories[futures[future]] = hist
+        return histories
+
+
+class YFinanceProvider(QuoteProvider):
+    """
+    Mengambil harga dari yfinance per batch (satu download multi-ticker per batch),
+    dengan thread pool terbatas, timeout dan retry. Ticker yang tidak ikut terisi
+    dari download batch diambil ulang satu per satu di pool yang sama.
+    """
+    def __init__(self, batch_size=50, max_workers=4, timeout=10, retries=2, backoff=0.5):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def fetch_last_prices(self, tickers, progress=None):
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+
+        batches = list(iter_batches(tickers, self.batch_size))
+        prices = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._with_retry, self._download_batch, batch) for batch in batches]
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    prices.update(future.result())
+                except Exception:
+                    pass
+                if progress is not None:
+                    progress(done, len(batches))
+
+            missing = [t for t in tickers if t not in prices]
+            futures = {pool.submit(self._with_retry, self._download_single, t): t for t in missing}
+            for future in as_completed(futures):
+                try:
+                    price = future.result()
+                except Exception:
+                    continue
+                if price is not None:
+                    prices[futures[future]] = price
+        return prices
+
+    def fetch_history(self, symbol, period="3mo"):
+        import yfinance as yf  # impor berat, dimuat saat fetch pertama
+        return self._with_retry(lambda: yf.Ticker(symbol).history(period=period, timeout=self.timeout))
+
+    def fetch_dividends(self, tickers, progress=None):
+        tickers = list(dict.fromkeys(tickers))
+        dividends = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._with_retry, self._download_dividends, t): t for t in tickers}
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    frame = future.result()
+                except Exception:
+                    frame = None
+                if frame is not None and not frame.empty:
+                    dividends[futures[future]] = frame
+                if progress is not None:
+                    progress(done, len(futures))
+        return dividends
+
+    def _with_retry(self, func, *args):
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+
+    def _download_batch(self, batch):
+        import yfinance as yf
+        data = yf.download(batch, period='5d', progress=False, threads=False, timeout=self.timeout)
+        if data is None or data.empty:
+            return {}
+        close = data['Close']
+        if isinstance(close, pd.Series):
+            close = close.to_frame(batch[0])
+        last = close.ffill().iloc[-1].dropna()
+        return {ticker: float(price) for ticker, price in last.items()}
+
+    def _download_single(self, ticker):
+        import yfinance as yf
+        hist = yf.Ticker(ticker).history(period='5d', timeout=self.timeout)
+        if hist.empty:
+            return None
+        return float(hist['Close'].iloc[-1])
+
+
+    def _download_dividends(self, ticker):
+        import yfinance as yf
+        series = yf.Ticker(ticker).dividends  # index = ex-date; yfinance tidak memberi tanggal bayar
+        if series is None or series.empty:
+            return None
+        dates = pd.DatetimeIndex(series.index)
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        return pd.DataFrame({'Ex Date': dates.normalize(), 'Pay Date': pd.NaT,
+                             'Amount': series.to_numpy(dtype=float)})
+
+
+class StubQuoteProvider(QuoteProvider):
+    """
+    Provider offline untuk pengujian: harga dan histori dari dict lokal.
+    Menghitung jumlah batch yang diminta lewat atribut `calls`.
+    """
+    def __init__(self, prices=None, history=None, batch_size=50, dividends=None):
+        self.prices = dict(prices or {})
+        self.history = dict(history or {})
+        self.dividends = dict(dividends or {})
+        self.batch_size = batch_size
+        self.calls = 0
+
+    def fetch_last_prices(self, tickers, progress=None):
+        batches = list(iter_batches(dict.fromkeys(tickers), self.batch_size))
+        prices = {}
+        for done, batch in enumerate(batches, start=1):
+            self.calls += 1
+            prices.update({t: self.prices[t] for t in batch if t in self.prices})
+            if progress is not None:
+                progress(done, len(batches))
+        return prices
+
+    def fetch_history(self, symbol, period="3mo"):
+        self.calls += 1
+        return self.history.get(symbol, pd.DataFrame(columns=['Close'])).copy()
+
+    def fetch_dividends(self, tickers, progress=None):
+        self.calls += 1
+        found = {t: self.dividends[t].copy() for t in dict.fromkeys(tickers) if t in self.dividends}
+        if progress is not None:
+            progress(1, 1)
+        return found
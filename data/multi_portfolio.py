@@ -0,0 +1,227 @@
+# data/multi_portfolio.py
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .market_cache import CachedQuoteProvider
+from .market_data import YFinanceProvider
+from .portfolio_manager import DRIFT_STOCKS, PortfolioManager
+from .price_panel import PricePanelMixin
+from utils.lru import LRUCache
+
+# Kolom posisi per akun; Stock/Sector/Market Price disimpan sekali per instrumen
+HOLDING_COLUMNS = ['Account', 'Ticker', 'Lot Balance', 'Balance', 'Avg Price', 'Stock Value']
+LOT_SIZE = 100
+
+
+class MultiPortfolioManager(PricePanelMixin):
+    """
+    Banyak portofolio (akun) dalam satu tabel posisi panjang berkunci (Account, Ticker).
+    Data pasar disimpan sekali per instrumen unik: satu vektor harga terakhir dan satu
+    panel histori (tanggal x saham) yang dipakai bersama semua akun, sehingga memori
+    mengikuti jumlah ticker unik, bukan akun x ticker. Posisi hanya menyimpan kode
+    kategori akun/ticker dan angka saldo.
+    """
+    fill_missing_returns = True
+
+    def __init__(self, holdings, provider=None, history=None):
+        self.provider = provider if provider is not None else CachedQuoteProvider(YFinanceProvider())
+        self.memo = LRUCache(maxsize=64)
+        self.data_version = 0
+        self.history_version = 0
+        self.history_epoch = 0
+        self._panel_cache = {}
+        self.last_update = datetime.now()
+        self.last_error = None
+        self.set_holdings(holdings)
+        self.set_price_history(history if history is not None else self.generate_historical_data())
+
+    @classmethod
+    def from_frames(cls, frames, provider=None, history=None):
+        """
+        Dari dict akun -> DataFrame portofolio (format PortfolioManager.df)
+        """
+        holdings = pd.concat({account: df for account, df in frames.items()}, names=['Account'])
+        return cls(holdings.reset_index(level='Account').reset_index(drop=True), provider, history)
+
+    @classmethod
+    def from_managers(cls, managers, provider=None):
+        """
+        Menggabungkan beberapa PortfolioManager; histori harga digabung menjadi satu panel
+        """
+        managers = dict(managers)
+        first = next(iter(managers.values()), None)
+        panels = [pm.price_panel() for pm in managers.values()]
+        history = None
+        if panels:
+            history = pd.concat(panels, axis=1)
+            history = history.loc[:, ~history.columns.duplicated()]
+        return cls.from_frames({account: pm.df for account, pm in managers.items()},
+                               provider if provider is not None else getattr(first, 'provider', None), history)
+
+    def set_holdings(self, holdings):
+        """
+        Menormalkan tabel posisi: Balance/Lot Balance saling melengkapi, Stock Value
+        dihitung bila tidak ada, dan posisi ganda (Account, Ticker) digabung dengan harga
+        rata-rata tertimbang. Atribut instrumen (Stock, Sector, Market Price) diambil dari
+        kemunculan pertama tiap ticker.
+        """
+        missing = {'Account', 'Ticker', 'Avg Price'} - set(holdings.columns)
+        if missing or not {'Balance', 'Lot Balance'} & set(holdings.columns):
+            raise ValueError("Kolom posisi harus mengandung: Account, Ticker, Avg Price dan Balance atau Lot Balance")
+
+        df = holdings.reset_index(drop=True)
+        if 'Balance' in df.columns:
+            balance = pd.to_numeric(df['Balance'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        else:
+            balance = pd.to_numeric(df['Lot Balance'], errors='coerce').fillna(0).to_numpy(dtype=float) * LOT_SIZE
+        avg_price = pd.to_numeric(df['Avg Price'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        cost = (pd.to_numeric(df['Stock Value'], errors='coerce').fillna(0).to_numpy(dtype=float)
+                if 'Stock Value' in df.columns else balance * avg_price)
+
+        tickers = df['Ticker'].astype(str).to_numpy()
+        ticker_codes, unique_tickers = pd.factorize(tickers)
+        first = np.unique(ticker_codes, return_index=True)[1]
+        stocks = (df['Stock'].astype(str).to_numpy()[first] if 'Stock' in df.columns
+                  else np.char.partition(unique_tickers.astype(str), '.')[:, 0])
+        market_price = (pd.to_numeric(df['Market Price'], errors='coerce').to_numpy(dtype=float)[first]
+                        if 'Market Price' in df.columns else np.full(len(first), np.nan))
+        # Harga pasar yang belum diketahui memakai harga rata-rata posisi pertama
+        market_price = np.where(np.isnan(market_price), avg_price[first], market_price)
+        self.instruments = pd.DataFrame({
+            'Stock': stocks,
+            'Ticker': np.asarray(unique_tickers, dtype=object),
+            'Sector': df['Sector'].to_numpy()[first] if 'Sector' in df.columns else None,
+        })
+        self.market_prices = market_price.astype(np.float64)
+
+        account_codes, accounts = pd.factorize(df['Account'], sort=True)
+        key = account_codes.astype(np.int64) * len(unique_tickers) + ticker_codes
+        if len(np.unique(key)) != len(key):
+            key_codes, key_values = pd.factorize(key, sort=True)
+            balance = np.bincount(key_codes, balance)
+            cost = np.bincount(key_codes, cost)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                avg_price = np.where(balance != 0, cost / balance, 0.0)
+            account_codes, ticker_codes = np.divmod(key_values, len(unique_tickers))
+        else:
+            order = np.lexsort((ticker_codes, account_codes))
+            account_codes, ticker_codes = account_codes[order], ticker_codes[order]
+            balance, avg_price, cost = balance[order], avg_price[order], cost[order]
+
+        self.holdings = pd.DataFrame({
+            'Account': pd.Categorical.from_codes(account_codes, categories=pd.Index(accounts)),
+            'Ticker': pd.Categorical.from_codes(ticker_codes, categories=self.instruments['Ticker']),
+            'Lot Balance': balance / LOT_SIZE,
+            'Balance': balance,
+            'Avg Price': avg_price,
+            'Stock Value': cost,
+        })
+        self._panel_cache = {}
+        self.bump_version()
+
+    @property
+    def accounts(self):
+        return self.holdings['Account'].cat.categories
+
+    def account_codes(self):
+        return self.holdings['Account'].cat.codes.to_numpy()
+
+    def instrument_codes(self):
+        return self.holdings['Ticker'].cat.codes.to_numpy()
+
+    def positions(self):
+        """
+        Tabel posisi lengkap (format PortfolioManager.df + kolom Account) untuk semua akun;
+        harga, Stock dan Sector diambil dari data instrumen lewat kode ticker
+        """
+        if self._panel_cache.get('positions_version') != self.data_version:
+            codes = self.instrument_codes()
+            price = self.market_prices[codes]
+            balance = self.holdings['Balance'].to_numpy()
+            cost = self.holdings['Stock Value'].to_numpy()
+            df = pd.DataFrame({
+                'Account': self.holdings['Account'],
+                'Stock': self.instruments['Stock'].to_numpy()[codes],
+                'Ticker': self.holdings['Ticker'],
+                'Lot Balance': self.holdings['Lot Balance'],
+                'Balance': balance,
+                'Avg Price': self.holdings['Avg Price'],
+                'Stock Value': cost,
+                'Market Price': price,
+                'Market Value': balance * price,
+                'Unrealized': balance * price - cost,
+            })
+            if self.instruments['Sector'].notna().any():
+                df['Sector'] = self.instruments['Sector'].to_numpy()[codes]
+            self._panel_cache['positions'] = df
+            self._panel_cache['positions_version'] = self.data_version
+        return self._panel_cache['positions']
+
+    def portfolio(self, account):
+        """
+        Posisi satu akun dalam format PortfolioManager.df
+        """
+        df = self.positions()
+        return df[df['Account'] == account].drop(columns='Account').reset_index(drop=True)
+
+    def manager(self, account):
+        """
+        PortfolioManager untuk satu akun (agar analyzer lama bisa dipakai), berbagi provider
+        dan memakai potongan kolom panel harga bersama
+        """
+        df = self.portfolio(account)
+        if df.empty:
+            raise KeyError(f"Akun tidak ditemukan: {account}")
+        panel = self._price_panel
+        history = panel[panel.columns[panel.columns.isin(df['Stock'])]]
+        return PortfolioManager(provider=self.provider, portfolio=df, history=history)
+
+    def generate_historical_data(self, periods=100, end='2025-05-31', mode='gbm', seed=42):
+        """
+        Histori harga simulasi untuk semua instrumen unik sekaligus (satu kolom per saham)
+        """
+        dates = pd.date_range(end=end, periods=periods, freq='D')
+        stocks = self.instruments['Stock'].to_numpy()
+        prices = PortfolioManager.simulate_prices(self.market_prices, np.isin(stocks, DRIFT_STOCKS), periods,
+                                                  mode, seed)
+        return pd.DataFrame(prices, index=pd.Index(dates, name='Date'), columns=stocks)
+
+    def _align_history(self, history):
+        """
+        Kolom panel mengikuti urutan instrumen, sehingga kode ticker posisi langsung
+        menjadi indeks kolom. Saham tanpa histori berisi NaN.
+        """
+        history = history.loc[:, ~history.columns.duplicated()].reindex(columns=self.instruments['Stock'])
+        history.columns = pd.Index(self.instruments['Stock'])
+        return history
+
+    def _price_tickers(self):
+        return list(self.instruments['Ticker'])
+
+    def get_fallback_price(self, ticker):
+        """
+        Harga terakhir dari provider; None berarti harga instrumen saat ini dipertahankan
+        """
+        return self.provider.last_known_price(ticker)
+
+    def apply_prices(self, prices):
+        """
+        Memperbarui harga (dict ticker -> harga) sekali per instrumen; nilai posisi semua
+        akun dihitung ulang saat positions() dipanggil
+        """
+        new = self.instruments['Ticker'].map(prices).to_numpy(dtype=float, na_value=np.nan)
+        self.market_prices = np.where(np.isnan(new), self.market_prices, new)
+        self.bump_version()
+
+    def exposure_matrix(self, values='Market Value'):
+        """
+        Matriks sparse akun x instrumen (CSR) berisi kolom `values` posisi, misalnya
+        'Balance' atau 'Market Value'. Ukurannya sebanding jumlah posisi.
+        """
+        from scipy import sparse  # scipy baru dimuat saat dibutuhkan
+
+        data = self.positions()[values].to_numpy(dtype=np.float64)
+        shape = (len(self.accounts), len(self.instruments))
+        return sparse.csr_matrix((data, (self.account_codes(), self.instrument_codes())), shape=shape)
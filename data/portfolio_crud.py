@@ -1,12 +1,18 @@
 # data/portfolio_crud.py
-import streamlit as st
 import pandas as pd
+import numpy as np
+
+# Kolom yang bisa diubah lewat data editor
+EDITABLE_COLS = ['Ticker', 'Lot Balance', 'Avg Price']
+NUMERIC_COLS = ['Lot Balance', 'Balance', 'Avg Price', 'Stock Value', 'Market Price', 'Market Value', 'Unrealized']
 
 class PortfolioCRUD:
     def __init__(self, portfolio_manager):
         self.pm = portfolio_manager
 
     def display_editor(self):
+        import streamlit as st  # hanya UI; operasi CRUD lain bisa dipakai tanpa Streamlit
+
         st.subheader("✏️ Edit Data Saham (CRUD)")
 
         #with st.expander("📂 Upload File Portofolio (CSV)"):
@@ -28,10 +34,27 @@ class PortfolioCRUD:
             new_price = st.number_input("Harga Beli per Lembar", min_value=0)
 
             if st.button("Tambah ke Portofolio") and new_stock and new_ticker:
-                self.add_stock(new_stock, new_ticker, new_lot, new_price)
-                st.session_state.portfolio = self.pm
-                st.success(f"Saham {new_stock} ditambahkan.")
-                st.rerun()
+                try:
+                    self.add_stock(new_stock, new_ticker, new_lot, new_price)
+                    st.session_state.portfolio = self.pm
+                    st.success(f"Saham {new_stock} ditambahkan.")
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
+
+        with st.expander("➖ Jual Saham"):
+            sell_stock = st.selectbox("Kode Saham", list(self.pm.df['Stock']), key="sell_stock")
+            sell_lot = st.number_input("Jumlah Lot Dijual", min_value=0, step=1, key="sell_lot")
+            sell_price = st.number_input("Harga Jual per Lembar", min_value=0, key="sell_price")
+
+            if st.button("Catat Penjualan") and sell_stock and sell_lot:
+                try:
+                    self.sell_stock(sell_stock, sell_lot, sell_price)
+                    st.session_state.portfolio = self.pm
+                    st.success(f"Penjualan {sell_stock} dicatat.")
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
 
         with st.expander("📝 Edit / Hapus Saham yang Ada"):
             df = self.pm.df.copy()
@@ -41,53 +64,193 @@ class PortfolioCRUD:
                 key="edit_table"
             )
             if st.button("Simpan Perubahan"):
-                self.update_from_editor(edited_df)
-                st.success("Portofolio diperbarui.")
-                st.rerun()
+                try:
+                    self.update_from_editor(edited_df)
+                    st.session_state.portfolio = self.pm
+                    st.success("Portofolio diperbarui.")
+                    st.rerun()
+                except ValueError as e:
+                    st.error(str(e))
 
         st.markdown("---")
         if st.button("🔁 Refresh Data & Tampilan"):
             st.rerun()
 
     def add_stock(self, stock, ticker, lot, avg_price):
+        if lot <= 0:
+            raise ValueError(f"Jumlah lot {stock} harus lebih dari 0")
+        self.record_transaction(stock, 'buy', lot * 100, avg_price, ticker=ticker)
+
+    def sell_stock(self, stock, lot, price, fee=0.0):
+        self.record_transaction(stock, 'sell', lot * 100, price, fee=fee)
+
+    def record_dividend(self, stock, dividend_per_share):
+        self.record_transaction(stock, 'dividend', 0, dividend_per_share)
+
+    def record_transaction(self, stock, side, quantity, price, ticker=None, date=None, fee=0.0):
+        """
+        Menambah satu transaksi ke ledger; hanya baris saham tersebut yang dihitung ulang
+        """
+        if side == 'sell':
+            held = self.pm.cost_basis.position(stock)['Balance']
+            if quantity > held:
+                raise ValueError(f"Jumlah jual {quantity:g} lembar melebihi saldo {stock} ({held:g} lembar)")
+        self.pm.ledger.append(stock, side, quantity, price, ticker=ticker, date=date, fee=fee)
+        self.pm.save_ledger()
+        self.sync_positions(self.pm.cost_basis.update())
+
+    def sync_positions(self, stocks):
+        """
+        Menyalin posisi hasil cost-basis engine ke pm.df untuk saham yang disebutkan
+        """
+        if not stocks:
+            return
+        positions = self.pm.cost_basis.positions(stocks).set_index('Stock')
+        df = self.pm.df.astype({col: float for col in NUMERIC_COLS if col in self.pm.df.columns})
+
+        closed = positions.index[positions['Balance'] <= 0]
+        df = df[~df['Stock'].isin(closed)]
+        open_positions = positions[positions['Balance'] > 0]
+
+        mask = df['Stock'].isin(open_positions.index).to_numpy()
+        if mask.any():
+            rows = open_positions.loc[df.loc[mask, 'Stock']]
+            for col in ['Lot Balance', 'Balance', 'Avg Price', 'Stock Value']:
+                df.loc[mask, col] = rows[col].to_numpy()
+            ticker = rows['Ticker'].to_numpy()
+            df.loc[mask, 'Ticker'] = np.where(pd.notna(ticker), ticker, df.loc[mask, 'Ticker'].to_numpy())
+            df.loc[mask, 'Market Value'] = df.loc[mask, 'Balance'] * df.loc[mask, 'Market Price']
+            df.loc[mask, 'Unrealized'] = df.loc[mask, 'Market Value'] - df.loc[mask, 'Stock Value']
+
+        new = open_positions[~open_positions.index.isin(df['Stock'])].reset_index()
+        if not new.empty:
+            new_rows = self.build_rows(new)
+            new_rows['Stock Value'] = new['Stock Value'].to_numpy()
+            df = pd.concat([df, new_rows], ignore_index=True)
+
+        self.pm.df = df.reset_index(drop=True)
+        self.persist_changes({'inserted': list(new['Stock']), 'changed': list(open_positions.index),
+                              'deleted': list(closed)})
+        self.pm.bump_version()
+
+    @staticmethod
+    def build_rows(df):
+        """
+        Membentuk baris portofolio lengkap dari kolom Stock, Ticker, Lot Balance, Avg Price
+        """
+        lot = df['Lot Balance'].astype(float).to_numpy()
+        avg_price = df['Avg Price'].to_numpy()
         balance = lot * 100
-        new_row = {
-            'Stock': stock,
-            'Ticker': ticker,
-            'Lot Balance': float(lot),
+        return pd.DataFrame({
+            'Stock': df['Stock'].to_numpy(),
+            'Ticker': df['Ticker'].to_numpy(),
+            'Lot Balance': lot,
             'Balance': balance,
             'Avg Price': avg_price,
             'Stock Value': balance * avg_price,
             'Market Price': avg_price,
             'Market Value': balance * avg_price,
             'Unrealized': 0
+        })
+
+    def compute_changes(self, edited_df):
+        """
+        Membandingkan hasil editor dengan pm.df dalam satu join (kunci: Stock).
+        Mengembalikan dict berisi daftar saham inserted, deleted dan changed.
+        """
+        current = self.pm.df[['Stock'] + EDITABLE_COLS].drop_duplicates('Stock')
+        edited = edited_df[['Stock'] + EDITABLE_COLS].dropna(subset=['Stock']).drop_duplicates('Stock', keep='last')
+        joined = current.merge(edited, on='Stock', how='outer', suffixes=('_old', ''), indicator=True)
+
+        both = joined['_merge'] == 'both'
+        differs = np.zeros(len(joined), dtype=bool)
+        for col in EDITABLE_COLS:
+            old, new = joined[f'{col}_old'], joined[col]
+            differs |= ~((old == new) | (old.isna() & new.isna())).to_numpy()
+
+        return {
+            'inserted': joined.loc[joined['_merge'] == 'right_only', 'Stock'].tolist(),
+            'deleted': joined.loc[joined['_merge'] == 'left_only', 'Stock'].tolist(),
+            'changed': joined.loc[both & differs, 'Stock'].tolist(),
         }
-        self.pm.df = pd.concat([self.pm.df, pd.DataFrame([new_row])], ignore_index=True)
 
     def update_from_editor(self, edited_df):
-        current_stocks = set(self.pm.df['Stock'])
-        edited_stocks = set(edited_df['Stock'])
-        removed_stocks = current_stocks - edited_stocks
-        self.pm.df = self.pm.df[~self.pm.df['Stock'].isin(removed_stocks)]
-
-        for _, row in edited_df.iterrows():
-            mask = self.pm.df['Stock'] == row['Stock']
-            self.pm.df.loc[mask, 'Ticker'] = row['Ticker']
-            self.pm.df.loc[mask, 'Lot Balance'] = row['Lot Balance']
-            self.pm.df.loc[mask, 'Balance'] = row['Lot Balance'] * 100
-            self.pm.df.loc[mask, 'Avg Price'] = row['Avg Price']
-            self.pm.df.loc[mask, 'Stock Value'] = self.pm.df.loc[mask, 'Balance'] * row['Avg Price']
-            self.pm.df.loc[mask, 'Market Price'] = row['Avg Price']
-
-        self.pm.df['Market Value'] = self.pm.df['Balance'] * self.pm.df['Market Price']
-        self.pm.df['Unrealized'] = self.pm.df['Market Value'] - self.pm.df['Stock Value']
-        st.session_state.portfolio = self.pm
+        """
+        Menerapkan perubahan editor sebagai update kolom tervektorisasi; hanya baris yang
+        berubah/baru yang kolom turunannya dihitung ulang. Mengembalikan change set.
+        """
+        changes = self.compute_changes(edited_df)
+        touched = edited_df[edited_df['Stock'].isin(changes['inserted'] + changes['changed'])]
+        self.require_tickers(touched)
+        df = self.pm.df[~self.pm.df['Stock'].isin(changes['deleted'])].copy()
+
+        if changes['changed']:
+            updates = edited_df.drop_duplicates('Stock', keep='last').set_index('Stock')
+            mask = df['Stock'].isin(changes['changed']).to_numpy()
+            df = df.astype({col: float for col in NUMERIC_COLS if col in df.columns})
+            rows = self.build_rows(updates.loc[df.loc[mask, 'Stock']].reset_index())
+            for col in ['Ticker', 'Lot Balance', 'Balance', 'Avg Price', 'Stock Value', 'Market Price']:
+                df.loc[mask, col] = rows[col].to_numpy()
+            df.loc[mask, 'Market Value'] = df.loc[mask, 'Balance'] * df.loc[mask, 'Market Price']
+            df.loc[mask, 'Unrealized'] = df.loc[mask, 'Market Value'] - df.loc[mask, 'Stock Value']
+
+        if changes['inserted']:
+            inserted = edited_df[edited_df['Stock'].isin(changes['inserted'])].drop_duplicates('Stock', keep='last')
+            df = pd.concat([df, self.build_rows(inserted)], ignore_index=True)
+
+        self.pm.df = df
+        self.last_changes = changes
+        self.log_adjustments(changes, edited_df)
+        if any(changes.values()):
+            self.persist_changes(changes)
+            self.pm.bump_version()
+        return changes
+
+    def log_adjustments(self, changes, edited_df):
+        """
+        Mencatat koreksi dari editor ke ledger sebagai transaksi 'adjust'
+        """
+        touched = changes['inserted'] + changes['changed']
+        rows = edited_df[edited_df['Stock'].isin(touched)].drop_duplicates('Stock', keep='last')
+        adjustments = pd.DataFrame({
+            'Stock': list(rows['Stock']) + changes['deleted'],
+            'Ticker': list(rows['Ticker']) + [None] * len(changes['deleted']),
+            'Side': 'adjust',
+            'Quantity': list(rows['Lot Balance'].astype(float) * 100) + [0.0] * len(changes['deleted']),
+            'Price': list(rows['Avg Price'].astype(float)) + [0.0] * len(changes['deleted']),
+        })
+        if not adjustments.empty:
+            self.pm.ledger.extend(adjustments)
+            self.pm.save_ledger()
+            self.pm.cost_basis.update()
+
+    def persist_changes(self, changes):
+        """
+        Menulis hanya baris yang berubah ke store (jika ada)
+        """
+        store = self.pm.store
+        if store is None:
+            return
+        touched = self.pm.df[self.pm.df['Stock'].isin(changes['inserted'] + changes['changed'])]
+        self.require_tickers(touched)
+        store.delete(changes['deleted'])
+        store.upsert(touched)
+
+    @staticmethod
+    def require_tickers(df):
+        """
+        ValueError bila ada baris tanpa Ticker (kolom wajib di store)
+        """
+        missing = df.loc[df['Ticker'].isna() | (df['Ticker'].astype(str).str.strip() == ''), 'Stock']
+        if not missing.empty:
+            raise ValueError(f"Ticker wajib diisi untuk: {', '.join(map(str, missing))}")
 
     def import_dataframe(self, df):
         required_cols = {'Stock', 'Ticker', 'Lot Balance', 'Avg Price'}
         if not required_cols.issubset(df.columns):
-            st.warning("Kolom CSV harus mengandung: Stock, Ticker, Lot Balance, Avg Price")
-            return
-        self.pm.df = pd.DataFrame()
-        for _, row in df.iterrows():
-            self.add_stock(row['Stock'], row['Ticker'], row['Lot Balance'], row['Avg Price'])
+            raise ValueError("Kolom CSV harus mengandung: Stock, Ticker, Lot Balance, Avg Price")
+        self.pm.df = self.build_rows(df)
+        self.pm.reset_ledger()
+        if self.pm.store is not None:
+            self.pm.store.replace(self.pm.df)
+        self.pm.bump_version()
@@ -2,15 +2,33 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import yfinance as yf
-import streamlit as st
-
-class PortfolioManager:
-    def __init__(self):
-        self.df = self.load_portfolio()
-        self.simulated_data = self.generate_historical_data()
+from .market_data import YFinanceProvider
+from .market_cache import CachedQuoteProvider
+from .ledger import CostBasisEngine, TransactionLedger
+from .price_panel import PricePanelMixin
+from utils.lru import LRUCache
+
+# Saham dengan drift naik pada histori simulasi
+DRIFT_STOCKS = ['ANTM', 'PTBA', 'PGAS']
+
+class PortfolioManager(PricePanelMixin):
+    def __init__(self, provider=None, store=None, portfolio=None, history=None):
+        self.provider = provider if provider is not None else CachedQuoteProvider(YFinanceProvider())
+        self.store = store
+        if portfolio is not None:
+            self.df = portfolio.reset_index(drop=True)
+        else:
+            self.df = self.load_from_store() if store is not None else self.load_portfolio()
+        self.load_ledger()
+        self.data_version = 0
+        self.memo = LRUCache(maxsize=64)
+        self.history_version = 0
+        self.history_epoch = 0
+        self._panel_cache = {}
+        self.set_price_history(history if history is not None else self.generate_historical_data())
         self.new_stocks = self.get_new_stocks()
         self.last_update = datetime.now()
+        self.last_error = None
 
         # Tambahkan ini untuk menghindari error kolom
         self.df['Market Value'] = self.df['Balance'] * self.df['Market Price']
@@ -30,24 +48,142 @@ class PortfolioManager:
             'Unrealized': [-37500, -688500, 2530000, -525000, -678500, -98000, 22500, 220000, 196000, -782500, -18215]
         })
 
-    def generate_historical_data(self):
-        np.random.seed(42)
-        dates = pd.date_range(end='2025-05-31', periods=100, freq='D')
-        data = {}
-
-        for stock in self.df['Stock']:
-            base_price = self.df[self.df['Stock'] == stock]['Market Price'].iloc[0]
-            volatility = base_price * 0.02
-            prices = [base_price]
+    def reset_ledger(self, method='average'):
+        """
+        Membuka ledger baru dengan posisi saat ini sebagai saldo awal (menggantikan ledger
+        yang tersimpan di store)
+        """
+        self.ledger = TransactionLedger.from_positions(self.df)
+        self.cost_basis = CostBasisEngine(self.ledger, method)
+        self.cost_basis.update()
+        if self.store is not None:
+            self.store.replace_transactions(self.ledger.to_frame())
+        self.ledger.saved = len(self.ledger)
+
+    def load_ledger(self, method='average'):
+        """
+        Memuat ledger dari store dan menurunkan posisi darinya; ledger adalah sumber
+        kebenaran, tabel posisi hanya menyimpan harga pasar terakhir. Tanpa riwayat
+        transaksi, posisi saat ini dibuka sebagai saldo awal.
+        """
+        transactions = self.store.load_transactions() if self.store is not None else None
+        if transactions is None or transactions.empty:
+            self.reset_ledger(method)
+            return
+        self.ledger = TransactionLedger.from_frame(transactions)
+        self.ledger.saved = len(self.ledger)
+        self.cost_basis = CostBasisEngine(self.ledger, method)
+        self.cost_basis.update()
+
+        stored = self.df
+        self.df = self.positions_from_ledger(stored)
+        same = (len(stored) == len(self.df)
+                and (stored['Stock'].astype(str).to_numpy() == self.df['Stock'].astype(str).to_numpy()).all()
+                and np.allclose(stored[['Balance', 'Stock Value']].to_numpy(dtype=float),
+                                self.df[['Balance', 'Stock Value']].to_numpy(dtype=float)))
+        if not same:
+            # Tabel posisi tertinggal dari ledger; baris tanpa ticker tidak bisa disimpan
+            self.store.replace(self.df[self.df['Ticker'].notna()])
+
+    def positions_from_ledger(self, stored=None):
+        """
+        Posisi terbuka hasil cost-basis engine dalam format df; harga pasar diambil dari
+        `stored` (posisi tersimpan) bila ada, selain itu harga rata-rata. Ticker yang tidak
+        tercatat di ledger diambil dari `stored`.
+        """
+        positions = self.cost_basis.positions()
+        positions = positions[positions['Balance'] > 0].reset_index(drop=True)
+        prices = pd.Series(dtype=float)
+        tickers = pd.Series(dtype=object)
+        if stored is not None and not stored.empty:
+            stored = stored.drop_duplicates('Stock').set_index('Stock')
+            if 'Market Price' in stored.columns:
+                prices = stored['Market Price'].astype(float)
+            if 'Ticker' in stored.columns:
+                tickers = stored['Ticker']
+        market_price = positions['Stock'].map(prices).fillna(positions['Avg Price']).to_numpy(dtype=float)
+        ticker = positions['Ticker'].where(positions['Ticker'].notna(), positions['Stock'].map(tickers))
+        balance = positions['Balance'].to_numpy(dtype=float)
+        stock_value = positions['Stock Value'].to_numpy(dtype=float)
+        return pd.DataFrame({
+            'Stock': positions['Stock'].to_numpy(),
+            'Ticker': ticker.to_numpy(),
+            'Lot Balance': positions['Lot Balance'].to_numpy(dtype=float),
+            'Balance': balance,
+            'Avg Price': positions['Avg Price'].to_numpy(dtype=float),
+            'Stock Value': stock_value,
+            'Market Price': market_price,
+            'Market Value': balance * market_price,
+            'Unrealized': balance * market_price - stock_value,
+        })
 
-            for _ in range(1, len(dates)):
-                change = np.random.normal(0, volatility)
-                if stock in ['ANTM', 'PTBA', 'PGAS']:
-                    change += volatility * 0.1
-                prices.append(prices[-1] + change)
+    def save_ledger(self):
+        """
+        Menyimpan transaksi yang belum tersimpan ke store (append, tanpa menulis ulang ledger)
+        """
+        if self.store is not None and self.ledger.saved < len(self.ledger):
+            self.store.append_transactions(self.ledger.to_frame(self.ledger.saved))
+        self.ledger.saved = len(self.ledger)
+
+    def load_from_store(self):
+        """
+        Membaca posisi dari store dalam satu query; store yang baru dibuat diisi portofolio
+        bawaan, store yang sengaja dikosongkan tetap kosong
+        """
+        df = self.store.load()
+        if df.empty and self.store.needs_seed():
+            df = self.load_portfolio()
+            self.store.replace(df)
+        return df
+
+    def generate_historical_data(self, periods=100, end='2025-05-31', mode='compat', seed=42):
+        """
+        Membuat histori harga simulasi untuk semua saham sekaligus.
+        mode='compat' identik dengan generator lama (random walk, seed 42),
+        mode='gbm' memakai log-return sehingga harga tidak pernah negatif.
+        """
+        dates = pd.date_range(end=end, periods=periods, freq='D')
+        stocks = self.df['Stock'].drop_duplicates().to_numpy()
+        base_prices = self.df.drop_duplicates('Stock')['Market Price'].to_numpy(dtype=float)
+        prices = self.simulate_prices(base_prices, np.isin(stocks, DRIFT_STOCKS), periods, mode, seed)
+        return pd.DataFrame(prices, index=pd.Index(dates, name='Date'), columns=stocks)
 
-            data[stock] = pd.DataFrame({'Date': dates, 'Price': prices})
-        return data
+    @staticmethod
+    def simulate_prices(base_prices, drift_mask, periods, mode='compat', seed=42, daily_vol=0.02):
+        """
+        Menghasilkan matriks harga (hari x saham) dari satu matriks shock yang diakumulasi
+        """
+        base_prices = np.asarray(base_prices, dtype=float)
+        drift_mask = np.asarray(drift_mask, dtype=bool)
+        n_stocks = len(base_prices)
+
+        if mode == 'compat':
+            # Urutan draw sama dengan loop lama: per saham, lalu per hari
+            volatility = base_prices * daily_vol
+            shocks = np.random.RandomState(seed).normal(0, 1, size=(n_stocks, periods - 1))
+            changes = volatility[:, None] * shocks + np.where(drift_mask, volatility * 0.1, 0.0)[:, None]
+            paths = np.concatenate([base_prices[:, None], changes], axis=1)
+            return np.cumsum(paths, axis=1).T
+        elif mode == 'gbm':
+            mu = np.where(drift_mask, daily_vol * 0.1, 0.0)
+            shocks = np.random.default_rng(seed).standard_normal((periods - 1, n_stocks))
+            log_returns = (mu - 0.5 * daily_vol ** 2) + daily_vol * shocks
+            cum = np.vstack([np.zeros(n_stocks), np.cumsum(log_returns, axis=0)])
+            return base_prices * np.exp(cum)
+        raise ValueError(f"Unknown simulation mode: {mode}")
+
+    @property
+    def simulated_data(self):
+        """
+        Tampilan lama dict saham -> DataFrame(Date, Price), dibangun dari panel harga
+        """
+        panel = self._price_panel
+        return {stock: pd.DataFrame({'Date': panel.index, 'Price': panel[stock].to_numpy()})
+                for stock in panel.columns}
+
+    @simulated_data.setter
+    def simulated_data(self, history):
+        self.set_price_history(history)
 
     @staticmethod
     def get_new_stocks():
@@ -61,38 +197,13 @@ class PortfolioManager:
             'Risk Level': ['Low', 'Medium', 'Medium', 'High']
         })
 
-    def update_real_time_prices(self):
-        try:
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            all_tickers = list(self.df['Ticker']) + list(self.new_stocks['Ticker'])
-            prices = {}
-
-            for i, ticker in enumerate(all_tickers):
-                status_text.text(f"Fetching data for {ticker}...")
-                progress_bar.progress((i + 1) / len(all_tickers))
-                try:
-                    stock_data = yf.Ticker(ticker)
-                    hist = stock_data.history(period='1d')
-                    if not hist.empty:
-                        prices[ticker] = hist['Close'].iloc[-1]
-                    else:
-                        prices[ticker] = self.get_fallback_price(ticker)
-                except Exception as e:
-                    st.warning(f"Error fetching data for {ticker}: {str(e)}")
-                    prices[ticker] = self.get_fallback_price(ticker)
-
-            self.apply_prices(prices)
-            self.last_update = datetime.now()
-            return True
-        except Exception as e:
-            st.error(f"Error updating prices: {str(e)}")
-            return False
-        finally:
-            progress_bar.empty()
-            status_text.empty()
+    def _price_tickers(self):
+        return list(self.df['Ticker']) + list(self.new_stocks['Ticker'])
 
     def get_fallback_price(self, ticker):
+        cached = self.provider.last_known_price(ticker)
+        if cached is not None:
+            return cached
         if ticker in self.df['Ticker'].values:
             return self.df[self.df['Ticker'] == ticker]['Market Price'].iloc[0]
         elif ticker in self.new_stocks['Ticker'].values:
@@ -100,15 +211,12 @@ class PortfolioManager:
         return 0
 
     def apply_prices(self, prices):
-        for idx, row in self.df.iterrows():
-            ticker = row['Ticker']
-            if ticker in prices:
-                self.df.at[idx, 'Market Price'] = prices[ticker]
-
-        for idx, row in self.new_stocks.iterrows():
-            ticker = row['Ticker']
-            if ticker in prices:
-                self.new_stocks.at[idx, 'Current Price'] = prices[ticker]
+        old_prices = self.df['Market Price'].to_numpy(dtype=float)
+        self.df['Market Price'] = self.df['Ticker'].map(prices).fillna(self.df['Market Price'])
+        self.new_stocks['Current Price'] = self.new_stocks['Ticker'].map(prices).fillna(self.new_stocks['Current Price'])
 
         self.df['Market Value'] = self.df['Balance'] * self.df['Market Price']
         self.df['Unrealized'] = self.df['Market Value'] - self.df['Stock Value']
+        if self.store is not None:
+            self.store.upsert(self.df[self.df['Market Price'].to_numpy(dtype=float) != old_prices])
+        self.bump_version()
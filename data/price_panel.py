@@ -0,0 +1,113 @@
+# data/price_panel.py
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+class PricePanelMixin:
+    """
+    Panel harga bersama (tanggal x saham, float64 kontigu read-only), panel return
+    per versi histori, versi data untuk memo dan pembaruan harga real-time. Dipakai
+    PortfolioManager dan MultiPortfolioManager agar kedua jalur panel tetap sama.
+
+    Kelas pemakai menyiapkan data_version, history_version, history_epoch, _panel_cache,
+    provider dan last_error, serta menyediakan _price_tickers(), get_fallback_price(ticker)
+    dan apply_prices(prices).
+    """
+    # Return NaN (saham tanpa histori) menjadi 0 bila True
+    fill_missing_returns = False
+
+    def _align_history(self, history):
+        """
+        Kolom panel yang disimpan; bawaan mengikuti kolom histori apa adanya
+        """
+        return history
+
+    def set_price_history(self, history):
+        """
+        Menyimpan histori harga sebagai panel lebar (tanggal x saham, float64 kontigu).
+        Menerima DataFrame lebar atau dict lama saham -> DataFrame(Date, Price).
+        """
+        if isinstance(history, dict):
+            history = pd.concat(
+                {stock: frame.set_index('Date')['Price'] for stock, frame in history.items()}, axis=1
+            ) if history else pd.DataFrame()
+        history = self._align_history(history.sort_index())
+        values = np.ascontiguousarray(history.to_numpy(dtype=np.float64))
+        values.flags.writeable = False
+        self._price_panel = pd.DataFrame(values, index=pd.DatetimeIndex(history.index, name='Date'),
+                                         columns=pd.Index(history.columns), copy=False)
+        self._panel_cache = {}
+        self.history_version += 1
+        self.history_epoch += 1
+        self.bump_version()
+
+    def append_prices(self, date, prices):
+        """
+        Menambah satu hari harga (dict saham -> harga) di akhir panel tanpa mengganti
+        epoch histori, sehingga estimator bisa memperbarui hasilnya secara inkremental
+        """
+        panel = self._price_panel
+        row = pd.Series(prices, dtype=np.float64).reindex(panel.columns).to_numpy()
+        values = np.vstack([panel.to_numpy(), row])
+        values.flags.writeable = False
+        index = panel.index.append(pd.DatetimeIndex([pd.Timestamp(date)], name='Date'))
+        self._price_panel = pd.DataFrame(values, index=index, columns=panel.columns, copy=False)
+        self._panel_cache = {}
+        self.history_version += 1
+        self.bump_version()
+
+    def bump_version(self):
+        """
+        Menandai bahwa data portofolio berubah; hasil analisis yang di-memo ikut kedaluwarsa
+        """
+        self.data_version += 1
+
+    def price_panel(self):
+        """
+        Panel harga bersama (read-only) yang dipakai semua analyzer
+        """
+        return self._price_panel
+
+    def returns_panel(self):
+        """
+        Panel return harian, dihitung sekali per versi histori
+        """
+        if self._panel_cache.get('version') != self.history_version:
+            prices = self._price_panel.to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = prices[1:] / prices[:-1] - 1
+            if self.fill_missing_returns:
+                returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+            returns = np.ascontiguousarray(returns)
+            returns.flags.writeable = False
+            self._panel_cache['version'] = self.history_version
+            self._panel_cache['returns'] = pd.DataFrame(returns, index=self._price_panel.index[1:],
+                                                        columns=self._price_panel.columns, copy=False)
+        return self._panel_cache['returns']
+
+    def update_real_time_prices(self, progress=None, on_missing=None):
+        """
+        Mengambil harga terbaru semua ticker. progress(done, total) dipanggil per batch;
+        on_missing(tickers) dipanggil untuk ticker yang memakai harga cadangan.
+        Mengembalikan True jika berhasil; pesan kegagalan tersimpan di self.last_error.
+        """
+        self.last_error = None
+        try:
+            tickers = self._price_tickers()
+            prices = self.provider.fetch_last_prices(tickers, progress=progress)
+            missing = [ticker for ticker in tickers if ticker not in prices]
+            if missing and on_missing is not None:
+                on_missing(missing)
+            for ticker in missing:
+                fallback = self.get_fallback_price(ticker)
+                if fallback is not None:
+                    prices[ticker] = fallback
+
+            self.apply_prices(prices)
+            self.last_update = datetime.now()
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            return False
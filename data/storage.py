@@ -0,0 +1,195 @@
+# data/storage.py
+import os
+import sqlite3
+from threading import Lock
+
+import pandas as pd
+
+from .ledger import SIDES
+
+# Kolom DataFrame portofolio -> kolom tabel
+COLUMNS = {
+    'Stock': 'stock',
+    'Ticker': 'ticker',
+    'Lot Balance': 'lot_balance',
+    'Balance': 'balance',
+    'Avg Price': 'avg_price',
+    'Stock Value': 'stock_value',
+    'Market Price': 'market_price',
+    'Market Value': 'market_value',
+    'Unrealized': 'unrealized',
+}
+
+# Kolom ledger transaksi -> kolom tabel (Date disimpan sebagai nanodetik epoch)
+TRANSACTION_COLUMNS = {
+    'Date': 'date',
+    'Stock': 'stock',
+    'Ticker': 'ticker',
+    'Side': 'side',
+    'Quantity': 'quantity',
+    'Price': 'price',
+    'Fee': 'fee',
+}
+
+
+class PortfolioStore:
+    """
+    Antarmuka penyimpanan posisi portofolio, berkunci kode saham (Stock)
+    """
+    def load(self):
+        raise NotImplementedError
+
+    def upsert(self, rows):
+        raise NotImplementedError
+
+    def delete(self, stocks):
+        raise NotImplementedError
+
+    def replace(self, df):
+        raise NotImplementedError
+
+    def load_transactions(self):
+        raise NotImplementedError
+
+    def append_transactions(self, frame):
+        raise NotImplementedError
+
+    def replace_transactions(self, frame):
+        raise NotImplementedError
+
+    def needs_seed(self):
+        """
+        True hanya untuk store yang baru dibuat dan belum pernah ditulis; store yang
+        dikosongkan pengguna tidak diisi ulang dengan portofolio bawaan
+        """
+        raise NotImplementedError
+
+    def export_parquet(self, path):
+        self.load().to_parquet(path, index=False)
+
+    def import_parquet(self, path):
+        df = pd.read_parquet(path)
+        self.replace(df)
+        return df
+
+
+class SQLitePortfolioStore(PortfolioStore):
+    """
+    Penyimpanan SQLite (mode WAL agar bisa dipakai beberapa worker). Upsert dan delete
+    berjalan dalam satu transaksi dan hanya menulis baris yang diberikan.
+    """
+    def __init__(self, path='portfolio.db'):
+        self.path = path
+        self._lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS positions ('
+                'stock TEXT PRIMARY KEY, ticker TEXT NOT NULL, lot_balance REAL, balance REAL, '
+                'avg_price REAL, stock_value REAL, market_price REAL, market_value REAL, unrealized REAL)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_positions_ticker ON positions (ticker)')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS transactions (id INTEGER PRIMARY KEY, date INTEGER, stock TEXT NOT NULL, '
+                'ticker TEXT, side INTEGER, quantity REAL, price REAL, fee REAL)'
+            )
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            # Database lama tanpa tabel meta: yang sudah berisi posisi dianggap sudah pernah diisi
+            if self.conn.execute('SELECT 1 FROM positions LIMIT 1').fetchone():
+                self._mark_written()
+
+    def needs_seed(self):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM meta WHERE key = 'written'").fetchone() is None
+
+    def _mark_written(self):
+        # Dipanggil di dalam transaksi tulis agar penanda dan datanya tersimpan bersama
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('written', '1')")
+
+    def load(self):
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT {', '.join(COLUMNS.values())} FROM positions ORDER BY rowid", self.conn)
+        return df.rename(columns={v: k for k, v in COLUMNS.items()})
+
+    def upsert(self, rows):
+        if rows is None or len(rows) == 0:
+            return
+        records = self._records(rows)
+        columns = list(COLUMNS.values())
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != 'stock')
+        sql = (f"INSERT INTO positions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT(stock) DO UPDATE SET {updates}")
+        with self._lock, self.conn:
+            self.conn.executemany(sql, records)
+            self._mark_written()
+
+    def delete(self, stocks):
+        stocks = list(stocks)
+        if not stocks:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany('DELETE FROM positions WHERE stock = ?', [(s,) for s in stocks])
+            self._mark_written()
+
+    def replace(self, df):
+        records = self._records(df)
+        columns = list(COLUMNS.values())
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM positions')
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO positions ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                records)
+            self._mark_written()
+
+    def load_transactions(self):
+        """
+        Seluruh ledger dalam urutan pencatatan (format TransactionLedger.extend)
+        """
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT {', '.join(TRANSACTION_COLUMNS.values())} FROM transactions ORDER BY id",
+                                   self.conn)
+        df = df.rename(columns={v: k for k, v in TRANSACTION_COLUMNS.items()})
+        df['Date'] = pd.to_datetime(df['Date'].astype('int64'), unit='ns')
+        return df
+
+    def append_transactions(self, frame):
+        """
+        Menambah transaksi baru di akhir ledger dalam satu transaksi database
+        """
+        if frame is None or len(frame) == 0:
+            return
+        with self._lock, self.conn:
+            self._insert_transactions(frame)
+            self._mark_written()
+
+    def replace_transactions(self, frame):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM transactions')
+            self._insert_transactions(frame)
+            self._mark_written()
+
+    def _insert_transactions(self, frame):
+        frame = frame.reindex(columns=list(TRANSACTION_COLUMNS)).copy()
+        frame['Date'] = pd.to_datetime(frame['Date']).astype('datetime64[ns]').astype('int64')
+        side = frame['Side']
+        frame['Side'] = (side if pd.api.types.is_numeric_dtype(side) else side.astype(str).map(SIDES)).astype('int64')
+        frame['Stock'] = frame['Stock'].astype(str)
+        frame = frame.astype(object)
+        records = list(frame.where(frame.notna(), None).itertuples(index=False, name=None))
+        columns = list(TRANSACTION_COLUMNS.values())
+        self.conn.executemany(f"INSERT INTO transactions ({', '.join(columns)}) "
+                              f"VALUES ({', '.join('?' * len(columns))})", records)
+
+    @staticmethod
+    def _records(df):
+        frame = df.reindex(columns=list(COLUMNS)).astype(object)
+        frame = frame.where(frame.notna(), None)
+        return list(frame.itertuples(index=False, name=None))
+
+
+def default_store():
+    """
+    Store bawaan dashboard; lokasi file bisa diatur lewat MODUL_PORTFOLIO_DB
+    """
+    return SQLitePortfolioStore(os.environ.get('MODUL_PORTFOLIO_DB', 'portfolio.db'))
@@ -3,24 +3,37 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from data.portfolio_manager import PortfolioManager
+from data.storage import default_store
 from data.portfolio_crud import PortfolioCRUD
 from data.dividend_tracker import DividendTracker
 from data.input_loader import InputLoader
 from analysis.portfolio_analyzer import PortfolioAnalyzer
 from analysis.risk_analyzer import RiskAnalyzer
-from analysis.benchmark import BenchmarkAnalyzer
+from analysis.benchmark import BenchmarkAnalyzer, DEFAULT_INDICES
 from analysis.optimizer import PortfolioOptimizer
 from analysis.stock_scorer import StockScorer
 from analysis.stock_recommender import StockRecommender
 from analysis.allocation_helper import AllocationHelper
+from analysis.lot_allocation import NODE_LIMIT_SOLVER
 from visualization.portfolio_visualizer import PortfolioVisualizer
-from utils.formatter import format_rupiah, format_percentage, color_negative_red
+from utils.formatter import (format_rupiah, format_percentage, format_rupiah_column, format_percentage_column,
+                             style_table, paginate)
+
+def paginated(df, key, page_size=200):
+    """
+    Baris halaman aktif; pemilih halaman hanya muncul untuk tabel yang lebih dari satu halaman
+    """
+    if len(df) <= page_size:
+        return df
+    pages = -(-len(df) // page_size)
+    page = st.number_input(f"Halaman (1-{pages}, {len(df)} baris)", min_value=1, max_value=pages, value=1, key=key)
+    return paginate(df, page, page_size)[0]
 
 def main():
     st.set_page_config(page_title="📊 Portfolio Dashboard", layout="wide")
 
     if 'portfolio' not in st.session_state:
-        st.session_state.portfolio = PortfolioManager()
+        st.session_state.portfolio = PortfolioManager(store=default_store())
 
     pm = st.session_state.portfolio
     analyzer = PortfolioAnalyzer(pm)
@@ -39,12 +52,13 @@ def main():
     uploaded_df = loader.get_analysis_data()
     if not uploaded_df.empty:
         st.subheader("📋 Data Saham Watchlist")
-        st.dataframe(uploaded_df, use_container_width=True)
+        st.dataframe(paginated(uploaded_df, 'watchlist_page'), use_container_width=True)
 
         scorer = StockScorer(uploaded_df)
         scored_df = scorer.apply_scoring()
         st.subheader("🏅 Skor Saham Berdasarkan Valuasi & Kinerja")
-        st.dataframe(scored_df[['Stock', 'PER', 'PBV', 'Yield', 'ROE', 'Final Score']], use_container_width=True)
+        score_cols = [col for col in ['Stock', 'PER', 'PBV', 'Yield', 'ROE', 'Final Score'] if col in scored_df.columns]
+        st.dataframe(paginated(scored_df[score_cols], 'score_page'), use_container_width=True)
 
         recommender = StockRecommender(scored_df, pm.df)
         recommendations = recommender.recommend_additions(top_n=5)
@@ -55,20 +69,48 @@ def main():
             st.subheader("💸 Simulasi Alokasi Dana untuk Rekomendasi")
             budget = st.number_input("Masukkan total dana (Rp)", min_value=0, value=5000000)
             method = st.selectbox("Metode Alokasi", ["equal", "weighted"])
-            allocator = AllocationHelper(recommendations)
+            allocator = AllocationHelper(recommendations, provider=pm.provider)
             alloc_df = allocator.simulate_allocation(budget, method)
             if not alloc_df.empty:
                 st.dataframe(alloc_df, use_container_width=True)
+                st.caption(f"Sisa dana: {format_rupiah(allocator.summary['leftover'])} | "
+                           f"Tracking error: {allocator.summary['tracking_error']:.2f}% | "
+                           f"Solver: {allocator.summary['solver']}")
+                if allocator.summary['solver'] == NODE_LIMIT_SOLVER:
+                    st.info("Pencarian eksak dihentikan pada batas node; alokasi di atas adalah solusi "
+                            "terbaik yang ditemukan (tidak lebih buruk dari greedy).")
+                if allocator.summary['unpriced']:
+                    st.warning(f"Harga tidak tersedia: {', '.join(allocator.summary['unpriced'])}")
+
+                with st.expander("Apa yang bisa dibeli dengan dana X?"):
+                    grid = allocator.budget_grid([1_000_000, 2_000_000, 5_000_000, 10_000_000,
+                                                  25_000_000, 50_000_000, 100_000_000], method)
+                    st.dataframe(grid, use_container_width=True)
 
     # ===== Update Harga Pasar =====
     st.header("🔄 Real-time Market Data")
     col1, col2 = st.columns([1, 3])
     with col1:
         if st.button("Update Market Prices", type="primary"):
-            if pm.update_real_time_prices():
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+
+            def on_progress(done, total):
+                status_text.text(f"Fetching batch {done}/{total}...")
+                progress_bar.progress(done / total)
+
+            def on_missing(tickers):
+                st.warning(f"Error fetching data for {', '.join(tickers)}, using last known price")
+
+            updated = pm.update_real_time_prices(progress=on_progress, on_missing=on_missing)
+            progress_bar.empty()
+            status_text.empty()
+            if updated:
                 st.success("Market prices updated successfully!")
                 st.session_state.portfolio = pm
                 st.rerun()
+            else:
+                st.error(f"Error updating prices: {pm.last_error}")
     with col2:
         st.caption(f"Last update: {pm.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
         st.progress(100, text="Data Siap")
@@ -92,19 +134,34 @@ def main():
     pm.df['Unrealized %'] = (pm.df['Unrealized'] / pm.df['Stock Value']) * 100
     pm.df['Daily Change'] = (pm.df['Market Price'] / pm.df['Avg Price'] - 1) * 100
     pm.df['Current Value'] = pm.df['Balance'] * pm.df['Market Price']
-    view_df = pm.df[['Stock', 'Balance', 'Avg Price', 'Market Price', 'Daily Change', 'Current Value', 'Unrealized', 'Unrealized %']].copy()
+    numeric_df = paginated(pm.df[['Stock', 'Balance', 'Avg Price', 'Market Price', 'Daily Change', 'Current Value', 'Unrealized', 'Unrealized %']], 'details_page')
+    view_df = numeric_df.copy()
     for col in ['Avg Price', 'Market Price', 'Current Value', 'Unrealized']:
-        view_df[col] = view_df[col].apply(format_rupiah)
-    view_df['Daily Change'] = view_df['Daily Change'].apply(format_percentage)
-    view_df['Unrealized %'] = view_df['Unrealized %'].apply(format_percentage)
-    styled_df = view_df.style.map(color_negative_red, subset=['Daily Change', 'Unrealized', 'Unrealized %'])
+        view_df[col] = format_rupiah_column(numeric_df[col])
+    view_df['Daily Change'] = format_percentage_column(numeric_df['Daily Change'])
+    view_df['Unrealized %'] = format_percentage_column(numeric_df['Unrealized %'])
+    styled_df = style_table(view_df, numeric_df, sign_cols=['Daily Change', 'Unrealized', 'Unrealized %'])
     st.dataframe(styled_df, use_container_width=True)
 
+    # ===== Prediksi Harga =====
+    with st.expander("🔮 Prediksi Harga"):
+        col1, col2, col3 = st.columns(3)
+        forecast_stock = col1.selectbox("Saham", list(pm.price_panel().columns), key="forecast_stock")
+        forecast_days = col2.slider("Hari ke depan", 7, 90, 30, key="forecast_days")
+        forecast_model = col3.selectbox("Model", ["ridge", "rf"], key="forecast_model")
+        dates, predictions, _ = analyzer.predict_price(forecast_stock, days=forecast_days, model=forecast_model)
+        if dates is not None:
+            history = pm.price_panel()[forecast_stock].rename('Price').rename_axis('Date').reset_index()
+            st.plotly_chart(visualizer.price_prediction_plot(history, {'dates': dates, 'predictions': predictions},
+                                                             forecast_stock, version=pm.data_version),
+                            use_container_width=True)
+
     # ===== Rekomendasi Trading =====
     st.header("💡 Trading Recommendations")
-    rec_df = analyzer.generate_recommendations()
+    rec_df = paginated(analyzer.generate_recommendations(), 'rec_page')
     rec_colors = {'Sell': 'red', 'Buy More': 'green', 'Hold/Buy': 'lightgreen', 'Hold/Sell': 'orange', 'Hold': 'gray'}
-    styled_rec = rec_df.style.apply(lambda x: [f"background-color: {rec_colors.get(v, 'white')}" for v in x], subset=['Recommendation'])
+    styled_rec = style_table(rec_df, category_col='Recommendation', category_map=rec_colors)
+    styled_rec = styled_rec.format({'Unrealized %': '{:.1f}%', '30d Trend %': '{:.1f}%'})
     st.dataframe(styled_rec, use_container_width=True)
 
     # ===== Analisis Risiko =====
@@ -113,30 +170,46 @@ def main():
         st.dataframe(risk_data['sector_distribution'], use_container_width=True)
         st.metric("Skor Konsentrasi (0-100)", risk_data['concentration_score'])
         st.dataframe(risk_data['volatility_table'], use_container_width=True)
-
-    # ===== Benchmark IHSG =====
-    with st.expander("📊 Benchmarking vs IHSG"):
-        bench_df = bench.compare_vs_index()
-        metrics = bench.performance_metrics(bench_df)
-        st.line_chart(bench_df.set_index('Date'), use_container_width=True)
-        col1, col2 = st.columns(2)
-        col1.metric("Alpha", f"{metrics['Alpha']}%")
-        col2.metric("Korelasi β Proxy", metrics['Correlation (β proxy)'])
+        st.subheader("Value at Risk / CVaR")
+        st.dataframe(risk_data['var_table'], use_container_width=True)
+
+    # ===== Benchmark Indeks =====
+    with st.expander("📊 Benchmarking vs IHSG & Indeks Lain"):
+        selected = st.multiselect("Indeks pembanding", list(DEFAULT_INDICES), default=['IHSG'])
+        bench_df = bench.compare_vs_indices({name: DEFAULT_INDICES[name] for name in selected})
+        if len(bench_df) > 2:
+            st.line_chart(visualizer.line_data(bench_df).set_index('Date'), use_container_width=True)
+            st.dataframe(bench.performance_table(bench_df), use_container_width=True)
+            window = st.slider("Jendela rolling (hari)", min_value=10, max_value=120, value=20)
+            rolling = bench.rolling_metrics(bench_df, window=window)
+            if not rolling.empty:
+                beta = rolling.xs('Beta', axis=1, level=1).reset_index()
+                st.caption("Rolling beta")
+                st.line_chart(visualizer.line_data(beta).set_index('Date'), use_container_width=True)
+        else:
+            st.info("Data indeks tidak tersedia untuk periode portofolio.")
 
     # ===== Dividen =====
     with st.expander("💰 Pendapatan Dividen"):
-        div_df = div_tracker.calculate_portfolio_dividends()
-        total_div, avg_yield = div_tracker.total_dividend()
-        st.dataframe(div_df, use_container_width=True)
-        col1, col2 = st.columns(2)
-        col1.metric("Total Dividen Tahunan", f"Rp {total_div:,.0f}")
-        col2.metric("Rata-rata Yield", f"{avg_yield:.2f}%")
+        div_result = div_tracker.analysis()
+        totals = div_result['totals']
+        st.dataframe(div_tracker.calculate_portfolio_dividends(), use_container_width=True)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Dividen Tahunan", f"Rp {totals['trailing_income']:,.0f}")
+        col2.metric("Rata-rata Yield", f"{totals['average_yield']:.2f}%")
+        col3.metric("Proyeksi 12 Bulan", f"Rp {totals['forward_income']:,.0f}", f"{totals['forward_yield']:.2f}% fwd")
+        st.caption(f"Kalender arus kas dividen 12 bulan setelah {div_result['as_of']:%Y-%m-%d}")
+        st.bar_chart(div_tracker.monthly_income().set_index('Month'), use_container_width=True)
+        st.dataframe(div_tracker.cashflow_calendar(), use_container_width=True)
 
     # ===== Optimasi Portofolio =====
     with st.expander("📈 Optimasi Alokasi Portofolio"):
-        rebalance_df, opt_risk = opt.rebalance_recommendation()
-        st.dataframe(rebalance_df, use_container_width=True)
-        st.caption(f"Volatilitas optimal portofolio: {opt_risk:.2%}")
+        try:
+            rebalance_df, opt_risk = opt.rebalance_recommendation()
+            st.dataframe(rebalance_df, use_container_width=True)
+            st.caption(f"Volatilitas optimal portofolio: {opt_risk:.2%}")
+        except ValueError as e:
+            st.error(str(e))
 
     # ===== CRUD Interaktif =====
     crud.display_editor()
@@ -0,0 +1,77 @@
+# tests/test_factor_engine.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.factor_engine import FactorEngine, top_k_indices
+from analysis.stock_scorer import StockScorer
+
+
+@pytest.fixture
+def watchlist():
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame({
+        'Stock': [f'W{i:03d}' for i in range(n)],
+        'Ticker': [f'W{i:03d}.JK' for i in range(n)],
+        'Sector': rng.choice(['Banking', 'Energy', 'Mining'], n),
+        'PER': rng.lognormal(2.5, 0.5, n),
+        'PBV': rng.lognormal(0, 0.6, n),
+        'Yield': rng.gamma(2.0, 1.5, n),
+        'ROE': rng.normal(12, 6, n),
+    })
+    df.loc[5, 'PER'] = np.nan
+    return df
+
+
+def test_default_scores_match_min_max_formula(watchlist):
+    def direct(series):
+        return ((series - series.min()) / (series.max() - series.min() + 1e-9) * 100).fillna(0)
+
+    def inverse(series):
+        return ((series.max() - series) / (series.max() - series.min() + 1e-9) * 100).fillna(0)
+
+    expected = (inverse(watchlist['PER']) + inverse(watchlist['PBV']) + direct(watchlist['Yield'])
+                + direct(watchlist['ROE'])) / 4
+    scored = StockScorer(watchlist).apply_scoring()
+    actual = scored.set_index('Stock')['Final Score'].reindex(watchlist['Stock'])
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy())
+    assert scored['Final Score'].is_monotonic_decreasing
+
+
+@pytest.mark.parametrize('scaling', ['rank', 'zscore', 'minmax'])
+def test_scaled_factors_are_bounded(watchlist, scaling):
+    normalized = FactorEngine(watchlist, scaling=scaling).normalized()
+    assert normalized.shape == (len(watchlist), 4)
+    assert np.nanmin(normalized) >= 0 and np.nanmax(normalized) <= 100
+    assert normalized[5, 0] == 0  # PER kosong
+
+
+def test_sector_neutral_ranks_within_sector(watchlist):
+    normalized = FactorEngine(watchlist, scaling='minmax', sector_neutral=True).normalized()
+    roe = pd.Series(normalized[:, 3]).groupby(watchlist['Sector'].to_numpy())
+    assert roe.max().to_numpy() == pytest.approx(100, abs=1e-4)
+    assert roe.min().to_numpy() == pytest.approx(0, abs=1e-4)
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(2)
+    scores = rng.normal(size=1000)
+    scores[[3, 10]] = np.nan
+    filled = np.where(np.isnan(scores), -np.inf, scores)
+    expected = np.argsort(-filled, kind='stable')
+    for k in (1, 10, 998):
+        np.testing.assert_array_equal(top_k_indices(scores, k), expected[:k])
+    for k in (999, 1000, 2000):
+        # NaN sama-sama paling rendah; urutan di antara keduanya bebas
+        np.testing.assert_array_equal(filled[top_k_indices(scores, k)], filled[expected[:k]])
+    assert len(top_k_indices(scores, 0)) == 0
+
+
+def test_scorer_top_matches_sorted_table(watchlist):
+    scorer = StockScorer(watchlist)
+    full = scorer.apply_scoring()
+    top = scorer.top(10, exclude=['W000'], min_score=30)
+    expected = full[(full['Stock'] != 'W000') & (full['Final Score'] >= 30)].head(10)
+    assert top['Stock'].tolist() == expected['Stock'].tolist()
+    np.testing.assert_allclose(top['Final Score'], expected['Final Score'])
@@ -0,0 +1,116 @@
+# tests/test_ledger.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import data.ledger as ledger_module
+from data.ledger import CostBasisEngine, TransactionLedger
+
+
+def book(rows, method='average'):
+    ledger = TransactionLedger()
+    for row in rows:
+        ledger.append(*row)
+    engine = CostBasisEngine(ledger, method)
+    engine.update()
+    return ledger, engine
+
+
+def test_average_cost():
+    _, engine = book([('AAA', 'buy', 100, 10.0), ('AAA', 'buy', 100, 20.0), ('AAA', 'sell', 50, 30.0),
+                      ('AAA', 'dividend', 0, 2.0)])
+    position = engine.position('AAA')
+    assert position['Balance'] == 150
+    assert position['Avg Price'] == pytest.approx(15.0)
+    assert position['Stock Value'] == pytest.approx(2250.0)
+    assert position['Realized P&L'] == pytest.approx(50 * 30 - 50 * 15)
+    assert position['Dividends'] == pytest.approx(300.0)
+
+
+def test_fifo_cost():
+    _, engine = book([('AAA', 'buy', 100, 10.0), ('AAA', 'buy', 100, 20.0), ('AAA', 'sell', 150, 30.0)],
+                     method='fifo')
+    position = engine.position('AAA')
+    assert position['Balance'] == 50
+    assert position['Stock Value'] == pytest.approx(50 * 20.0)
+    assert position['Realized P&L'] == pytest.approx(150 * 30 - (100 * 10 + 50 * 20))
+
+
+def test_fee_is_part_of_cost_and_proceeds():
+    _, engine = book([('AAA', 'buy', 100, 10.0, None, None, 5.0), ('AAA', 'sell', 100, 12.0, None, None, 3.0)])
+    position = engine.position('AAA')
+    assert position['Balance'] == 0
+    assert position['Realized P&L'] == pytest.approx(1200 - 3 - 1005)
+
+
+@pytest.mark.parametrize('method', ['average', 'fifo'])
+def test_oversell_raises(method):
+    ledger, engine = book([('AAA', 'buy', 100, 10.0)], method)
+    ledger.append('AAA', 'sell', 200, 10.0)
+    with pytest.raises(ValueError):
+        engine.update()
+
+
+def test_adjust_sets_position():
+    _, engine = book([('AAA', 'buy', 100, 10.0), ('AAA', 'adjust', 300, 12.0)])
+    position = engine.position('AAA')
+    assert position['Balance'] == 300
+    assert position['Stock Value'] == pytest.approx(3600.0)
+
+
+def random_transactions(n, stocks=20, seed=0):
+    """
+    Transaksi acak tanpa oversell (jual paling banyak saldo yang dimiliki)
+    """
+    rng = np.random.default_rng(seed)
+    held = {}
+    rows = []
+    for _ in range(n):
+        stock = f'S{rng.integers(stocks):02d}'
+        kind = rng.choice(['buy', 'sell', 'dividend', 'adjust'], p=[0.5, 0.35, 0.1, 0.05])
+        qty = float(rng.integers(1, 20) * 100)
+        if kind == 'sell':
+            qty = min(qty, held.get(stock, 0.0))
+            if rng.random() < 0.2:
+                qty = held.get(stock, 0.0)  # tutup posisi
+        elif kind == 'dividend':
+            qty = 0.0
+        held[stock] = qty if kind == 'adjust' else held.get(stock, 0.0) + {'buy': qty, 'sell': -qty}.get(kind, 0.0)
+        rows.append({'Stock': stock, 'Side': kind, 'Quantity': qty, 'Price': float(rng.uniform(100, 5000)),
+                     'Fee': float(rng.uniform(0, 10))})
+    return pd.DataFrame(rows)
+
+
+def test_vectorized_average_matches_sequential(monkeypatch):
+    frame = random_transactions(2000)
+    vectorized = CostBasisEngine(TransactionLedger.from_frame(frame))
+    vectorized.update()
+
+    monkeypatch.setattr(ledger_module, 'VECTOR_MIN_ROWS', 10 ** 9)
+    sequential = CostBasisEngine(TransactionLedger.from_frame(frame))
+    sequential.update()
+
+    columns = ['Balance', 'Stock Value', 'Realized P&L', 'Dividends']
+    np.testing.assert_allclose(vectorized.positions()[columns].to_numpy(),
+                               sequential.positions()[columns].to_numpy(), rtol=1e-9, atol=1e-6)
+
+
+def test_vectorized_oversell_raises():
+    frame = random_transactions(500)
+    frame.loc[len(frame)] = {'Stock': 'S00', 'Side': 'sell', 'Quantity': 1e9, 'Price': 100.0, 'Fee': 0.0}
+    with pytest.raises(ValueError):
+        CostBasisEngine(TransactionLedger.from_frame(frame)).update()
+
+
+def test_frame_round_trip_and_opening_balances():
+    positions = pd.DataFrame({'Stock': ['AAA', 'BBB'], 'Ticker': ['AAA.JK', 'BBB.JK'], 'Balance': [500.0, 0.0],
+                              'Avg Price': [100.0, 50.0], 'Stock Value': [51000.0, 0.0]})
+    ledger = TransactionLedger.from_positions(positions)
+    ledger.append('AAA', 'buy', 100, 120.0)
+    copy = TransactionLedger.from_frame(ledger.to_frame())
+    pd.testing.assert_frame_equal(copy.to_frame(), ledger.to_frame())
+
+    engine = CostBasisEngine(copy)
+    engine.update()
+    assert engine.position('AAA')['Stock Value'] == pytest.approx(51000.0 + 12000.0)
+    assert engine.position('AAA')['Ticker'] == 'AAA.JK'
@@ -0,0 +1,62 @@
+# tests/test_lot_allocation.py
+import itertools
+
+import numpy as np
+import pytest
+
+from analysis.lot_allocation import (NODE_LIMIT_SOLVER, allocate_lots, exact_lots, greedy_lots, objective)
+
+
+def brute_force(lot_cost, weights, budget):
+    limits = [int(budget // cost) for cost in lot_cost]
+    best, best_value = None, np.inf
+    for lots in itertools.product(*(range(limit + 1) for limit in limits)):
+        lots = np.array(lots)
+        if lots @ lot_cost > budget + 1e-6:
+            continue
+        value = objective(lots, lot_cost, weights, budget)
+        if value < best_value:
+            best, best_value = lots, value
+    return best, best_value
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_exact_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(2, 4))
+    lot_cost = rng.uniform(50_000, 400_000, n).round(-2)
+    weights = rng.dirichlet(np.ones(n))
+    budget = float(rng.uniform(0.5e6, 2e6))
+
+    lots, exact = exact_lots(lot_cost, weights, budget)
+    _, best_value = brute_force(lot_cost, weights, budget)
+    assert exact
+    assert lots @ lot_cost <= budget + 1e-6
+    assert objective(lots, lot_cost, weights, budget) == pytest.approx(best_value, abs=1e-12)
+
+
+def test_greedy_is_feasible_for_many_budgets():
+    rng = np.random.default_rng(1)
+    lot_cost = rng.uniform(50_000, 400_000, 12)
+    weights = rng.dirichlet(np.ones(12))
+    budgets = np.linspace(1e5, 5e7, 40)
+    lots = greedy_lots(lot_cost, weights, budgets)
+    assert (lots >= 0).all()
+    assert (lots @ lot_cost <= budgets + 1e-6).all()
+
+
+def test_node_limit_returns_best_found():
+    prices = np.array([1230.0, 4410.0, 875.0, 2990.0, 1615.0, 3320.0])
+    weights = np.full(6, 1 / 6)
+    budget = 2e7
+    lots, solver = allocate_lots(prices, weights, budget, max_nodes=5)
+    greedy = greedy_lots(prices * 100, weights, [budget])[0]
+    assert solver == NODE_LIMIT_SOLVER
+    assert lots @ prices * 100 <= budget + 1e-6
+    assert objective(lots, prices * 100, weights, budget) <= objective(greedy, prices * 100, weights, budget) + 1e-15
+
+
+def test_empty_or_zero_budget():
+    assert allocate_lots([], [], 1e6)[1] == 'none'
+    lots, solver = allocate_lots([1000.0], [1.0], 0)
+    assert solver == 'none' and lots.tolist() == [0]
@@ -0,0 +1,36 @@
+# tests/test_mean_variance.py
+import numpy as np
+import pytest
+
+from analysis.mean_variance import MeanVarianceEngine
+
+
+@pytest.fixture
+def engine():
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.0005, 0.02, size=(500, 8)) + np.linspace(-0.002, 0.004, 8)
+    return MeanVarianceEngine(returns.mean(axis=0), np.cov(returns, rowvar=False), max_weight=0.2)
+
+
+def test_target_above_capped_max_is_rejected(engine):
+    assert engine.max_return() < engine.mu.max()
+    with pytest.raises(ValueError):
+        engine.target_return(float(engine.mu.max()))
+    with pytest.raises(ValueError):
+        engine.target_return(None)
+
+
+def test_target_within_capped_range_is_met(engine):
+    low, high = engine.return_range()
+    for target in np.linspace(low, high, 5)[1:-1]:
+        result = engine.target_return(float(target))
+        assert result['success']
+        assert result['return'] == pytest.approx(target, rel=1e-4)
+        assert result['weights'].max() <= 0.2 + 1e-6
+        assert result['weights'].sum() == pytest.approx(1.0)
+
+
+def test_max_return_matches_greedy_fill(engine):
+    # Dengan batas 0.2 per saham tanpa batas sektor, optimum LP = 5 saham return tertinggi
+    assert engine.max_return() == pytest.approx(np.sort(engine.mu)[-5:].sum() * 0.2)
+    assert engine.min_return() == pytest.approx(np.sort(engine.mu)[:5].sum() * 0.2)
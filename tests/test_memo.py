@@ -0,0 +1,62 @@
+# tests/test_memo.py
+from utils.lru import LRUCache
+from utils.memo import versioned_cache
+
+
+class FakeManager:
+    def __init__(self):
+        self.memo = LRUCache(maxsize=8)
+        self.data_version = 0
+
+
+class Analyzer:
+    def __init__(self, pm):
+        self.pm = pm
+        self.window = 20
+        self.calls = 0
+
+    @versioned_cache(attrs=('window',))
+    def compute(self, x):
+        self.calls += 1
+        return x * self.window
+
+    @versioned_cache(cache_if=lambda result, x: result is not None)
+    def maybe(self, x):
+        self.calls += 1
+        return x
+
+
+def test_result_is_reused_until_version_changes():
+    analyzer = Analyzer(FakeManager())
+    assert analyzer.compute(2) == 40
+    assert analyzer.compute(2) == 40
+    assert analyzer.calls == 1
+    analyzer.pm.data_version += 1
+    analyzer.compute(2)
+    assert analyzer.calls == 2
+
+
+def test_attrs_and_arguments_are_part_of_the_key():
+    analyzer = Analyzer(FakeManager())
+    analyzer.compute(2)
+    analyzer.window = 30
+    assert analyzer.compute(2) == 60
+    analyzer.compute(3)
+    assert analyzer.calls == 3
+
+
+def test_unhashable_arguments_are_computed_directly():
+    analyzer = Analyzer(FakeManager())
+    analyzer.compute([1])
+    analyzer.compute([1])
+    assert analyzer.calls == 2
+
+
+def test_cache_if_skips_rejected_results():
+    analyzer = Analyzer(FakeManager())
+    analyzer.maybe(None)
+    analyzer.maybe(None)
+    assert analyzer.calls == 2
+    analyzer.maybe(1)
+    analyzer.maybe(1)
+    assert analyzer.calls == 3
@@ -0,0 +1,76 @@
+# tests/test_portfolio_store.py
+import pandas as pd
+import pytest
+
+from data.market_data import StubQuoteProvider
+from data.portfolio_crud import PortfolioCRUD
+from data.portfolio_manager import PortfolioManager
+from data.storage import SQLitePortfolioStore
+
+
+def open_manager(path):
+    return PortfolioManager(StubQuoteProvider(), store=SQLitePortfolioStore(path))
+
+
+def editor_frame(pm):
+    return pm.df[['Stock', 'Ticker', 'Lot Balance', 'Avg Price']].copy()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'portfolio.db')
+
+
+def test_reload_keeps_positions_and_ledger(db_path):
+    pm = open_manager(db_path)
+    crud = PortfolioCRUD(pm)
+    crud.add_stock('TLKM', 'TLKM.JK', 3, 3000)
+    crud.sell_stock('ADRO', 2, 2700)
+
+    reloaded = open_manager(db_path)
+    columns = ['Stock', 'Ticker', 'Balance', 'Stock Value']
+    expected = pm.df[columns].sort_values('Stock').reset_index(drop=True)
+    actual = reloaded.df[columns].sort_values('Stock').reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert len(reloaded.ledger) == len(pm.ledger)
+
+
+def test_editor_ticker_survives_reload(db_path):
+    pm = open_manager(db_path)
+    edited = editor_frame(pm)
+    edited.loc[edited['Stock'] == 'AADI', 'Ticker'] = 'AADI.XX'
+    edited = pd.concat([edited, pd.DataFrame({'Stock': ['TLKM'], 'Ticker': ['TLKM.JK'], 'Lot Balance': [3.0],
+                                              'Avg Price': [3000.0]})], ignore_index=True)
+    PortfolioCRUD(pm).update_from_editor(edited)
+
+    reloaded = open_manager(db_path)
+    tickers = reloaded.df.set_index('Stock')['Ticker']
+    assert tickers['TLKM'] == 'TLKM.JK'
+    assert tickers['AADI'] == 'AADI.XX'
+    assert reloaded.df['Ticker'].notna().all()
+
+    PortfolioCRUD(reloaded).add_stock('BBRI', 'BBRI.JK', 2, 4000)
+    stored = SQLitePortfolioStore(db_path).load().set_index('Stock')
+    assert stored.loc['BBRI', 'Balance'] == 200
+    assert stored.loc['TLKM', 'Ticker'] == 'TLKM.JK'
+
+
+def test_emptied_store_is_not_reseeded(db_path):
+    pm = open_manager(db_path)
+    PortfolioCRUD(pm).update_from_editor(editor_frame(pm).iloc[0:0])
+    assert open_manager(db_path).df.empty
+
+
+def test_add_stock_rejects_non_positive_lot(db_path):
+    crud = PortfolioCRUD(open_manager(db_path))
+    with pytest.raises(ValueError):
+        crud.add_stock('TLKM', 'TLKM.JK', 0, 3000)
+
+
+def test_editor_rejects_missing_ticker(db_path):
+    pm = open_manager(db_path)
+    edited = pd.concat([editor_frame(pm), pd.DataFrame({'Stock': ['TLKM'], 'Ticker': [None], 'Lot Balance': [1.0],
+                                                        'Avg Price': [3000.0]})], ignore_index=True)
+    with pytest.raises(ValueError, match='TLKM'):
+        PortfolioCRUD(pm).update_from_editor(edited)
+    assert 'TLKM' not in set(pm.df['Stock'])
@@ -0,0 +1,60 @@
+# tests/test_risk_engines.py
+import numpy as np
+import pytest
+
+from analysis.covariance import CovarianceEngine
+from analysis.var_engine import VaREngine
+from data.market_data import StubQuoteProvider
+from data.portfolio_manager import PortfolioManager
+
+
+@pytest.fixture
+def pm():
+    return PortfolioManager(StubQuoteProvider())
+
+
+@pytest.mark.parametrize('window', [None, 30])
+def test_sample_covariance_matches_numpy(pm, window):
+    returns = pm.returns_panel().dropna()
+    expected = returns.iloc[-window:] if window else returns
+    mean, cov = CovarianceEngine(pm).estimate(window=window)
+    np.testing.assert_allclose(mean.to_numpy(), expected.mean().to_numpy())
+    np.testing.assert_allclose(cov.to_numpy(), np.cov(expected.to_numpy(), rowvar=False), atol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['sample', 'ewma'])
+@pytest.mark.parametrize('window', [None, 30])
+def test_incremental_update_matches_rebuild(pm, method, window):
+    engine = CovarianceEngine(pm)
+    engine.estimate(window=window, method=method)
+    last = pm.price_panel().iloc[-1]
+    for day in range(1, 4):
+        pm.append_prices(pm.price_panel().index[-1] + np.timedelta64(1, 'D'), (last * (1 + 0.01 * day)).to_dict())
+    mean, cov = engine.estimate(window=window, method=method)
+    fresh_mean, fresh_cov = CovarianceEngine(pm).estimate(window=window, method=method)
+    np.testing.assert_allclose(mean.to_numpy(), fresh_mean.to_numpy(), atol=1e-12)
+    np.testing.assert_allclose(cov.to_numpy(), fresh_cov.to_numpy(), atol=1e-12)
+
+
+def test_ledoit_wolf_is_positive_definite(pm):
+    _, cov = CovarianceEngine(pm).estimate(method='ledoit_wolf')
+    assert np.allclose(cov, cov.T)
+    assert np.linalg.eigvalsh(cov.to_numpy()).min() > 0
+
+
+def test_var_methods_agree_on_normal_returns():
+    rng = np.random.default_rng(0)
+    cov = np.array([[0.0004, 0.0001], [0.0001, 0.0009]])
+    returns = rng.multivariate_normal([0.0, 0.0], cov, size=20_000)
+    engine = VaREngine(returns, [0.6, 0.4], portfolio_value=1e9, mean=[0.0, 0.0], cov=cov)
+    report = engine.report((0.95, 0.99), (1,), n_scenarios=50_000).set_index(['Method', 'Confidence'])
+
+    sigma = np.sqrt(np.array([0.6, 0.4]) @ cov @ np.array([0.6, 0.4]))
+    assert report.loc[('Parametric', 0.95), 'VaR %'] == pytest.approx(1.6449 * sigma * 100, rel=1e-3)
+    for method in ('Historical', 'Monte Carlo'):
+        for confidence in (0.95, 0.99):
+            row = report.loc[(method, confidence)]
+            expected = report.loc[('Parametric', confidence)]
+            assert row['VaR %'] == pytest.approx(expected['VaR %'], rel=0.05)
+            assert row['CVaR %'] >= row['VaR %']
+    assert report['VaR (Rp)'].to_numpy() == pytest.approx(report['VaR %'].to_numpy() / 100 * 1e9)
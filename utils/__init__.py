@@ -1,4 +1,7 @@
 # utils/__init__.py
 
-# Modul utilitas format dan styling
-from .formatter import format_rupiah, format_percentage, color_negative_red
+# Modul utilitas format, styling dan cache
+from .formatter import (format_rupiah, format_percentage, color_negative_red, format_rupiah_column,
+                        format_percentage_column, sign_colors, category_colors, style_table, paginate)
+from .lru import LRUCache
+from .memo import versioned_cache
@@ -1,4 +1,11 @@
 # utils/formatter.py
+import numpy as np
+import pandas as pd
+
+MISSING = '-'
+SIGN_COLORS = ('red', 'black', 'green')  # negatif, kosong, nol/positif (sama dengan color_negative_red)
+
+
 def format_rupiah(value):
     try:
         return f"Rp {value:,.0f}"
@@ -27,3 +34,73 @@ def color_negative_red(val):
     else:
         color = 'black'
     return f'color: {color}'
+
+
+def _numeric(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _format_column(values, template):
+    index = values.index if isinstance(values, pd.Series) else None
+    name = values.name if isinstance(values, pd.Series) else None
+    num = _numeric(values)
+    valid = np.isfinite(num)
+    # Satu map dari str.format ke list float; nilai kosong ditangani dengan mask, bukan try/except per sel
+    text = np.array(list(map(template.format, np.where(valid, num, 0.0).tolist())), dtype=object)
+    return pd.Series(np.where(valid, text, MISSING), index=index, name=name, dtype=object)
+
+
+def format_rupiah_column(values):
+    """
+    Versi kolom dari format_rupiah; nilai kosong menjadi '-'
+    """
+    return _format_column(values, 'Rp {:,.0f}')
+
+
+def format_percentage_column(values, decimals=2):
+    """
+    Versi kolom dari format_percentage; nilai kosong menjadi '-'
+    """
+    return _format_column(values, f'{{:.{decimals}f}}%')
+
+
+def sign_colors(values, colors=SIGN_COLORS, prop='color'):
+    """
+    CSS per sel berdasarkan tanda nilai numerik asli (tanpa mem-parsing teks hasil format)
+    """
+    negative, neutral, positive = (f'{prop}: {c}' for c in colors)
+    num = _numeric(values)
+    return np.where(num < 0, negative, np.where(num >= 0, positive, neutral))
+
+
+def category_colors(values, mapping, default='white', prop='background-color'):
+    """
+    CSS per sel dari kategori (mis. jenis rekomendasi) lewat satu map vektor
+    """
+    return pd.Series(values).map({k: f'{prop}: {v}' for k, v in mapping.items()}) \
+        .fillna(f'{prop}: {default}').to_numpy()
+
+
+def style_table(display_df, numeric_df=None, sign_cols=(), category_col=None, category_map=None):
+    """
+    Styler untuk tabel yang sudah diformat: warna tanda diambil dari numeric_df (nilai asli,
+    index sama dengan display_df) per kolom, bukan per sel
+    """
+    numeric_df = display_df if numeric_df is None else numeric_df
+    styler = display_df.style
+    for col in sign_cols:
+        styler = styler.apply(lambda _, c=col: sign_colors(numeric_df[c]), subset=[col])
+    if category_col is not None:
+        styler = styler.apply(lambda s: category_colors(s, category_map), subset=[category_col])
+    return styler
+
+
+def paginate(df, page=1, page_size=200):
+    """
+    Potongan halaman `page` (mulai 1) dan jumlah halaman; format dan styling cukup
+    dijalankan untuk baris yang tampil
+    """
+    pages = max(1, -(-len(df) // page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], pages
@@ -0,0 +1,41 @@
+# utils/lru.py
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """
+    Cache dictionary berukuran terbatas; entri yang paling lama tidak dipakai dibuang duluan
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
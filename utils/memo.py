@@ -0,0 +1,37 @@
+# utils/memo.py
+import functools
+
+_MISSING = object()
+
+
+def versioned_cache(attrs=(), cache_if=None):
+    """
+    Decorator untuk method analyzer: hasil di-cache di `self.pm.memo` dengan kunci
+    (nama method, pm.data_version, atribut instance `attrs`, argumen). Cache dibatasi
+    LRU milik PortfolioManager, jadi versi lama otomatis terbuang. Bila `cache_if`
+    diberikan, hasil hanya disimpan jika cache_if(result, *args, **kwargs) bernilai True
+    (misalnya agar hasil kosong karena gagal mengambil data tidak tertahan di cache).
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (
+                method.__qualname__,
+                self.pm.data_version,
+                tuple(getattr(self, attr) for attr in attrs),
+                args,
+                tuple(sorted(kwargs.items())),
+            )
+            try:
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)  # argumen tidak bisa di-hash, hitung langsung
+
+            result = self.pm.memo.get(key, _MISSING)
+            if result is _MISSING:
+                result = method(self, *args, **kwargs)
+                if cache_if is None or cache_if(result, *args, **kwargs):
+                    self.pm.memo.set(key, result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,62 @@
+# visualization/downsample.py
+import numpy as np
+import pandas as pd
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    x = x.astype(np.float64)
+    return x - x[0] if len(x) else x
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: posisi `n_out` titik yang mempertahankan bentuk garis
+    (puncak dan lembah tetap ada). Titik pertama dan terakhir selalu ikut.
+    x boleh datetime; y tanpa NaN.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    every = (n - 2) / (n_out - 2)
+    edges = np.concatenate([np.floor(np.arange(n_out - 2) * every).astype(np.int64) + 1, [n - 1, n]])
+    # Rata-rata tiap bucket lewat cumsum, dipakai sebagai titik ketiga segitiga
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    sizes = edges[1:] - edges[:-1]
+    mean_x = (cx[edges[1:]] - cx[edges[:-1]]) / sizes
+    mean_y = (cy[edges[1:]] - cy[edges[:-1]]) / sizes
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - mean_x[i + 1]) * (y[start:end] - ay) - (ax - x[start:end]) * (mean_y[i + 1] - ay))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_frame(df, x_col, n_out):
+    """
+    Downsample DataFrame berisi beberapa seri yang berbagi sumbu x: LTTB per kolom,
+    lalu gabungan titik terpilih semua kolom (puncak tiap seri tetap terlihat)
+    """
+    if len(df) <= n_out:
+        return df
+    x = df[x_col].to_numpy() if x_col in df.columns else df.index.to_numpy()
+    keep = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        if col == x_col or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(values))
+        keep[valid[lttb(x[valid], values[valid], n_out)]] = True
+    return df[keep]
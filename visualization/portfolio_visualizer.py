@@ -1,12 +1,36 @@
 # visualization/portfolio_visualizer.py
-import plotly.express as px
-import plotly.graph_objects as go
+import hashlib
+
+import numpy as np
 import pandas as pd
 
+from utils.lru import LRUCache
+from .downsample import downsample_frame, lttb
+
+# Perkiraan lebar plot dalam piksel; lebih banyak titik dari ini tidak terlihat bedanya
+MAX_POINTS = 1500
+# Di atas jumlah titik ini trace dirender dengan WebGL (Scattergl) alih-alih SVG
+WEBGL_THRESHOLD = 1000
+# Figure yang sudah dibangun, per (versi data, saham, isi prediksi, rentang, anggaran titik)
+FIGURE_CACHE = LRUCache(maxsize=64)
+
+
+def forecast_digest(forecast):
+    """
+    Sidik isi prediksi (tanggal, nilai, interval), agar prediksi baru untuk saham dan
+    versi data yang sama tidak memakai figure lama dari cache
+    """
+    digest = hashlib.sha1(np.asarray(pd.DatetimeIndex(forecast['dates']).asi8).tobytes())
+    for name in ('predictions', 'upper', 'lower'):
+        if name in forecast:
+            digest.update(np.asarray(forecast[name], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
 
 class PortfolioVisualizer:
     @staticmethod
     def portfolio_pie(df):
+        import plotly.express as px  # plotly dimuat saat grafik pertama dibuat
         fig = px.pie(df, values='Market Value', names='Stock',
                      title='Portfolio Composition', hole=0.4)
         fig.update_traces(textposition='inside', textinfo='percent+label')
@@ -14,6 +38,7 @@ class PortfolioVisualizer:
 
     @staticmethod
     def performance_bar(df):
+        import plotly.express as px
         df = df.copy()
         df['Color'] = df['Unrealized'].apply(lambda x: 'green' if x >= 0 else 'red')
         fig = px.bar(df, x='Stock', y='Unrealized', color='Color',
@@ -23,30 +48,59 @@ class PortfolioVisualizer:
         return fig
 
     @staticmethod
-    def price_prediction_plot(history, forecast, stock):
-        history = history.rename(columns={'Price': 'Value'})
-        history['Type'] = 'Historical'
+    def price_prediction_plot(history, forecast, stock, max_points=MAX_POINTS, version=None, date_range=None):
+        """
+        Harga historis + prediksi. Histori dipotong ke date_range (start, end) lalu
+        di-downsample dengan LTTB ke max_points; figure di-cache jika version diberikan
+        (misalnya pm.data_version). Figure hasil cache dipakai bersama, jangan diubah.
+        """
+        key = (version, stock, forecast_digest(forecast), date_range, max_points)
+        if version is not None:
+            cached = FIGURE_CACHE.get(key)
+            if cached is not None:
+                return cached
+
+        import plotly.graph_objects as go
 
-        forecast_df = pd.DataFrame({
-            'Date': forecast['dates'],
-            'Value': forecast['predictions'],
-            'Type': 'Forecast'
-        })
+        if date_range is not None:
+            start, end = (pd.Timestamp(d) if d is not None else None for d in date_range)
+            mask = pd.Series(True, index=history.index)
+            if start is not None:
+                mask &= history['Date'] >= start
+            if end is not None:
+                mask &= history['Date'] <= end
+            history = history[mask]
+        history = history.dropna(subset=['Price'])
+        if max_points:
+            history = history.iloc[lttb(history['Date'].to_numpy(), history['Price'].to_numpy(), max_points)]
 
-        combined = pd.concat([history, forecast_df])
+        dates = list(forecast['dates'])
+        predictions = list(forecast['predictions'])
+        scatter = go.Scattergl if len(history) + len(dates) > WEBGL_THRESHOLD else go.Scatter
 
-        fig = px.line(combined, x='Date', y='Value', color='Type',
-                      title=f"Price Forecast for {stock}",
-                      labels={'Value': 'Price (Rp)'})
+        fig = go.Figure()
+        fig.add_trace(scatter(x=history['Date'], y=history['Price'], mode='lines', name='Historical'))
+        fig.add_trace(scatter(x=dates, y=predictions, mode='lines', name='Forecast'))
+        fig.update_layout(title=f"Price Forecast for {stock}", xaxis_title='Date', yaxis_title='Price (Rp)',
+                          legend_title_text='Type')
 
         if 'confidence' in forecast:
             fig.add_trace(go.Scatter(
-                x=forecast_df['Date'].tolist() + forecast_df['Date'].tolist()[::-1],
-                y=forecast['upper'] + forecast['lower'][::-1],
+                x=dates + dates[::-1],
+                y=list(forecast['upper']) + list(forecast['lower'])[::-1],
                 fill='toself',
                 fillcolor='rgba(100, 150, 255, 0.2)',
                 line=dict(color='rgba(255,255,255,0)'),
                 name='Confidence Interval'
             ))
 
+        if version is not None:
+            FIGURE_CACHE.set(key, fig)
         return fig
+
+    @staticmethod
+    def line_data(df, x='Date', max_points=MAX_POINTS):
+        """
+        Data untuk st.line_chart (atau grafik garis lain) yang sudah di-downsample per seri
+        """
+        return downsample_frame(df, x, max_points) if max_points else df